@@ -0,0 +1,94 @@
+"""
+Compare Indexer index types on recall@k against the flat baseline,
+single-query p50/p99 latency and index memory per vector.
+
+Cascade configurations (rerank > 0) scan a compressed index for
+rerank * k candidates and re-score them against float32 vectors in a
+memory-mapped file; that file is on disk and not counted as index memory.
+
+Clustered random vectors stand in for embeddings so no model is needed.
+
+Usage:
+    python benchmarks/bench_ann.py --vectors 200000 --queries 1000 --k 10
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from indexer import Indexer
+
+
+CONFIGS = [
+    ("flat", {}),
+    ("hnsw", {"hnsw_m": 32, "ef_search": 64}),
+    ("hnsw", {"hnsw_m": 32, "ef_search": 128}),
+    ("ivf_flat", {"nlist": 1024, "nprobe": 8}),
+    ("ivf_flat", {"nlist": 1024, "nprobe": 32}),
+    ("ivf_pq", {"nlist": 1024, "pq_m": 48, "nprobe": 16}),
+    ("sq8", {"rerank": 4}),
+    ("sq_fp16", {"rerank": 2}),
+    ("pq", {"pq_m": 48, "rerank": 10}),
+    ("ivf_pq", {"nlist": 1024, "pq_m": 48, "nprobe": 16, "rerank": 10}),
+]
+
+
+def clustered_vectors(n: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32) * 4
+    points = centers[rng.integers(0, clusters, n)] + rng.standard_normal((n, dim), dtype=np.float32)
+    return points.astype(np.float32)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vectors", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--metric", default="cosine", choices=["l2", "ip", "cosine"])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    data = clustered_vectors(args.vectors, args.dim, 256, rng)
+    queries = clustered_vectors(args.queries, args.dim, 256, rng)
+    docs = [""] * len(data)
+
+    ground_truth = None
+    for index_type, params in CONFIGS:
+        indexer = Indexer(embedding_dim=args.dim, index_type=index_type, metric=args.metric,
+                          keyword_index=False, **params)
+        start = time.perf_counter()
+        indexer.add_embeddings(data, docs)
+        build_time = time.perf_counter() - start
+
+        with tempfile.TemporaryDirectory() as path:
+            if indexer.vectors is not None:
+                # Re-score from the memory-mapped file, as a loaded index does
+                indexer.save(path)
+                indexer = Indexer.load(path)
+            prepared = indexer._prepare_vectors(queries)
+            found, _ = indexer._search_vectors(prepared, args.k)
+            if ground_truth is None:
+                ground_truth = found
+            recall = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(found, ground_truth)])
+
+            latencies = []
+            for row in prepared:
+                start = time.perf_counter()
+                indexer._search_vectors(row[None, :], args.k)
+                latencies.append(time.perf_counter() - start)
+            p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+
+        bytes_per_vector = faiss.serialize_index(indexer.index).nbytes / indexer.index.ntotal
+        print(f"{index_type:<9} {str(params):<36} recall@{args.k}={recall:.3f} "
+              f"p50={p50:7.3f}ms p99={p99:7.3f}ms {bytes_per_vector:8.1f} B/vec build={build_time:6.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Compare the inference backends of the chunker and the embedder on CPU.
+
+For each backend the boundary classifier (chunking) and the embedder are
+timed on the same synthetic text. Their outputs are then checked against
+fp32 PyTorch: boundary probability differences and embedding cosine.
+
+Usage:
+    python benchmarks/bench_backends.py --backends torch int8 onnx --threads 4
+    python benchmarks/bench_backends.py --tiny-models models/tiny   # offline, tiny random models
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from preprocessing.chunking_pipeline import ChunkingPipeline
+from synthetic_corpus import synthetic_pages
+from tiny_models import build_tiny_models
+from utils import clean_text
+from utils.inference_backends import BACKENDS, check_accuracy
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--embedding-model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--classifier", default="roberta-base")
+    parser.add_argument("--tiny-models", type=Path, help="Build and use tiny local models in this directory")
+    parser.add_argument("--documents", type=int, default=4)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=None, help="Intra-op threads (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    texts = [clean_text("\n".join(line for page in synthetic_pages(rng, args.pages, 50) for line in page))
+             for _ in range(args.documents)]
+    if args.tiny_models:
+        models = build_tiny_models(args.tiny_models, texts, seed=args.seed)
+        args.embedding_model, args.classifier = models["embedder"], models["classifier"]
+
+    Path("logs/preprocessing").mkdir(parents=True, exist_ok=True)
+    reference_chunks, baseline = None, None
+    for backend in args.backends:
+        pipeline = ChunkingPipeline(
+            embedding_model=args.embedding_model, model=args.classifier,
+            backend=backend, intra_op_threads=args.threads
+        )
+        # Load (and for onnx, export) outside the timed region
+        pipeline._create_chunks(texts[0][:2000])
+        pipeline.embedder.embed_batch(["warm up"])
+
+        start = time.perf_counter()
+        chunks = [chunk for text in texts for chunk in pipeline._create_chunks(text)]
+        chunk_seconds = time.perf_counter() - start
+        # Every backend embeds the same chunks so the timings are comparable
+        reference_chunks = reference_chunks or chunks
+        start = time.perf_counter()
+        pipeline.embedder.embed_batch(reference_chunks)
+        embed_seconds = time.perf_counter() - start
+
+        baseline = baseline or (chunk_seconds, embed_seconds)
+        line = (f"{backend:<6s} chunking {chunk_seconds:7.2f}s ({baseline[0] / chunk_seconds:4.2f}x)  "
+                f"embedding {embed_seconds:7.2f}s ({baseline[1] / embed_seconds:4.2f}x)")
+        if backend != "torch":
+            report = check_accuracy(reference_chunks[:256], backend, args.embedding_model, args.classifier)
+            line += "  " + " ".join(f"{name}={value:.4f}" for name, value in report.items())
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Compare the per-sentence reference chunker against the batched
+ChunkingPipeline._create_chunks on long synthetic documents.
+
+Usage:
+    python benchmarks/bench_chunking.py --sentences 200 800
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import torch
+
+from preprocessing.chunking_pipeline import ChunkingPipeline
+
+
+WORDS = (
+    "the model retrieves relevant passages from a large corpus and the "
+    "generator conditions on them while caching frequent queries reduces "
+    "latency and hypothetical documents improve recall for sparse questions"
+).split()
+
+
+def synthetic_text(sentences: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    return " ".join(
+        " ".join(rng.choices(WORDS, k=rng.randint(8, 25))) + rng.choice([".", "!", "?", ","])
+        for _ in range(sentences)
+    )
+
+
+def reference_chunks(pipeline: ChunkingPipeline, text: str) -> list[str]:
+    """One forward pass over the whole growing buffer per sentence."""
+    sentences = re.split(r'(?<=[.!?,])\s+', text)
+    chunks, buffer = [], []
+    for sent in sentences:
+        buffer.append(sent)
+        combined = " ".join(buffer)
+        tokens = pipeline.tokenizer(combined, truncation=True, return_tensors="pt",
+                                    max_length=pipeline.tokenizer.model_max_length)
+        with torch.no_grad():
+            score = torch.softmax(pipeline.model(**tokens).logits, dim=1)[0][1].item()
+        if score > pipeline.boundary_threshold:
+            chunks.append(combined)
+            buffer = []
+    if buffer:
+        chunks.append(" ".join(buffer))
+    return chunks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default="roberta-base")
+    parser.add_argument("--sentences", type=int, nargs="+", default=[200, 800])
+    parser.add_argument("--threshold", type=float, default=0.1)
+    parser.add_argument("--batch-size", type=int, default=16)
+    args = parser.parse_args()
+
+    Path("logs/preprocessing").mkdir(parents=True, exist_ok=True)
+    pipeline = ChunkingPipeline(model=args.model, boundary_threshold=args.threshold,
+                                boundary_batch_size=args.batch_size)
+
+    for n in args.sentences:
+        text = synthetic_text(n)
+
+        start = time.perf_counter()
+        expected = reference_chunks(pipeline, text)
+        reference_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = pipeline._create_chunks(text)
+        batched_time = time.perf_counter() - start
+
+        print(f"sentences={n:<6d} reference={reference_time:8.2f}s batched={batched_time:8.2f}s "
+              f"speedup={reference_time / batched_time:5.1f}x chunks={len(actual)} "
+              f"equivalent={expected == actual}")
+
+
+if __name__ == "__main__":
+    main()
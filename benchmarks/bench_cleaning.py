@@ -0,0 +1,73 @@
+"""
+Compare clean_text with the fused streaming TextCleaner on synthetic
+PDF-like pages and report throughput in MB/s.
+
+Usage:
+    python benchmarks/bench_cleaning.py --pages 2000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from utils.text_cleaning import clean_pages, clean_text
+
+
+WORDS = ("retrieval augmented generation combines a dense vector index with keyword search "
+         "so that answers are grounded in the source documents of the corpus").split()
+DECORATIONS = ["“quoted”", "it’s", "—", "•", "…", "?!", "e.g.", "2024", "Fig."]
+
+
+def synthetic_page(rng: random.Random, page_number: int, lines: int) -> str:
+    out = [f"Chapter {page_number // 20}   Header"]
+    carry = ""
+    for _ in range(lines):
+        words = [rng.choice(WORDS) if rng.random() > 0.03 else rng.choice(DECORATIONS) for _ in range(12)]
+        line = carry + " ".join(words)
+        carry = ""
+        if rng.random() < 0.1:
+            line += " hyphen-"
+            carry = "ated "
+        out.append(line)
+        if rng.random() < 0.05:
+            out.append("")
+    out.append(f"  {page_number}  ")
+    return "\n".join(out)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--lines-per-page", type=int, default=45)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    pages = [(i + 1, synthetic_page(rng, i + 1, args.lines_per_page)) for i in range(args.pages)]
+    joined = "\n\n".join(text.strip() for _, text in pages)
+    megabytes = len(joined.encode("utf-8")) / 1e6
+
+    def best_of(fn) -> float:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    reference_time = best_of(lambda: clean_text(joined))
+    fused_time = best_of(lambda: clean_pages(pages))
+    expected = clean_text(joined)
+    actual, offsets = clean_pages(pages)
+
+    print(f"input={megabytes:.1f}MB pages={args.pages}")
+    print(f"clean_text   {megabytes / reference_time:8.1f} MB/s")
+    print(f"TextCleaner  {megabytes / fused_time:8.1f} MB/s  speedup={reference_time / fused_time:4.1f}x "
+          f"anchors={len(offsets)} equivalent={expected == actual}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Measure Indexer.load cold-start time for a large saved index.
+
+Random vectors stand in for embeddings, so no model is downloaded or
+loaded; the first lookup uses a precomputed query vector.
+
+Usage:
+    python benchmarks/bench_cold_start.py --vectors 1000000 --dim 384
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from indexer import Indexer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vectors", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=384)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    indexer = Indexer(embedding_dim=args.dim)
+    for start in range(0, args.vectors, 100_000):
+        count = min(100_000, args.vectors - start)
+        embeddings = rng.standard_normal((count, args.dim), dtype=np.float32)
+        indexer.add_embeddings(embeddings, [f"chunk {i} of the synthetic corpus" for i in range(start, start + count)])
+    query = rng.standard_normal((1, args.dim), dtype=np.float32)
+
+    with tempfile.TemporaryDirectory() as path:
+        start = time.perf_counter()
+        indexer.save(path)
+        print(f"save              : {time.perf_counter() - start:8.3f}s")
+        del indexer
+
+        for mmap in (False, True):
+            start = time.perf_counter()
+            loaded = Indexer.load(path, mmap=mmap)
+            load_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            _, indices = loaded.index.search(query, 5)
+            [loaded.documents[i] for i in indices[0]]
+            query_time = time.perf_counter() - start
+
+            print(f"load (mmap={mmap!s:<5}): {load_time:8.3f}s  first lookup: {query_time * 1000:8.1f}ms")
+            del loaded
+
+
+if __name__ == "__main__":
+    main()
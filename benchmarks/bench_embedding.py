@@ -0,0 +1,55 @@
+"""
+Compare per-text and batched encoding throughput of Embedder.
+
+Usage:
+    python benchmarks/bench_embedding.py --docs 2000 --batch-sizes 16 64 256
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from utils.embedding_utils import Embedder
+
+
+WORDS = (
+    "retrieval augmented generation hypothetical document embedding cache "
+    "query vector index chunk sentence model transformer corpus keyword "
+    "semantic dense sparse latency throughput precision recall answer"
+).split()
+
+
+def synthetic_docs(n: int, words_per_doc: int = 60, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(WORDS, k=words_per_doc)) for _ in range(n)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--docs", type=int, default=1000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16, 64, 256])
+    args = parser.parse_args()
+
+    embedder = Embedder(args.model)
+    docs = synthetic_docs(args.docs)
+    embedder.embed_batch(docs[:8])
+
+    start = time.perf_counter()
+    for doc in docs:
+        embedder.embed_text(doc)
+    elapsed = time.perf_counter() - start
+    print(f"single        : {len(docs) / elapsed:10.1f} docs/sec")
+
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        embedder.embed_batch(docs, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        print(f"batch={batch_size:<7d}: {len(docs) / elapsed:10.1f} docs/sec")
+
+
+if __name__ == "__main__":
+    main()
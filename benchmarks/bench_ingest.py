@@ -0,0 +1,43 @@
+"""
+Report ChunkingPipeline.process_directory throughput against worker count.
+
+Usage:
+    python benchmarks/bench_ingest.py data/raw --workers 1 2 4 8 --start-method fork
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from preprocessing.chunking_pipeline import ChunkingPipeline
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("pdf_dir", type=Path)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--start-method", choices=["spawn", "fork"], default="spawn",
+                        help="fork shares the parent's preloaded models with the workers")
+    args = parser.parse_args()
+
+    Path("logs/preprocessing").mkdir(parents=True, exist_ok=True)
+    pipeline = ChunkingPipeline()
+    documents = len(list(args.pdf_dir.glob("*.pdf")))
+
+    baseline = None
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as out_dir:
+            start = time.perf_counter()
+            pipeline.process_directory(args.pdf_dir, Path(out_dir), workers=workers,
+                                        start_method=args.start_method)
+            elapsed = time.perf_counter() - start
+        throughput = documents / elapsed
+        baseline = baseline or throughput
+        print(f"workers={workers:<3d} {throughput:8.2f} docs/sec  scaling={throughput / baseline:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
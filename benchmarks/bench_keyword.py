@@ -0,0 +1,61 @@
+"""
+Measure BM25Index build time and keyword query latency on a synthetic
+Zipf-distributed corpus.
+
+Usage:
+    python benchmarks/bench_keyword.py --chunks 1000000 --queries 1000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from utils.bm25 import BM25Index
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunks", type=int, default=1_000_000)
+    parser.add_argument("--words-per-chunk", type=int, default=60)
+    parser.add_argument("--vocab", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--query-terms", type=int, default=3)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vocab = np.array([f"w{i}" for i in range(args.vocab)])
+
+    def sample_words(n: int) -> np.ndarray:
+        return vocab[np.minimum(rng.zipf(1.2, n), args.vocab) - 1]
+
+    index = BM25Index()
+    start = time.perf_counter()
+    for block in range(0, args.chunks, 10_000):
+        count = min(10_000, args.chunks - block)
+        words = sample_words(count * args.words_per_chunk).reshape(count, args.words_per_chunk)
+        index.add(" ".join(row) for row in words)
+    print(f"build: {time.perf_counter() - start:.1f}s for {len(index)} chunks")
+
+    # Terms drawn by corpus frequency include the stopword-like head terms
+    # with the longest postings; uniform draws are mostly rare terms
+    workloads = {
+        "by frequency": [" ".join(sample_words(args.query_terms)) for _ in range(args.queries)],
+        "uniform": [" ".join(vocab[rng.integers(0, args.vocab, args.query_terms)]) for _ in range(args.queries)]
+    }
+    for name, queries in workloads.items():
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query, args.k)
+            latencies.append(time.perf_counter() - start)
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        print(f"query ({name}): p50={p50:.3f}ms p99={p99:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Load-test a running query server and report QPS and latency percentiles.
+
+Start the server first, e.g. `python main.py data/index`, then:
+    python benchmarks/bench_server.py --requests 5000 --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+
+
+WORDS = "retrieval cache query vector chunk model latency recall index corpus answer".split()
+
+
+async def client(host: str, port: int, queue: asyncio.Queue, latencies: list, errors: list) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            try:
+                body = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            writer.write(
+                f"POST /search HTTP/1.1\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while (line := await reader.readline()) not in (b"\r\n", b""):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":")[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run(args: argparse.Namespace) -> None:
+    rng = random.Random(0)
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(args.requests):
+        query = " ".join(rng.choices(WORDS, k=6))
+        queue.put_nowait(json.dumps({"query": query, "top_k": args.k}).encode("utf-8"))
+
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*[client(args.host, args.port, queue, latencies, errors) for _ in range(args.concurrency)])
+    elapsed = time.perf_counter() - start
+
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(f"{len(latencies) / elapsed:8.1f} QPS  p50={p50:.1f}ms p99={p99:.1f}ms  "
+          f"errors={len(errors)} (concurrency={args.concurrency})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--k", type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
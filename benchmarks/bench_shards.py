@@ -0,0 +1,81 @@
+"""
+Report ShardedIndexer query latency and throughput against shard count.
+
+For each shard count the same clustered random vectors are indexed, then
+single queries (p50/p99 latency) and batches of queries (throughput) are
+run against it. Results are checked against an unsharded flat index.
+
+Usage:
+    python benchmarks/bench_shards.py --vectors 200000 --shards 1 2 4 8 --batch-size 64
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from bench_ann import clustered_vectors
+from indexer import Indexer
+from sharded_indexer import ShardedIndexer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--partition", choices=["document", "hash"], default="document")
+    parser.add_argument("--index-type", default="flat")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    data = clustered_vectors(args.vectors, args.dim, 256, rng)
+    queries = clustered_vectors(args.queries, args.dim, 256, rng)
+    # Ten chunks per synthetic document
+    doc_ids = [f"doc-{start // 10}" for start in range(0, len(data), 10)]
+
+    reference = Indexer(embedding_dim=args.dim, metric="cosine", keyword_index=False)
+    reference.add_embeddings(data, [str(i) for i in range(len(data))])
+    _, expected = reference.index.search(reference._prepare_vectors(queries), args.k)
+
+    for num_shards in args.shards:
+        with tempfile.TemporaryDirectory() as path:
+            with ShardedIndexer(path, num_shards=num_shards, partition=args.partition, embedding_dim=args.dim,
+                                index_type=args.index_type, metric="cosine", keyword_index=False) as sharded:
+                start = time.perf_counter()
+                for doc_id, first in zip(doc_ids, range(0, len(data), 10)):
+                    rows = slice(first, first + 10)
+                    sharded.add_embeddings(data[rows], [str(i) for i in range(first, min(first + 10, len(data)))],
+                                           doc_id=doc_id)
+                build_time = time.perf_counter() - start
+
+                results = sharded.search_vectors(queries, args.k)
+                found = [[int(text) for text in results.documents(row)] for row in range(len(queries))]
+                recall = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(found, expected)])
+
+                latencies = []
+                for row in queries:
+                    start = time.perf_counter()
+                    sharded.search_vectors(row[None, :], args.k)
+                    latencies.append(time.perf_counter() - start)
+                p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+
+                start = time.perf_counter()
+                for first in range(0, len(queries), args.batch_size):
+                    sharded.search_vectors(queries[first:first + args.batch_size], args.k)
+                throughput = len(queries) / (time.perf_counter() - start)
+
+        print(f"shards={num_shards:<3d} p50={p50:7.3f}ms p99={p99:7.3f}ms "
+              f"throughput={throughput:9.1f} q/s (batch {args.batch_size}) "
+              f"recall@{args.k}={recall:.3f} build={build_time:6.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+End-to-end benchmark suite over a synthetic PDF corpus.
+
+Each stage is timed separately: PDF extraction, cleaning, chunking,
+filtering, embedding, indexing and search. Tiny randomly initialized local
+models (see tiny_models.py) stand in for the real ones, so the suite runs
+offline; spaCy's en_core_web_sm must still be installed for filtering.
+Results are written as JSON, and two result files can be compared to flag
+stages that got slower.
+
+Usage:
+    python benchmarks/bench_suite.py run --out results/base.json --documents 20 --pages 20
+    python benchmarks/bench_suite.py compare results/base.json results/new.json --threshold 0.1
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from indexer import Indexer
+from preprocessing.chunking_pipeline import ChunkingPipeline
+from synthetic_corpus import CONTENT_WORDS, generate_corpus
+from tiny_models import build_tiny_models
+from utils import PDFTextExtractor, clean_pages, clean_text, filter_segments, filter_words
+
+RESULTS_VERSION = 1
+# Metrics compared between runs; lower is better for all of them
+COMPARED_METRICS = ("seconds", "p99_ms")
+
+
+def timed(fn: Callable, repeat: int):
+    """Run fn ``repeat`` times and return its last result and every wall time."""
+    runs, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        runs.append(time.perf_counter() - start)
+    return result, runs
+
+
+def stage(runs: List[float], items: int, unit: str, **extra) -> Dict:
+    seconds = min(runs)
+    return {
+        "seconds": seconds,
+        "runs": runs,
+        "items": items,
+        "unit": unit,
+        "throughput": items / seconds if seconds else None,
+        **extra
+    }
+
+
+def environment() -> Dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+            cwd=Path(__file__).resolve().parent, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "torch_threads": torch.get_num_threads(),
+        "numpy": np.__version__,
+        "torch": torch.__version__
+    }
+
+
+def run_suite(args: argparse.Namespace, work_dir: Path) -> Dict:
+    stages: Dict[str, Dict] = {}
+    pdfs = generate_corpus(work_dir / "corpus", args.documents, args.pages, args.lines_per_page, args.seed)
+
+    def extract() -> List[str]:
+        return [PDFTextExtractor(path).extract_text() for path in pdfs]
+
+    raw_texts, runs = timed(extract, args.repeat)
+    stages["extract"] = stage(runs, args.documents * args.pages, "pages",
+                              megabytes=sum(len(text) for text in raw_texts) / 1e6)
+
+    models = build_tiny_models(work_dir / "models", raw_texts, hidden_size=args.hidden_size,
+                               layers=args.layers, seed=args.seed)
+    Path("logs/preprocessing").mkdir(parents=True, exist_ok=True)
+    pipeline = ChunkingPipeline(embedding_model=models["embedder"], model=models["classifier"])
+
+    cleaned, runs = timed(lambda: [clean_text(text) for text in raw_texts], args.repeat)
+    megabytes = sum(len(text) for text in raw_texts) / 1e6
+    stages["clean_text"] = stage(runs, args.documents, "documents", megabytes=megabytes,
+                                 mb_per_second=megabytes / min(runs))
+
+    def clean_streaming() -> List[str]:
+        return [clean_pages(PDFTextExtractor(path).iter_pages())[0] for path in pdfs]
+
+    _, runs = timed(clean_streaming, args.repeat)
+    stages["extract_clean_pages"] = stage(runs, args.documents * args.pages, "pages")
+
+    chunks, runs = timed(lambda: [pipeline._create_chunks(text) for text in cleaned], args.repeat)
+    stages["create_chunks"] = stage(runs, sum(len(c) for c in chunks), "chunks")
+
+    filtered, runs = timed(lambda: [filter_segments(c) for c in chunks], args.repeat)
+    segments = [segment for document in filtered for segment in document]
+    stages["filter_segments"] = stage(runs, sum(len(c) for c in chunks), "chunks", kept=len(segments))
+
+    words = [text.split(" ") for text in cleaned]
+    _, runs = timed(lambda: [filter_words(w) for w in words], args.repeat)
+    stages["filter_words"] = stage(runs, sum(len(w) for w in words), "words")
+
+    _, runs = timed(lambda: pipeline.embedder.embed_batch(segments), args.repeat)
+    stages["embed"] = stage(runs, len(segments), "chunks")
+
+    def build_index() -> Indexer:
+        indexer = Indexer(embedding_dim=pipeline.embedder.dimension, embedder=pipeline.embedder)
+        for document in filtered:
+            if document:
+                indexer.add_documents(document)
+        return indexer
+
+    indexer, runs = timed(build_index, args.repeat)
+    stages["index_add_documents"] = stage(runs, len(segments), "chunks")
+
+    rng = random.Random(args.seed)
+    queries = [" ".join(rng.choices(CONTENT_WORDS, k=rng.randint(2, 6))) for _ in range(args.queries)]
+    for mode in ("dense", "keyword", "hybrid"):
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            indexer.search(query, top_k=args.k, mode=mode)
+            latencies.append(time.perf_counter() - start)
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        stages[f"search_{mode}"] = stage([sum(latencies)], len(queries), "queries", p50_ms=p50, p99_ms=p99)
+
+    return stages
+
+
+def run(args: argparse.Namespace) -> None:
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    if args.work_dir:
+        args.work_dir.mkdir(parents=True, exist_ok=True)
+        stages = run_suite(args, args.work_dir)
+    else:
+        with tempfile.TemporaryDirectory() as work_dir:
+            stages = run_suite(args, Path(work_dir))
+
+    config = {key: str(value) if isinstance(value, Path) else value
+              for key, value in vars(args).items() if key not in ("command", "func", "out", "work_dir")}
+    results = {
+        "version": RESULTS_VERSION,
+        "created": datetime.now().isoformat(),
+        "environment": environment(),
+        "config": config,
+        "stages": stages
+    }
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps(results, indent=2))
+
+    for name, result in stages.items():
+        throughput = f"{result['throughput']:10.1f} {result['unit']}/s" if result["throughput"] else ""
+        print(f"{name:<22s} {result['seconds']:9.3f}s {throughput}")
+    print(f"Results written to {args.out}")
+
+
+def compare_results(base: Dict, new: Dict, threshold: float) -> List[Dict]:
+    """
+    Compare per-stage metrics of two result files.
+
+    Args:
+        base (Dict): Results of the reference run
+        new (Dict): Results of the run under test
+        threshold (float): Relative slowdown tolerated before a change counts
+            as a regression, e.g. 0.1 for 10%
+
+    Returns:
+        List[Dict]: One row per stage and metric with "ratio" (new / base)
+        and "status": "regression", "improvement" or "ok"
+    """
+    rows = []
+    for name, base_stage in base["stages"].items():
+        new_stage = new["stages"].get(name)
+        if new_stage is None:
+            continue
+        for metric in COMPARED_METRICS:
+            if not base_stage.get(metric) or new_stage.get(metric) is None:
+                continue
+            ratio = new_stage[metric] / base_stage[metric]
+            status = "regression" if ratio > 1 + threshold else "improvement" if ratio < 1 - threshold else "ok"
+            rows.append({"stage": name, "metric": metric, "base": base_stage[metric],
+                         "new": new_stage[metric], "ratio": ratio, "status": status})
+    return rows
+
+
+def compare(args: argparse.Namespace) -> None:
+    base, new = json.loads(args.base.read_text()), json.loads(args.new.read_text())
+    if base["config"] != new["config"]:
+        print("warning: the runs used different configurations, comparisons may not be meaningful")
+    if base["environment"].get("platform") != new["environment"].get("platform"):
+        print("warning: the runs were made on different platforms")
+
+    rows = compare_results(base, new, args.threshold)
+    for row in rows:
+        flag = {"regression": "REGRESSION", "improvement": "improved", "ok": ""}[row["status"]]
+        print(f"{row['stage']:<22s} {row['metric']:<8s} {row['base']:10.4f} -> {row['new']:10.4f} "
+              f"({row['ratio'] - 1:+7.1%}) {flag}")
+
+    regressions = [row for row in rows if row["status"] == "regression"]
+    print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+    if regressions:
+        sys.exit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the suite and write results")
+    run_parser.add_argument("--out", type=Path, required=True, help="JSON results file")
+    run_parser.add_argument("--work-dir", type=Path, help="Keep the corpus and models here instead of a temp dir")
+    run_parser.add_argument("--documents", type=int, default=10)
+    run_parser.add_argument("--pages", type=int, default=10)
+    run_parser.add_argument("--lines-per-page", type=int, default=50)
+    run_parser.add_argument("--queries", type=int, default=200)
+    run_parser.add_argument("--k", type=int, default=5)
+    run_parser.add_argument("--hidden-size", type=int, default=64)
+    run_parser.add_argument("--layers", type=int, default=2)
+    run_parser.add_argument("--repeat", type=int, default=3, help="Runs per stage; the fastest is reported")
+    run_parser.add_argument("--threads", type=int, default=None, help="torch threads (default: torch's choice)")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("base", type=Path)
+    compare_parser.add_argument("new", type=Path)
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="Relative slowdown reported as a regression")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
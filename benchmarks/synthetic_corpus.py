@@ -0,0 +1,143 @@
+"""
+Generate a synthetic corpus of text PDFs without any third-party packages.
+
+Pages hold wrapped technical prose with a running header, a page number
+footer and occasional hyphenated line breaks, so every preprocessing stage
+has representative work to do.
+
+Usage:
+    python benchmarks/synthetic_corpus.py data/synthetic --documents 20 --pages 30
+"""
+import argparse
+import random
+from pathlib import Path
+from typing import List
+
+
+CONTENT_WORDS = """
+retrieval augmented generation dense sparse vector index embedding corpus passage query
+latency throughput benchmark evaluation precision recall ranking reranking fusion hybrid
+keyword lexical semantic similarity cosine distance quantization compression cluster
+centroid partition shard replica cache memory storage disk bandwidth processor thread
+pipeline preprocessing extraction cleaning tokenization segmentation classifier boundary
+transformer encoder attention layer network parameter gradient optimizer training dataset
+document metadata chunk paragraph sentence citation reference appendix figure table
+experiment baseline ablation variance deviation distribution sample estimator metric
+hypothesis generator prompt response answer context window budget scheduler batch queue
+server request client protocol endpoint timeout deadline backpressure monitoring telemetry
+""".split()
+FUNCTION_WORDS = "the of and to in a is for with on by as that".split()
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: Path, pages: List[List[str]]) -> None:
+    """
+    Write a PDF whose pages contain the given lines in Helvetica.
+
+    Args:
+        path (Path): Output file
+        pages (List[List[str]]): Lines of text for each page (ASCII)
+    """
+    count = len(pages)
+    font_id = 3 + 2 * count
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(f'{3 + 2 * i} 0 R' for i in range(count))}] /Count {count} >>".encode()
+    ]
+    for i, lines in enumerate(pages):
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>".encode()
+        )
+        stream = ("BT /F1 10 Tf 12 TL 56 760 Td " + " ".join(f"({_escape(line)}) '" for line in lines) + " ET").encode()
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    Path(path).write_bytes(bytes(out))
+
+
+def synthetic_pages(rng: random.Random, pages: int, lines_per_page: int, line_width: int = 90) -> List[List[str]]:
+    """Wrapped prose for one document, with headers, page numbers and hyphenation."""
+    title = " ".join(rng.choice(CONTENT_WORDS) for _ in range(4)).title()
+    document = []
+    for page_number in range(1, pages + 1):
+        lines, line = [title], []
+        while len(lines) < lines_per_page:
+            sentence = [rng.choice(FUNCTION_WORDS) if rng.random() < 0.12 else rng.choice(CONTENT_WORDS)
+                        for _ in range(rng.randint(8, 20))]
+            sentence[0] = sentence[0].capitalize()
+            sentence[-1] += "." if rng.random() > 0.05 else "?"
+            for word in sentence:
+                if sum(len(w) + 1 for w in line) + len(word) > line_width:
+                    if len(word) > 7 and rng.random() < 0.2:
+                        cut = len(word) // 2
+                        line.append(word[:cut] + "-")
+                        word = word[cut:]
+                    lines.append(" ".join(line))
+                    line = []
+                line.append(word)
+        lines.append("")
+        lines.append(str(page_number))
+        document.append(lines)
+    return document
+
+
+def generate_corpus(
+    out_dir: Path,
+    documents: int = 10,
+    pages: int = 20,
+    lines_per_page: int = 50,
+    seed: int = 0
+) -> List[Path]:
+    """
+    Write a reproducible corpus of synthetic PDFs.
+
+    Args:
+        out_dir (Path): Directory the PDFs are written to
+        documents (int): Number of PDFs
+        pages (int): Pages per PDF
+        lines_per_page (int): Text lines per page
+        seed (int): Random seed; the same arguments always produce the same files
+
+    Returns:
+        List[Path]: Paths of the generated PDFs
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for i in range(documents):
+        path = out_dir / f"synthetic_{i:05d}.pdf"
+        write_pdf(path, synthetic_pages(rng, pages, lines_per_page))
+        paths.append(path)
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--documents", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--lines-per-page", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    paths = generate_corpus(args.out_dir, args.documents, args.pages, args.lines_per_page, args.seed)
+    size = sum(path.stat().st_size for path in paths) / 1e6
+    print(f"Wrote {len(paths)} PDFs ({size:.1f}MB) to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
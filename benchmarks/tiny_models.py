@@ -0,0 +1,127 @@
+"""
+Build tiny randomly initialized models that stand in for the real ones.
+
+Both models share a byte-level BPE tokenizer trained on the given texts:
+a RoBERTa sequence classifier for ChunkingPipeline boundaries and a
+sentence-transformers encoder (RoBERTa + mean pooling) for Embedder. They
+are saved as local directories, so nothing is downloaded. Their outputs are
+meaningless; only their cost profile matters for benchmarking.
+
+Usage:
+    python benchmarks/tiny_models.py models/tiny --corpus data/synthetic
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Iterable
+
+import torch
+from sentence_transformers import SentenceTransformer, models
+from tokenizers import ByteLevelBPETokenizer
+from transformers import RobertaConfig, RobertaForSequenceClassification, RobertaModel, RobertaTokenizerFast
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from utils.text_extracting import PDFTextExtractor
+
+
+def build_tiny_models(
+    out_dir: Path,
+    texts: Iterable[str],
+    vocab_size: int = 4000,
+    hidden_size: int = 64,
+    layers: int = 2,
+    max_length: int = 512,
+    boundary_shift: float = -3.0,
+    seed: int = 0
+) -> Dict[str, str]:
+    """
+    Create the classifier and embedding models, reusing them if they exist.
+
+    Args:
+        out_dir (Path): Directory holding "classifier" and "embedder" subdirectories
+        texts (Iterable[str]): Text the tokenizer is trained and the classifier calibrated on
+        vocab_size (int): Tokenizer vocabulary size
+        hidden_size (int): Transformer width, also the embedding dimension
+        layers (int): Transformer layers
+        max_length (int): Maximum sequence length in tokens
+        boundary_shift (float): Mean boundary logit; with ChunkingPipeline's
+            default threshold of 0.1 about one candidate in five closes a chunk
+        seed (int): Seed for tokenizer training and weight initialization
+
+    Returns:
+        Dict[str, str]: Paths of the "classifier" and "embedder" models
+    """
+    out_dir = Path(out_dir)
+    paths = {"classifier": out_dir / "classifier", "embedder": out_dir / "embedder"}
+    spec = {"vocab_size": vocab_size, "hidden_size": hidden_size, "layers": layers,
+            "max_length": max_length, "boundary_shift": boundary_shift, "seed": seed}
+    spec_path = out_dir / "spec.json"
+    if spec_path.exists() and json.loads(spec_path.read_text()) == spec:
+        return {name: str(path) for name, path in paths.items()}
+
+    torch.manual_seed(seed)
+    texts = [sentence for text in texts for sentence in text.split(". ") if sentence.strip()]
+    tokenizer_dir = out_dir / "tokenizer"
+    tokenizer_dir.mkdir(parents=True, exist_ok=True)
+    bpe = ByteLevelBPETokenizer()
+    bpe.train_from_iterator(texts, vocab_size=vocab_size, special_tokens=["<s>", "<pad>", "</s>", "<unk>", "<mask>"])
+    bpe.save_model(str(tokenizer_dir))
+    tokenizer = RobertaTokenizerFast(
+        str(tokenizer_dir / "vocab.json"), str(tokenizer_dir / "merges.txt"), model_max_length=max_length
+    )
+
+    config = RobertaConfig(
+        vocab_size=len(tokenizer),
+        hidden_size=hidden_size,
+        num_hidden_layers=layers,
+        num_attention_heads=max(1, hidden_size // 32),
+        intermediate_size=4 * hidden_size,
+        max_position_embeddings=max_length + 2,
+        pad_token_id=tokenizer.pad_token_id,
+        bos_token_id=tokenizer.bos_token_id,
+        eos_token_id=tokenizer.eos_token_id
+    )
+    classifier = RobertaForSequenceClassification(config).eval()
+    # Random weights give nearly the same boundary logit for every input, so
+    # chunks would close after every sentence or never. Standardize the
+    # boundary margin over sample sentences and shift it instead.
+    sample = tokenizer(texts[:256], truncation=True, max_length=64, padding=True, return_tensors="pt")
+    with torch.no_grad():
+        out_proj = classifier.classifier.out_proj
+        out_proj.weight[0].zero_()
+        out_proj.bias.zero_()
+        margins = classifier(**sample).logits[:, 1]
+        out_proj.weight[1] /= margins.std()
+        out_proj.bias[1] = boundary_shift - margins.mean() / margins.std()
+    classifier.save_pretrained(paths["classifier"])
+    tokenizer.save_pretrained(paths["classifier"])
+
+    encoder_dir = out_dir / "encoder"
+    RobertaModel(config).save_pretrained(encoder_dir)
+    tokenizer.save_pretrained(encoder_dir)
+    transformer = models.Transformer(str(encoder_dir), max_seq_length=max_length)
+    pooling = models.Pooling(transformer.get_word_embedding_dimension(), pooling_mode="mean")
+    SentenceTransformer(modules=[transformer, pooling], device="cpu").save(str(paths["embedder"]))
+
+    spec_path.write_text(json.dumps(spec))
+    return {name: str(path) for name, path in paths.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--corpus", type=Path, required=True, help="Directory of PDFs to train the tokenizer on")
+    parser.add_argument("--hidden-size", type=int, default=64)
+    parser.add_argument("--layers", type=int, default=2)
+    args = parser.parse_args()
+
+    texts = (PDFTextExtractor(path).extract_text() or "" for path in sorted(args.corpus.glob("*.pdf")))
+    paths = build_tiny_models(args.out_dir, texts, hidden_size=args.hidden_size, layers=args.layers)
+    for name, path in paths.items():
+        print(f"{name:<10s} {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,12 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+
 def main():
-    print("Hello from hag!")
+    from server import main as serve
+    serve()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,158 @@
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List, Optional
+import numpy as np
+from indexer import Indexer
+from utils.query_cache import normalize_query
+
+
+logger = logging.getLogger(__name__)
+
+
+class HypothesisGenerator(ABC):
+    """Produces hypothetical documents that might answer a query."""
+
+    @abstractmethod
+    def generate(self, query: str, seed: int) -> str:
+        """
+        Write one hypothetical document for a query.
+
+        Args:
+            query (str): User query
+            seed (int): Index of the hypothesis, used to vary the output
+
+        Returns:
+            str: Hypothetical passage
+        """
+
+
+class TemplateGenerator(HypothesisGenerator):
+    """Deterministic local generator that fills the query into fixed templates."""
+
+    TEMPLATES = (
+        "{query}",
+        "This passage explains {query} in detail.",
+        "The answer to the question {query} is described in the following section.",
+        "Background: {query}. Key concepts, definitions and results are summarized here."
+    )
+
+    def generate(self, query: str, seed: int) -> str:
+        return self.TEMPLATES[seed % len(self.TEMPLATES)].format(query=query)
+
+
+class HyDERetriever:
+    """
+    Hypothetical Document Embeddings retrieval on top of an Indexer.
+
+    For each query, ``num_hypotheses`` hypothetical documents are generated
+    concurrently, embedded in one batch together with the query, and their
+    mean vector is searched. Generation that does not finish within
+    ``timeout`` seconds is dropped; if no hypothesis arrives in time the
+    query is answered by plain dense retrieval. Complete hypothesis sets are
+    memoized per normalized query, so repeated traffic generates only once.
+
+    A timed-out call cannot be interrupted and keeps its thread until the
+    generator returns. Calls are only started while fewer than
+    ``max_workers`` are running, so new queries never queue behind stuck
+    ones; while every thread is busy, queries go straight to plain retrieval.
+    """
+
+    def __init__(
+        self,
+        indexer: Indexer,
+        generator: HypothesisGenerator,
+        num_hypotheses: int = 4,
+        timeout: float = 5.0,
+        include_query: bool = True,
+        cache_size: int = 1024,
+        max_workers: Optional[int] = None
+    ):
+        """
+        Args:
+            indexer (Indexer): Index to search
+            generator (HypothesisGenerator): Source of hypothetical documents
+            num_hypotheses (int): Hypotheses generated per query
+            timeout (float): Seconds to wait for generation before falling back
+            include_query (bool): Pool the query embedding with the hypotheses
+            cache_size (int): Queries whose hypotheses are memoized (LRU)
+            max_workers (int, optional): Generator calls running at once, including
+                timed-out ones still running (default: num_hypotheses)
+        """
+        self.indexer = indexer
+        self.generator = generator
+        self.num_hypotheses = num_hypotheses
+        self.timeout = timeout
+        self.include_query = include_query
+        self.cache_size = cache_size
+        max_workers = max_workers or num_hypotheses
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        # One slot per thread, released when the call returns, even after a timeout
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._hypotheses: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def hypotheses(self, query: str) -> List[str]:
+        """
+        Return memoized hypotheses for a query or generate them.
+
+        Returns:
+            List[str]: Hypotheses that finished within the timeout, possibly empty
+        """
+        key = normalize_query(query)
+        with self._lock:
+            if key in self._hypotheses:
+                self._hypotheses.move_to_end(key)
+                return self._hypotheses[key]
+
+        futures = []
+        for seed in range(self.num_hypotheses):
+            if not self._slots.acquire(blocking=False):
+                break
+            future = self._executor.submit(self.generator.generate, query, seed)
+            future.add_done_callback(lambda _: self._slots.release())
+            futures.append(future)
+        if len(futures) < self.num_hypotheses:
+            logger.warning(f"Generator busy: started {len(futures)} of {self.num_hypotheses} hypotheses")
+        done, pending = wait(futures, timeout=self.timeout)
+
+        hypotheses = []
+        for future in futures:
+            if future not in done:
+                continue
+            try:
+                hypotheses.append(future.result())
+            except Exception as e:
+                logger.warning(f"Hypothesis generation failed: {e}")
+
+        if pending:
+            logger.warning(f"{len(pending)} of {self.num_hypotheses} hypotheses timed out after {self.timeout}s")
+        elif len(hypotheses) == self.num_hypotheses:
+            with self._lock:
+                self._hypotheses[key] = hypotheses
+                while len(self._hypotheses) > self.cache_size:
+                    self._hypotheses.popitem(last=False)
+        return hypotheses
+
+    def search(self, query: str, top_k: int = 5):
+        """
+        Retrieve documents for a query using its pooled hypothesis embedding.
+
+        Returns:
+            Tuple[List[str], np.ndarray]: Documents and FAISS scores, as Indexer.search
+        """
+        hypotheses = self.hypotheses(query)
+        if not hypotheses:
+            logger.info("No hypotheses available, falling back to plain retrieval")
+            return self.indexer.search(query, top_k)
+
+        texts = [query] + hypotheses if self.include_query else hypotheses
+        vectors = self.indexer._prepare_vectors(self.indexer.embedder.embed_batch(texts))
+        pooled = self.indexer._prepare_vectors(vectors.mean(axis=0, keepdims=True))
+        ids, scores = self.indexer._dense_search(pooled, top_k)
+        return [self.indexer.documents[i] for i in ids], scores
@@ -1,20 +1,562 @@
+import json
+import logging
+import os
+import time
+from pathlib import Path
 import faiss
 import numpy as np
-from utils.embedding_utils import embed_text
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+from utils.embedding_utils import Embedder
+from utils.chunk_store import ChunkStore
+from utils.document_store import DocumentStore
+from utils.index_factory import build_index, min_training_vectors, set_search_params
+from utils.bm25 import BM25Index
+from utils.fusion import reciprocal_rank_fusion, weighted_fusion
+from utils.query_cache import QueryCache
+from utils.vector_store import VectorStore
+from utils.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+class BatchSearchResults:
+    """
+    Dense results of a batch of queries as (n_queries, top_k) arrays.
+
+    Rows are padded with id -1 where fewer than top_k chunks were found.
+    Chunk texts are only decoded when ``documents`` is called.
+    """
+
+    def __init__(self, ids: np.ndarray, scores: np.ndarray, store: DocumentStore):
+        self.ids = ids
+        self.scores = scores
+        self._store = store
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def documents(self, row: int) -> List[str]:
+        """Chunk texts of one query's results, best first."""
+        return [self._store[i] for i in self.ids[row] if i != -1]
+
+    def metadata(self, row: int) -> List[Dict]:
+        """Source, page and chunk id of one query's results, best first."""
+        return [self._store.metadata(i) for i in self.ids[row] if i != -1]
+
 
 class Indexer:
-    def __init__(self, embedding_dim=384):
+    INDEX_FILE = "index.faiss"
+    CONFIG_FILE = "indexer.json"
+    DOC_MAP_FILE = "doc_chunks.json"
+    # Candidates fetched from each retriever per requested hybrid result
+    HYBRID_DEPTH = 4
+    # Fraction of indexed vectors that may be tombstoned before the index is
+    # rebuilt; searches over-fetch by the tombstone count, so this bounds it
+    MAX_TOMBSTONE_FRACTION = 0.1
+
+    def __init__(
+        self,
+        embedding_dim=384,
+        embedder: Optional[Embedder] = None,
+        embedding_model: str = 'sentence-transformers/all-MiniLM-L6-v2',
+        index_type: str = "flat",
+        metric: str = "l2",
+        nlist: int = 1024,
+        hnsw_m: int = 32,
+        pq_m: int = 16,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        train_size: int = 100_000,
+        keyword_index: bool = True,
+        query_cache: Optional[QueryCache] = None,
+        rerank: int = 0
+    ):
+        """
+        Args:
+            embedding_dim (int): Dimension of the document embeddings
+            embedder (Embedder, optional): Embedder to use instead of loading embedding_model
+            embedding_model (str): Sentence-transformer model loaded on first use
+            index_type (str): "flat", "hnsw", "ivf_flat", "ivf_pq", or the compressed
+                flat types "pq", "sq8" and "sq_fp16"
+            metric (str): "l2", "ip" or "cosine"; cosine normalizes vectors and queries
+            nlist (int): IVF coarse clusters. IVF indexes are trained on the first
+                batch added unless ``train`` was called, and training needs at
+                least nlist vectors: add a first batch of at least that size,
+                call ``train`` on a sample beforehand, or lower nlist for small
+                collections (about 4 * sqrt(n) clusters for n vectors)
+            hnsw_m (int): HNSW neighbours per node
+            pq_m (int): PQ sub-quantizers, must divide embedding_dim
+            nprobe (int, optional): IVF clusters visited per query
+            ef_search (int, optional): HNSW candidate list size per query
+            train_size (int): Maximum vectors sampled to train IVF indexes
+            keyword_index (bool): Maintain a BM25 index for keyword and hybrid search
+            query_cache (QueryCache, optional): Cache consulted before every search and
+                invalidated whenever the index changes
+            rerank (int): Cascade search when positive: the index (typically a
+                compressed one, "sq8" or "pq") returns rerank * top_k candidates,
+                which are re-scored exactly against float32 vectors kept in
+                memory-mapped files rather than in RAM (unsaved ones in a
+                temporary file, see utils.vector_store)
+        """
         self.embedding_dim = embedding_dim
-        self.index = faiss.IndexFlatL2(embedding_dim)
-        self.documents = []
-
-    def add_documents(self, docs: list[str]):
-        embeddings = np.array([embed_text(doc) for doc in docs], dtype='float32')
-        self.index.add(embeddings)
-        self.documents.extend(docs)
-
-    def search(self, query: str, top_k=5):
-        query_embedding = np.array([embed_text(query)], dtype='float32')
-        distances, indices = self.index.search(query_embedding, top_k)
-        results = [self.documents[i] for i in indices[0]]
-        return results, distances[0]
\ No newline at end of file
+        self.embedding_model = embedder.model_name if embedder is not None else embedding_model
+        self._embedder = embedder
+        self.index_config = {
+            "index_type": index_type,
+            "metric": metric,
+            "nlist": nlist,
+            "hnsw_m": hnsw_m,
+            "pq_m": pq_m
+        }
+        self.metric = metric
+        self.train_size = train_size
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.query_cache = query_cache
+        self.rerank = rerank
+        # Full-precision copies of the indexed vectors, row = chunk id
+        self.vectors = VectorStore(embedding_dim) if rerank > 0 else None
+        # FAISS ids are chunk ids: positions in self.documents, stable across removals
+        self.index = faiss.IndexIDMap2(build_index(
+            embedding_dim, index_type, metric, nlist=nlist, hnsw_m=hnsw_m, pq_m=pq_m
+        ))
+        self.set_search_params()
+        self.documents = DocumentStore()
+        self.keyword_index = BM25Index() if keyword_index else None
+        self.doc_chunks: Dict[str, List[int]] = {}
+        # Removed chunk ids still held by an index that cannot delete (HNSW)
+        self._tombstones = np.empty(0, dtype=np.int64)
+
+    @property
+    def embedder(self) -> Embedder:
+        """Embedding model, loaded on first use."""
+        if self._embedder is None:
+            self._embedder = Embedder(self.embedding_model)
+        return self._embedder
+
+    def set_search_params(self, nprobe: Optional[int] = None, ef_search: Optional[int] = None):
+        """Change the runtime search knobs of the index."""
+        if nprobe is not None:
+            self.nprobe = nprobe
+        if ef_search is not None:
+            self.ef_search = ef_search
+        set_search_params(self.index, nprobe=self.nprobe, ef_search=self.ef_search)
+        self._invalidate_cache()
+
+    def _invalidate_cache(self):
+        if self.query_cache is not None:
+            self.query_cache.invalidate()
+
+    def _prepare_vectors(self, vectors: np.ndarray) -> np.ndarray:
+        if self.metric != "cosine":
+            return np.ascontiguousarray(vectors, dtype='float32')
+        vectors = np.array(vectors, dtype='float32', order='C', copy=True)
+        faiss.normalize_L2(vectors)
+        return vectors
+
+    def train(self, embeddings: np.ndarray):
+        """
+        Train the index on a sample of the given embeddings.
+
+        Flat and HNSW indexes need no training; IVF, PQ and SQ indexes are
+        trained automatically on the first batch added if this is not called.
+        """
+        if self.index.is_trained:
+            return
+        minimum = min_training_vectors(self.index_config["index_type"], self.index_config["nlist"])
+        if len(embeddings) < minimum:
+            raise ValueError(
+                f"Training a {self.index_config['index_type']} index needs at least {minimum} vectors, "
+                f"got {len(embeddings)}"
+            )
+        if len(embeddings) > self.train_size:
+            sample = np.random.default_rng(0).choice(len(embeddings), self.train_size, replace=False)
+            embeddings = embeddings[np.sort(sample)]
+        self.index.train(self._prepare_vectors(embeddings))
+
+    def _add_vectors(self, embeddings: np.ndarray, ids: np.ndarray):
+        if not self.index.is_trained:
+            self.train(embeddings)
+        vectors = self._prepare_vectors(embeddings)
+        self.index.add_with_ids(vectors, ids)
+        if self.vectors is not None:
+            self.vectors.extend(vectors)
+
+    def add_embeddings(
+        self,
+        embeddings: np.ndarray,
+        docs: list[str],
+        doc_id: Optional[str] = None,
+        pages: Optional[list[Optional[int]]] = None,
+        chunk_ids: Optional[list[int]] = None
+    ):
+        """
+        Add precomputed embeddings together with their chunk texts.
+
+        Args:
+            embeddings (np.ndarray): Matrix of shape (len(docs), embedding_dim)
+            docs (list[str]): Chunk texts
+            doc_id (str, optional): Source document, needed to remove or replace it later
+            pages (list[Optional[int]], optional): Page each chunk starts on
+            chunk_ids (list[int], optional): Id of each chunk within its document
+
+        Returns:
+            np.ndarray: Chunk ids assigned to the added chunks
+        """
+        if len(embeddings) != len(docs):
+            raise ValueError(f"Got {len(embeddings)} embeddings for {len(docs)} documents")
+        ids = np.arange(len(self.documents), len(self.documents) + len(docs), dtype=np.int64)
+        with metrics.span("indexer.add_vectors", items=len(docs)):
+            self._add_vectors(embeddings, ids)
+        self.documents.extend(docs, source=doc_id, pages=pages, chunk_ids=chunk_ids)
+        if self.keyword_index is not None:
+            with metrics.span("indexer.add_keywords", items=len(docs)):
+                self.keyword_index.add(docs)
+        if doc_id is not None:
+            self.doc_chunks.setdefault(doc_id, []).extend(ids.tolist())
+        self._invalidate_cache()
+        return ids
+
+    def add_documents(self, docs: list[str], doc_id: Optional[str] = None):
+        return self.add_embeddings(self.embedder.embed_batch(docs), docs, doc_id=doc_id)
+
+    def remove_document(self, doc_id: str) -> int:
+        """
+        Remove every chunk of a document from dense and keyword search.
+
+        Returns:
+            int: Number of chunks removed
+        """
+        ids = np.asarray(self.doc_chunks.pop(doc_id, []), dtype=np.int64)
+        if not len(ids):
+            return 0
+        try:
+            self.index.remove_ids(ids)
+        except RuntimeError:
+            self._tombstones = np.union1d(self._tombstones, ids)
+            if len(self._tombstones) > self.MAX_TOMBSTONE_FRACTION * self.index.ntotal:
+                self._rebuild_index()
+        if self.keyword_index is not None:
+            self.keyword_index.remove(ids.tolist())
+        self._invalidate_cache()
+        return len(ids)
+
+    def _rebuild_index(self):
+        """Re-create an index that cannot delete (HNSW) from its live vectors, clearing the tombstones."""
+        ids = faiss.vector_to_array(self.index.id_map)
+        live = ~np.isin(ids, self._tombstones)
+        # Stored vectors are already prepared (normalized for cosine)
+        vectors = self.index.index.reconstruct_n(0, self.index.ntotal)[live]
+        logger.info(f"Rebuilding index without its {len(self._tombstones)} removed vectors")
+        index = faiss.IndexIDMap2(build_index(self.embedding_dim, **self.index_config))
+        index.add_with_ids(vectors, ids[live])
+        self.index = index
+        self._tombstones = np.empty(0, dtype=np.int64)
+        set_search_params(self.index, nprobe=self.nprobe, ef_search=self.ef_search)
+
+    def upsert_document(
+        self,
+        doc_id: str,
+        chunks: list[str],
+        embeddings: Optional[np.ndarray] = None,
+        pages: Optional[list[Optional[int]]] = None,
+        chunk_ids: Optional[list[int]] = None
+    ):
+        """
+        Replace the chunks of a document, adding it if it is new.
+
+        Args:
+            doc_id (str): Source document
+            chunks (list[str]): Its current chunk texts
+            embeddings (np.ndarray, optional): Precomputed chunk embeddings
+            pages (list[Optional[int]], optional): Page each chunk starts on
+            chunk_ids (list[int], optional): Id of each chunk within the document
+
+        Returns:
+            np.ndarray: Chunk ids assigned to the new chunks
+        """
+        if embeddings is None:
+            embeddings = self.embedder.embed_batch(chunks)
+        self.remove_document(doc_id)
+        return self.add_embeddings(embeddings, chunks, doc_id=doc_id, pages=pages, chunk_ids=chunk_ids)
+
+    def add_store(self, store: ChunkStore):
+        """
+        Apply a ChunkStore without re-embedding.
+
+        The store's document log is replayed in order, so documents appended
+        again replace their earlier chunks and deleted documents are removed.
+        The embedding file is memory-mapped and read one document at a time.
+        """
+        if store.dim != self.embedding_dim:
+            raise ValueError(f"Store has dim={store.dim}, index expects {self.embedding_dim}")
+        embeddings = store.embeddings()
+        if not self.index.is_trained and len(embeddings):
+            self.train(embeddings)
+        records = list(store.records())
+        texts = [record["text"] for record in records]
+        pages = [record.get("page") for record in records]
+        chunk_ids = [record["chunk_id"] for record in records]
+        for entry in store.documents():
+            if entry.get("deleted"):
+                self.remove_document(entry["doc_id"])
+                continue
+            rows = slice(entry["start"], entry["start"] + entry["count"])
+            self.upsert_document(entry["doc_id"], texts[rows], embeddings[rows],
+                                 pages=pages[rows], chunk_ids=chunk_ids[rows])
+
+    def _embed_query(self, query: str) -> np.ndarray:
+        return self._prepare_vectors(self.embedder.embed_batch([query]))
+
+    def _dense_search(self, query_embedding: np.ndarray, top_k: int):
+        ids, scores = self._search_vectors(query_embedding, top_k)
+        found = ids[0] != -1
+        return ids[0][found], scores[0][found]
+
+    def _search_vectors(self, query_embeddings: np.ndarray, top_k: int):
+        """Search many prepared query vectors, dropping tombstoned ids and padding with -1."""
+        if self.vectors is not None:
+            _, candidates = self.index.search(query_embeddings, top_k * self.rerank + len(self._tombstones))
+            return self._rescore(query_embeddings, candidates, top_k)
+        distances, indices = self.index.search(query_embeddings, top_k + len(self._tombstones))
+        if not len(self._tombstones):
+            return indices, distances
+        ids = np.full((len(indices), top_k), -1, dtype=np.int64)
+        scores = np.full((len(indices), top_k), np.nan, dtype=np.float32)
+        for row, (found_ids, found_scores) in enumerate(zip(indices, distances)):
+            keep = (found_ids != -1) & ~np.isin(found_ids, self._tombstones)
+            kept = found_ids[keep][:top_k]
+            ids[row, :len(kept)] = kept
+            scores[row, :len(kept)] = found_scores[keep][:top_k]
+        return ids, scores
+
+    def _rescore(self, query_embeddings: np.ndarray, candidates: np.ndarray, top_k: int):
+        """Second stage of cascade search: exact scores of the first stage's candidates."""
+        ids = np.full((len(candidates), top_k), -1, dtype=np.int64)
+        scores = np.full((len(candidates), top_k), np.nan, dtype=np.float32)
+        for row, (query, found) in enumerate(zip(query_embeddings, candidates)):
+            found = found[found != -1]
+            if len(self._tombstones):
+                found = found[~np.isin(found, self._tombstones)]
+            if not len(found):
+                continue
+            vectors = self.vectors.take(found)
+            if self.metric == "l2":
+                exact = np.square(vectors - query).sum(axis=1)
+                order = np.argsort(exact, kind="stable")[:top_k]
+            else:
+                exact = vectors @ query
+                order = np.argsort(-exact, kind="stable")[:top_k]
+            ids[row, :len(order)] = found[order]
+            scores[row, :len(order)] = exact[order]
+        return ids, scores
+
+    def iter_search_batch(
+        self,
+        queries: Iterable[str],
+        top_k: int = 5,
+        batch_size: int = 1024
+    ) -> Iterator[BatchSearchResults]:
+        """
+        Stream dense results for an arbitrarily long iterable of queries.
+
+        Queries are embedded and searched ``batch_size`` at a time, so a
+        query file can be processed without holding it in memory.
+
+        Args:
+            queries (Iterable[str]): Query texts, e.g. lines of a file
+            top_k (int): Number of results per query
+            batch_size (int): Queries embedded and searched per FAISS call
+
+        Yields:
+            BatchSearchResults: Results of each batch, in query order
+        """
+        queries = iter(queries)
+        while True:
+            batch = list(islice(queries, batch_size))
+            if not batch:
+                return
+            with metrics.span("indexer.search_batch", items=len(batch)):
+                ids, scores = self._search_vectors(self._prepare_vectors(self.embedder.embed_batch(batch)), top_k)
+            metrics.observe("indexer.search_batch_size", len(batch))
+            yield BatchSearchResults(ids, scores, self.documents)
+
+    def search_batch(self, queries: List[str], top_k: int = 5, batch_size: int = 1024) -> BatchSearchResults:
+        """
+        Dense search for many queries with batched embedding and FAISS calls.
+
+        Args:
+            queries (List[str]): Query texts
+            top_k (int): Number of results per query
+            batch_size (int): Queries embedded and searched per FAISS call
+
+        Returns:
+            BatchSearchResults: ids and scores of shape (len(queries), top_k)
+        """
+        batches = list(self.iter_search_batch(queries, top_k, batch_size))
+        if not batches:
+            empty = np.empty((0, top_k))
+            return BatchSearchResults(empty.astype(np.int64), empty.astype(np.float32), self.documents)
+        return BatchSearchResults(
+            np.concatenate([batch.ids for batch in batches]),
+            np.concatenate([batch.scores for batch in batches]),
+            self.documents
+        )
+
+    def search(self, query: str, top_k=5, mode: str = "dense", fusion: str = "rrf", alpha: float = 0.5):
+        """
+        Retrieve the documents best matching a query.
+
+        With a query cache, exact and semantically similar repeats of an
+        earlier query with the same parameters are answered from the cache.
+
+        Args:
+            query (str): Query text
+            top_k (int): Number of results
+            mode (str): "dense" (FAISS), "keyword" (BM25) or "hybrid" (both, fused)
+            fusion (str): Hybrid fusion method, "rrf" or "weighted"
+            alpha (float): Weight of the dense scores in weighted fusion
+
+        Returns:
+            Tuple[List[str], np.ndarray]: Documents and their scores; FAISS
+            distances in dense mode, BM25 scores in keyword mode and fused
+            scores in hybrid mode
+        """
+        if self.query_cache is None:
+            with metrics.span("indexer.search", items=1):
+                return self._search(query, top_k, mode, fusion, alpha)
+
+        start = time.perf_counter()
+        params = (top_k, mode, fusion, alpha)
+        query_embedding = None
+        cached = self.query_cache.get(query, params)
+        if cached is None:
+            if mode != "keyword":
+                query_embedding = self._embed_query(query)
+            cached = self.query_cache.get_similar(query_embedding, params)
+
+        if cached is None:
+            with metrics.span("indexer.search", items=1):
+                results, scores = self._search(query, top_k, mode, fusion, alpha, query_embedding)
+            self.query_cache.put(query, params, (results, scores), query_embedding)
+        else:
+            results, scores = cached
+        metrics.count("query_cache.hits" if cached is not None else "query_cache.misses")
+        self.query_cache.record_latency(cached is not None, time.perf_counter() - start)
+        return list(results), scores.copy()
+
+    def _search(self, query: str, top_k: int, mode: str, fusion: str, alpha: float, query_embedding=None):
+        if mode in ("dense", "hybrid") and query_embedding is None:
+            query_embedding = self._embed_query(query)
+
+        if mode == "dense":
+            ids, scores = self._dense_search(query_embedding, top_k)
+            return [self.documents[i] for i in ids], scores
+        if mode not in ("keyword", "hybrid"):
+            raise ValueError(f"Unknown search mode: {mode}")
+        if self.keyword_index is None:
+            raise ValueError(f"Search mode {mode!r} requires keyword_index=True")
+
+        if mode == "keyword":
+            ids, scores = self.keyword_index.search(query, top_k)
+            return [self.documents[i] for i in ids], scores
+
+        depth = top_k * self.HYBRID_DEPTH
+        dense_ids, distances = self._dense_search(query_embedding, depth)
+        lexical_ids, lexical_scores = self.keyword_index.search(query, depth)
+        if fusion == "rrf":
+            ids, scores = reciprocal_rank_fusion([dense_ids, lexical_ids], top_k)
+        elif fusion == "weighted":
+            similarities = -distances if self.metric == "l2" else distances
+            ids, scores = weighted_fusion((dense_ids, similarities), (lexical_ids, lexical_scores), top_k, alpha)
+        else:
+            raise ValueError(f"Unknown fusion method: {fusion}")
+        return [self.documents[i] for i in ids], np.asarray(scores, dtype='float32')
+
+    def save(self, path: str | Path):
+        """
+        Persist the FAISS index, the documents and the indexer configuration.
+
+        Args:
+            path (str | Path): Target directory, created if missing
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        index_tmp = path / (self.INDEX_FILE + ".tmp")
+        faiss.write_index(self.index, str(index_tmp))
+        os.replace(index_tmp, path / self.INDEX_FILE)
+        self.documents.save(path)
+        if self.vectors is not None:
+            self.vectors.save(path)
+        if self.keyword_index is not None:
+            self.keyword_index.save(path)
+        (path / self.DOC_MAP_FILE).write_text(json.dumps({
+            "doc_chunks": self.doc_chunks,
+            "tombstones": self._tombstones.tolist()
+        }))
+        (path / self.CONFIG_FILE).write_text(json.dumps({
+            "embedding_dim": self.embedding_dim,
+            "embedding_model": self.embedding_model,
+            **self.index_config,
+            "nprobe": self.nprobe,
+            "ef_search": self.ef_search,
+            "train_size": self.train_size,
+            "keyword_index": self.keyword_index is not None,
+            "rerank": self.rerank
+        }))
+
+    @classmethod
+    def load(
+        cls,
+        path: str | Path,
+        mmap: bool = False,
+        embedder: Optional[Embedder] = None,
+        query_cache: Optional[QueryCache] = None
+    ) -> "Indexer":
+        """
+        Load an indexer written by ``save``.
+
+        Documents, and the vectors cascade search re-scores against, are
+        always memory-mapped and read only where needed. The embedding model
+        is not loaded until the first query or add.
+
+        Args:
+            path (str | Path): Directory the indexer was saved to
+            mmap (bool): Memory-map the FAISS index instead of reading it into
+                RAM; a memory-mapped index is read-only
+            embedder (Embedder, optional): Embedder to reuse instead of loading one
+            query_cache (QueryCache, optional): Cache to put in front of search
+
+        Returns:
+            Indexer: The loaded indexer
+
+        Raises:
+            FileNotFoundError: If keyword search is enabled but its files are missing
+        """
+        path = Path(path)
+        config = json.loads((path / cls.CONFIG_FILE).read_text())
+
+        indexer = cls(embedder=embedder, query_cache=query_cache, **config)
+        io_flags = faiss.IO_FLAG_MMAP | getattr(faiss, "IO_FLAG_MMAP_IFC", 0) if mmap else 0
+        indexer.index = faiss.read_index(str(path / cls.INDEX_FILE), io_flags)
+        indexer.set_search_params()
+        indexer.documents = DocumentStore.load(path)
+        if indexer.vectors is not None:
+            indexer.vectors = VectorStore.load(path, indexer.embedding_dim)
+        if not BM25Index.exists(path):
+            if config.get("keyword_index"):
+                # save always writes it when keyword search is enabled
+                raise FileNotFoundError(
+                    f"Incomplete index at {path}: keyword_index is enabled but {BM25Index.POSTINGS_FILE} is missing"
+                )
+            if indexer.keyword_index is not None:
+                logger.warning(f"Index at {path} predates keyword search; keyword and hybrid search are disabled")
+                indexer.keyword_index = None
+        elif indexer.keyword_index is not None:
+            indexer.keyword_index = BM25Index.load(path)
+        doc_map = json.loads((path / cls.DOC_MAP_FILE).read_text())
+        indexer.doc_chunks = doc_map["doc_chunks"]
+        indexer._tombstones = np.asarray(doc_map["tombstones"], dtype=np.int64)
+        return indexer
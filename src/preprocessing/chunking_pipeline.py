@@ -1,16 +1,67 @@
+import gc
 import logging
+import multiprocessing
+import os
 import re
+import time
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import Any, List, Optional, Dict, Iterable, Iterator, Tuple
 import json
 from utils import ( PDFTextExtractor
-                , clean_text, filter_segments, Embedder )
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
+                , clean_pages, filter_segments, Embedder, ChunkStore )
+from utils.manifest import IngestManifest
+from utils.text_extracting import extraction_pool
+from utils.dedup import DedupManager, DuplicateIndex, MinHasher
+from utils.filters import get_nlp
+from utils.inference_backends import configure_threads
+from utils.metrics import metrics
+from utils.model_registry import model_registry
 import torch
 
 
 logger = logging.getLogger(__name__)
 
+# Pipeline owned by a process-pool worker, built once by _init_worker
+_worker_pipeline: Optional["ChunkingPipeline"] = None
+
+def _init_worker(
+    init_kwargs: Dict,
+    num_threads: int,
+    metrics_enabled: bool = False,
+    dedup_index: Optional[DuplicateIndex] = None
+) -> None:
+    global _worker_pipeline
+    torch.set_num_threads(num_threads)
+    if metrics_enabled:
+        metrics.enable()
+    _worker_pipeline = ChunkingPipeline(**init_kwargs)
+    if dedup_index is not None:
+        # Proxy of the run-wide index served by the parent's DedupManager
+        _worker_pipeline.dedup_index = dedup_index
+
+def _process_in_worker(file_path: Path, output_format: str) -> Tuple[Path, Optional[Any], Optional[Dict]]:
+    result = _worker_pipeline.process_document(file_path, inline_embeddings=output_format == "jsonl")
+    # Metrics recorded in the worker are shipped back with each result
+    recorded = metrics.drain() if metrics.enabled else None
+    return file_path, _pack_result(result, output_format), recorded
+
+def _pack_result(result: Dict, output_format: str) -> Optional[Any]:
+    """
+    Prepare a document result for the output writer, or None if it failed.
+
+    "jsonl" results become one JSON line; "store" results become a
+    JSON-safe document dict and its embedding matrix.
+    """
+    if "error" in result:
+        return None
+    if output_format == "jsonl":
+        return json.dumps(result, default=str)
+    embeddings = result.pop("embeddings")
+    return json.loads(json.dumps(result, default=str)), embeddings
+
 class ChunkingPipeline:
     """Pipeline for processing documents into clean, filtered, and embedded chunks."""
     
@@ -18,23 +69,118 @@ class ChunkingPipeline:
         self,
         embedding_model: str = 'sentence-transformers/all-MiniLM-L6-v2',
         model: str = "roberta-base",
+        embedding_batch_size: int = 64,
+        boundary_threshold: float = 0.1,
+        boundary_batch_size: int = 16,
+        embedding_cache_dir: Optional[str | Path] = None,
+        extract_workers: int = 1,
+        backend: str = "torch",
+        intra_op_threads: Optional[int] = None,
+        inter_op_threads: Optional[int] = None,
+        dedup_threshold: Optional[float] = None,
+        dedup_scope: str = "run",
         log_level: int = logging.INFO
     ):
         """
         Initialize the chunking pipeline.
+
+        Models are loaded on first use through the shared model registry, so
+        pipelines naming the same models share one copy of each.
         
         Args:
             chunk_size (int): Target size for text chunks in characters
             chunk_overlap (int): Number of characters to overlap between chunks
             embedding_model (str): Name of the sentence-transformer model to use
             model (str): Name of the transformer model to use
+            embedding_batch_size (int): Number of chunks embedded per forward pass
+            boundary_threshold (float): Boundary probability above which a chunk is closed
+            boundary_batch_size (int): Number of candidate boundaries scored per forward pass
+            embedding_cache_dir (str | Path, optional): Persistent embedding cache, so
+                unchanged chunks are not re-embedded on later runs
+            extract_workers (int): Processes used to extract the pages of each PDF; one
+                pool is started on first use and reused until ``close``
+            backend (str): Inference backend of both models: "torch" (fp32),
+                "int8" (dynamically quantized PyTorch), "onnx" or "onnx-int8"
+                (ONNX Runtime); see utils.inference_backends
+            intra_op_threads (int, optional): Threads per operator; in worker
+                processes this defaults to the cores divided among the workers
+            inter_op_threads (int, optional): Threads running independent operators
+            dedup_threshold (float, optional): Drop chunks whose estimated Jaccard
+                similarity (MinHash over word shingles) with an earlier chunk is at
+                least this, before they are embedded; None keeps every chunk
+            dedup_scope (str): Earlier chunks compared against: "document" (the same
+                document) or "run" (every document of this pipeline's run, shared
+                with the worker processes of ``process_directory``). With "run", a
+                chunk dropped as a copy of another document's chunk is only kept
+                through that document, even if it is later removed or changed
             log_level (int): Logging level
         """
+        self._init_kwargs = {
+            "embedding_model": embedding_model,
+            "model": model,
+            "embedding_batch_size": embedding_batch_size,
+            "boundary_threshold": boundary_threshold,
+            "boundary_batch_size": boundary_batch_size,
+            "embedding_cache_dir": embedding_cache_dir,
+            "extract_workers": extract_workers,
+            "backend": backend,
+            "intra_op_threads": intra_op_threads,
+            "inter_op_threads": inter_op_threads,
+            "dedup_threshold": dedup_threshold,
+            "dedup_scope": dedup_scope,
+            "log_level": log_level
+        }
         self._configure_logging(log_level)
-        self.embedder = Embedder(embedding_model)
-        self.tokenizer = AutoTokenizer.from_pretrained(model)
-        self.model = AutoModelForSequenceClassification.from_pretrained(model)
-        logger.info(f"Initialized ChunkingPipeline with embedding_model={embedding_model}, model={model}")
+        configure_threads(intra_op_threads, inter_op_threads)
+        self.embedder = Embedder(
+            embedding_model, batch_size=embedding_batch_size, cache_dir=embedding_cache_dir, backend=backend
+        )
+        self.model_name = model
+        self.backend = backend
+        self.boundary_threshold = boundary_threshold
+        self.boundary_batch_size = boundary_batch_size
+        self.extract_workers = extract_workers
+        self._extract_pool: Optional[ProcessPoolExecutor] = None
+        if dedup_scope not in ("document", "run"):
+            raise ValueError(f"Unknown dedup scope: {dedup_scope}")
+        self.dedup_threshold = dedup_threshold
+        self.dedup_scope = dedup_scope
+        self.minhasher = MinHasher()
+        self.dedup_index = (
+            DuplicateIndex(dedup_threshold, self.minhasher.num_perm)
+            if dedup_threshold is not None and dedup_scope == "run" else None
+        )
+        logger.info(
+            f"Initialized ChunkingPipeline with embedding_model={embedding_model}, model={model}, backend={backend}"
+        )
+
+    @property
+    def tokenizer(self):
+        return model_registry.sequence_classifier(self.model_name, backend=self.backend)[0]
+
+    @property
+    def model(self):
+        return model_registry.sequence_classifier(self.model_name, backend=self.backend)[1]
+
+    def preload(self) -> None:
+        """Load the boundary classifier, the embedding model and the spaCy filter pipeline now."""
+        model_registry.sequence_classifier(self.model_name, backend=self.backend)
+        self.embedder.model
+        get_nlp()
+
+    def _extraction_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Pool extracting the pages of every document, or None for in-process extraction."""
+        if self.extract_workers <= 1:
+            return None
+        if self._extract_pool is None:
+            self._extract_pool = extraction_pool(self.extract_workers)
+        return self._extract_pool
+
+    def close(self) -> None:
+        """Shut down the page extraction pool; the next document starts a new one."""
+        if self._extract_pool is not None:
+            self._extract_pool.shutdown()
+            self._extract_pool = None
 
     def _configure_logging(self, log_level: int) -> None:
         """Configure logging with appropriate format and level."""
@@ -46,53 +192,109 @@ class ChunkingPipeline:
             datefmt='%Y-%m-%d %H:%M:%S'
         )
     
+    def _score_buffers(self, buffers: List[List[int]]) -> List[float]:
+        """
+        Score a batch of candidate chunks in one padded forward pass.
+
+        Args:
+            buffers (List[List[int]]): Token ids of each candidate, special tokens included
+
+        Returns:
+            List[float]: Boundary probability for each candidate
+        """
+        metrics.count("chunking.boundary_model_calls")
+        metrics.observe("chunking.boundary_batch_size", len(buffers))
+        encoded = self.tokenizer.pad({"input_ids": buffers}, padding=True, return_tensors="pt")
+        with torch.no_grad():
+            outputs = self.model(**encoded)
+        return torch.softmax(outputs.logits, dim=1)[:, 1].tolist()
+
     def _create_chunks(self, text: str) -> List[str]:
         """
         Split text into candidate chunks using RoBERTa.
         Each chunk is scored for relevance
-        
+
         Args:
             text (str): Input text to be chunked
             
         Returns:
             List[str]: List of text chunks
         """
-        sentences = re.split(r'(?<=[.!?,])\s+', text)
+        return [chunk for _, chunk in self._create_chunk_spans(text)]
+
+    def _create_chunk_spans(self, text: str) -> List[Tuple[int, str]]:
+        """
+        Split text into chunks and report where each one starts.
+
+        Sentences are tokenized once and candidate boundaries are scored
+        in batches of ``boundary_batch_size``. Since the classifier input is
+        truncated to ``model_max_length``, a buffer stops changing once it
+        fills the window; no boundary can fire after that point, so the rest
+        of the text is emitted as the final chunk without further scoring.
+        
+        Args:
+            text (str): Input text to be chunked
+            
+        Returns:
+            List[Tuple[int, str]]: Offset in ``text`` of each chunk's first
+            sentence, and the chunk
+        """
+        breaks = list(re.finditer(r'(?<=[.!?,])\s+', text))
+        starts = [0] + [m.end() for m in breaks]
+        ends = [m.start() for m in breaks] + [len(text)]
+        sentences = [text[a:b] for a, b in zip(starts, ends)]
         logger.info(f"Detected {len(sentences)} sentences for chunking")
-        chunks, buffer = [], []
 
-        for sent in sentences:
-            buffer.append(sent)
-            combined = " ".join(buffer)
+        max_content = self.tokenizer.model_max_length - self.tokenizer.num_special_tokens_to_add()
+        # Token ids of each sentence when it follows another one in the buffer
+        continued = self.tokenizer(
+            [" " + sent for sent in sentences[1:]], add_special_tokens=False
+        )["input_ids"] if len(sentences) > 1 else []
 
-            tokens = self.tokenizer(combined, truncation=True, padding=True, return_tensors="pt", max_length=self.tokenizer.model_max_length)
-            with torch.no_grad():
-                outputs = self.model(**tokens)
-                score = torch.softmax(outputs.logits, dim=1)[0][1].item()
+        chunks = []
+        start, total = 0, len(sentences)
+        while start < total:
+            ids = list(self.tokenizer(sentences[start], add_special_tokens=False)["input_ids"])
+            end, split_at, saturated = start, None, False
 
-            if score > 0.1:
-                logger.info(f" combined: {combined}")
-                chunks.append(combined)
-                buffer = []
+            while split_at is None and end < total and not saturated:
+                candidates, ends = [], []
+                while end < total and len(candidates) < self.boundary_batch_size:
+                    if end > start:
+                        ids.extend(continued[end - 1])
+                    candidates.append(self.tokenizer.build_inputs_with_special_tokens(ids[:max_content]))
+                    ends.append(end)
+                    end += 1
+                    if len(ids) >= max_content:
+                        saturated = True
+                        break
 
-        if buffer:
-            chunks.append(" ".join(buffer))
-        
-        chunks.append(combined)
+                for candidate_end, score in zip(ends, self._score_buffers(candidates)):
+                    if score > self.boundary_threshold:
+                        split_at = candidate_end
+                        break
+
+            if split_at is None:
+                split_at = total - 1
+            chunks.append((starts[start], " ".join(sentences[start:split_at + 1])))
+            start = split_at + 1
 
         return chunks
         
-    def process_document(self, file_path: Path) -> Dict:
+    def process_document(self, file_path: Path, inline_embeddings: bool = True) -> Dict:
         """
         Process a document through the complete pipeline:
         1. Extract text from PDF
         2. Clean the text
         3. Split into chunks
         4. Filter chunks
-        5. Generate embeddings
+        5. Drop near-duplicate chunks (if enabled)
+        6. Generate embeddings
         
         Args:
             file_path (Path): Path to the PDF document
+            inline_embeddings (bool): Store each embedding as a list on its chunk;
+                when False the float32 matrix is returned under "embeddings"
             
         Returns:
             Dict: Processing results including metadata and chunks
@@ -100,71 +302,284 @@ class ChunkingPipeline:
         try:
             extractor = PDFTextExtractor(file_path)
             metadata = extractor.get_pdf_metadata()
-            raw_text = extractor.extract_text()
+            with metrics.span("chunking.extract_clean", items=metadata.get("number_of_pages", 0)):
+                cleaned_text, offsets = clean_pages(
+                    extractor.iter_pages(workers=self.extract_workers, pool=self._extraction_pool())
+                )
             
-            if not raw_text:
+            if not cleaned_text:
                 logger.error(f"No text could be extracted from {file_path}")
                 return {"error": "Text extraction failed"}
-                
-            cleaned_text = clean_text(raw_text)
             
-            chunks = self._create_chunks(cleaned_text)
+            with metrics.span("chunking.create_chunks") as span:
+                spans = self._create_chunk_spans(cleaned_text)
+                span.items = len(spans)
+            chunks = [chunk for _, chunk in spans]
             logger.info(f"Created {len(chunks)} initial chunks")
             
             filtered_chunks = filter_segments(chunks)
             logger.info(f"{len(filtered_chunks)} chunks remained after filtering")
             
+            # filter_segments keeps the order of its input, so kept chunks are
+            # matched back to their spans to recover the page they start on
+            pages, kept = [], iter(filtered_chunks)
+            wanted = next(kept, None)
+            for offset, chunk in spans:
+                if wanted is not None and chunk.strip() == wanted:
+                    pages.append(offsets.locate(offset)[0])
+                    wanted = next(kept, None)
+
+            num_filtered, dedup_stats = len(filtered_chunks), None
+            if self.dedup_threshold is not None:
+                filtered_chunks, pages, dedup_stats = self._drop_duplicates(filtered_chunks, pages, str(file_path))
+            
+            embeddings = self.embedder.embed_batch(filtered_chunks)
             chunk_data = []
-            for i, chunk in enumerate(filtered_chunks):
-                embedding = self.embedder.embed_text(chunk, self.embedder.model)
-                chunk_data.append({
-                    "id": i,
-                    "text": chunk,
-                    "embedding": embedding.tolist()
-                })
+            for i, (chunk, page, embedding) in enumerate(zip(filtered_chunks, pages, embeddings)):
+                chunk_data.append({"id": i, "text": chunk, "page": page})
+                if inline_embeddings:
+                    chunk_data[-1]["embedding"] = embedding.tolist()
                 
             result = {
+                "doc_id": str(file_path),
                 "metadata": metadata,
                 "chunks": chunk_data,
                 "stats": {
                     "initial_chunks": len(chunks),
-                    "filtered_chunks": len(filtered_chunks)
+                    "filtered_chunks": num_filtered
                 }
             }
+            if dedup_stats is not None:
+                result["stats"]["duplicate_chunks"] = dedup_stats
+            if not inline_embeddings:
+                result["embeddings"] = embeddings
+            metrics.count("chunking.documents")
             
             return result
             
         except Exception as e:
+            metrics.count("chunking.failed_documents")
             logger.error(f"Document processing failed: {str(e)}", exc_info=True)
             return {"error": str(e)}
 
-    def process_directory(self, dir_path: Path, out_path: Path) -> None:
+    def _drop_duplicates(
+        self,
+        chunks: List[str],
+        pages: List[int],
+        doc_id: str
+    ) -> Tuple[List[str], List[int], Dict[str, int]]:
+        """
+        Remove near-duplicate chunks, keeping the first copy seen.
+
+        Returns:
+            Tuple[List[str], List[int], Dict[str, int]]: Kept chunks, their
+            pages, and how many chunks duplicated one of the same document
+            ("within_document") or of an earlier one ("across_documents")
+        """
+        with metrics.span("chunking.dedup", items=len(chunks)):
+            index = self.dedup_index
+            if index is None:
+                index = DuplicateIndex(self.dedup_threshold, self.minhasher.num_perm)
+            matches = index.check_and_add(self.minhasher.signatures(chunks), doc_id)
+        stats = {
+            "within_document": sum(match == doc_id for match in matches),
+            "across_documents": sum(match is not None and match != doc_id for match in matches)
+        }
+        metrics.count("chunking.duplicate_chunks", stats["within_document"] + stats["across_documents"])
+        if stats["within_document"] or stats["across_documents"]:
+            logger.info(
+                f"Dropped {stats['within_document']} near-duplicate chunks within the document "
+                f"and {stats['across_documents']} of earlier documents"
+            )
+        kept = [i for i, match in enumerate(matches) if match is None]
+        return [chunks[i] for i in kept], [pages[i] for i in kept], stats
+
+    def _iter_results(
+        self,
+        pdf_files: Iterable[Path],
+        workers: int,
+        max_in_flight: Optional[int],
+        output_format: str,
+        start_method: str = "spawn"
+    ) -> Iterator[Tuple[Path, Optional[Any]]]:
+        """
+        Yield (file, packed result) pairs in completion order.
+
+        With more than one worker, documents are processed in a process pool
+        whose workers each build their own pipeline once. At most
+        ``max_in_flight`` documents are submitted at any time.
+
+        With the "fork" start method the models are loaded in this process
+        before the pool starts, so workers inherit them and share their
+        memory copy-on-write instead of each loading a private copy. Forked
+        workers run PyTorch single-threaded: if this process has already run
+        inference, its OpenMP thread pool does not exist in the children, and
+        their first multi-threaded operator would wait on it forever.
+        """
+        if workers <= 1:
+            for pdf_file in pdf_files:
+                logger.info(f"Processing {pdf_file}")
+                result = self.process_document(pdf_file, inline_embeddings=output_format == "jsonl")
+                yield pdf_file, _pack_result(result, output_format)
+            return
+
+        max_in_flight = max_in_flight or 2 * workers
+        num_threads = max(1, (os.cpu_count() or 1) // workers)
+        init_kwargs = self._init_kwargs
+        files = iter(pdf_files)
+
+        # Spawned workers start without the parent's torch thread pools;
+        # forked ones inherit the models preloaded here, and must not use
+        # the thread pool this process may have started
+        if start_method == "fork":
+            num_threads = 1
+            init_kwargs = {**init_kwargs, "intra_op_threads": 1}
+            self.preload()
+            model_registry.freeze()
+        # Run-wide deduplication needs one index shared by every worker
+        manager = None
+        if self.dedup_index is not None:
+            manager = DedupManager(ctx=multiprocessing.get_context(start_method))
+            manager.start()
+        try:
+            dedup_index = manager.DuplicateIndex(self.dedup_threshold, self.minhasher.num_perm) if manager else None
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context(start_method),
+                initializer=_init_worker,
+                initargs=(init_kwargs, num_threads, metrics.enabled, dedup_index)
+            ) as executor:
+                pending = {executor.submit(_process_in_worker, f, output_format) for f in islice(files, max_in_flight)}
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        file_path, packed, recorded = future.result()
+                        if recorded is not None:
+                            metrics.merge(recorded)
+                        yield file_path, packed
+                        next_file = next(files, None)
+                        if next_file is not None:
+                            pending.add(executor.submit(_process_in_worker, next_file, output_format))
+        finally:
+            if manager is not None:
+                manager.shutdown()
+            if start_method == "fork":
+                gc.unfreeze()
+
+    def process_directory(
+        self,
+        dir_path: Path,
+        out_path: Path,
+        workers: int = 1,
+        max_in_flight: Optional[int] = None,
+        output_format: str = "jsonl",
+        embedding_dtype: str = "float32",
+        incremental: bool = False,
+        start_method: str = "spawn"
+    ) -> Dict[str, List[str]]:
         """
         Process all PDF files in a directory and save results.
+
+        Each document is written as soon as it finishes, so memory does not
+        grow with the corpus and partial output is usable while the run is in
+        progress. The "jsonl" format appends one JSON line per document to
+        ``chunks.jsonl``; the "store" format appends to a ``ChunkStore`` in
+        ``chunk_store/`` with embeddings kept in a binary matrix.
+
+        In incremental mode a manifest (``manifest.json``) of the files
+        already ingested is kept next to the output. Only new or changed PDFs
+        are processed, and PDFs that disappeared are recorded as deletions
+        (``{"doc_id": ..., "deleted": true}`` lines in JSONL). Later entries
+        for a doc_id supersede earlier ones.
         
         Args:
             dir_path (Path): Path to directory containing PDF files
+            out_path (Path): Directory the output is written to
+            workers (int): Number of worker processes (1 processes in-process)
+            max_in_flight (int, optional): Maximum documents queued at once
+                (default: twice the number of workers)
+            output_format (str): "jsonl" or "store"
+            embedding_dtype (str): Embedding dtype of the "store" format, "float32" or "float16"
+            incremental (bool): Skip files unchanged since the previous run
+            start_method (str): How worker processes are started, "spawn" or
+                "fork"; "fork" (POSIX only) loads the models once here and
+                shares them with the workers copy-on-write, and runs each
+                worker single-threaded so it is safe after inference here
+
+        Returns:
+            Dict[str, List[str]]: doc_ids that were "processed", "failed" and "removed"
         """
         try:
             dir_path = Path(dir_path)
             if not dir_path.is_dir():
                 raise ValueError(f"Invalid directory path: {dir_path}")
-                
-            results = []
-            for pdf_file in dir_path.glob("*.pdf"):
-                logger.info(f"Processing {pdf_file}")
-                result = self.process_document(pdf_file)
-                if "error" not in result:
-                    results.append(result)
+            if output_format not in ("jsonl", "store"):
+                raise ValueError(f"Unknown output format: {output_format}")
+            if start_method not in ("spawn", "fork"):
+                raise ValueError(f"Unknown start method: {start_method}")
+            if start_method == "fork" and self.backend.startswith("onnx") and workers > 1:
+                # ONNX Runtime's thread pools do not survive a fork
+                raise ValueError("The onnx backend cannot share its sessions with forked workers; use spawn")
 
-            output_path = Path(f"{out_path}/chunks.json")
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(output_path, "w") as f:
-                json.dump(results, f, indent=2)
-                
-            logger.info(f"Successfully processed {len(results)} documents")
+            out_path = Path(out_path)
+            out_path.mkdir(parents=True, exist_ok=True)
+            if output_format == "store":
+                store = ChunkStore(out_path / "chunk_store", dim=self.embedder.dimension, dtype=embedding_dtype)
+
+            pdf_files = sorted(dir_path.glob("*.pdf"))
+            summary = {"processed": [], "failed": [], "removed": []}
+            manifest = IngestManifest(out_path / "manifest.json") if incremental else None
+            if manifest is not None:
+                pdf_files, summary["removed"] = manifest.diff(pdf_files)
+                logger.info(
+                    f"Incremental run: {len(pdf_files)} new or changed, {len(summary['removed'])} removed"
+                )
+
+            start = time.perf_counter()
+            with open(out_path / "chunks.jsonl", "a") if output_format == "jsonl" else nullcontext() as f:
+                for doc_id in summary["removed"]:
+                    if output_format == "jsonl":
+                        f.write(json.dumps({"doc_id": doc_id, "deleted": True}) + "\n")
+                    else:
+                        store.delete(doc_id)
+                    manifest.forget(doc_id)
+                    if self.dedup_index is not None:
+                        self.dedup_index.remove(doc_id)
+
+                try:
+                    for pdf_file, packed in self._iter_results(
+                        pdf_files, workers, max_in_flight, output_format, start_method
+                    ):
+                        if packed is None:
+                            logger.warning(f"Skipping {pdf_file}: processing failed")
+                            summary["failed"].append(str(pdf_file))
+                            continue
+                        if output_format == "jsonl":
+                            f.write(packed + "\n")
+                            f.flush()
+                        else:
+                            document, embeddings = packed
+                            chunks = document.pop("chunks")
+                            store.append(str(pdf_file), chunks, embeddings, document=document)
+                        summary["processed"].append(str(pdf_file))
+                        if manifest is not None:
+                            manifest.record(pdf_file)
+                            if len(summary["processed"]) % 50 == 0:
+                                manifest.save()
+                finally:
+                    if manifest is not None:
+                        manifest.save()
+
+            processed = len(summary["processed"])
+            elapsed = time.perf_counter() - start
+            logger.info(
+                f"Successfully processed {processed} documents in {elapsed:.1f}s "
+                f"({processed / elapsed if elapsed else 0.0:.2f} docs/sec, workers={workers})"
+            )
+            return summary
             
         except Exception as e:
             logger.error(f"Directory processing failed: {str(e)}", exc_info=True)
             raise
+        finally:
+            self.close()
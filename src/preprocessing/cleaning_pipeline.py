@@ -2,6 +2,7 @@ from pathlib import Path
 import logging
 from typing import Optional
 from utils import PDFTextExtractor, clean_text
+from utils.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -41,14 +42,16 @@ class TextPreprocessingPipeline:
             logger.info(f"Starting processing pipeline for {file_path}")
             
             extractor = PDFTextExtractor(file_path)
-            raw_text = extractor.extract_text(start_page, end_page)
+            with metrics.span("cleaning.extract", items=1):
+                raw_text = extractor.extract_text(start_page, end_page)
             
             if not raw_text:
                 logger.error("Text extraction failed")
                 return None
                 
             logger.info("Cleaning extracted text")
-            processed_text = clean_text(raw_text)
+            with metrics.span("cleaning.clean_text", items=len(raw_text)):
+                processed_text = clean_text(raw_text)
             
             if not processed_text:
                 logger.warning("Cleaning resulted in empty text")
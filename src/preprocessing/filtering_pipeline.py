@@ -1,4 +1,5 @@
-from utils.filters import filter_segments
+from utils.filters import filter_segments, filter_words
+from utils.metrics import metrics
 import logging
 from typing import List, Optional
 
@@ -9,14 +10,18 @@ class PreprocessingError(Exception):
     pass
 
 class PreprocessingPipeline:
-    def __init__(self, log_level: int = logging.INFO):
+    def __init__(self, log_level: int = logging.INFO, lexical_fast_path: bool = True):
         """
         Initialize the preprocessing pipeline.
         
         Args:
             log_level (int): Logging level (default: logging.INFO)
+            lexical_fast_path (bool): Decide plain words from lookup tables (see
+                ``filter_words``) and run spaCy only on the rest; the kept words
+                are the same either way
         """
         self._configure_logging(log_level)
+        self.lexical_fast_path = lexical_fast_path
         
     def _configure_logging(self, log_level: int) -> None:
         """Configure logging with appropriate format and level."""
@@ -58,7 +63,11 @@ class PreprocessingPipeline:
                 raise PreprocessingError("No segments were created after splitting")
 
             logger.info("Applying filters to segments")
-            relevant_segments = filter_segments(segments)
+            with metrics.span("filtering.process_document", items=len(segments)):
+                if self.lexical_fast_path:
+                    relevant_segments = filter_words(segments)
+                else:
+                    relevant_segments = filter_segments(segments)
             if not relevant_segments:
                 logger.warning("No segments passed the filtering stage")
                 return None
@@ -0,0 +1,269 @@
+import argparse
+import asyncio
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+from indexer import Indexer
+from sharded_indexer import ShardedIndexer
+from utils.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+class Overloaded(Exception):
+    """Raised when the request queue is full"""
+    pass
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent queries into batches for one embedding call and one
+    FAISS search.
+
+    A batch is dispatched once it holds ``max_batch_size`` queries or the
+    oldest query has waited ``max_wait`` seconds. Inference runs in a
+    single-thread executor so the event loop never blocks, and at most
+    ``max_queue`` queries may wait; beyond that ``submit`` raises Overloaded.
+    """
+
+    def __init__(self, indexer: Union[Indexer, ShardedIndexer], max_batch_size: int = 64, max_wait: float = 0.005, max_queue: int = 1024):
+        """
+        Args:
+            indexer (Indexer | ShardedIndexer): Index to search
+            max_batch_size (int): Maximum queries per model call
+            max_wait (float): Seconds the first query of a batch may wait for company
+            max_queue (int): Maximum queued queries before requests are rejected
+        """
+        self.indexer = indexer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"requests": 0, "rejected": 0, "batches": 0, "batched_queries": 0}
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    async def submit(self, query: str, top_k: int) -> List[Tuple[int, str, float, Dict]]:
+        """Queue a query and wait for its (chunk id, text, score, metadata) results."""
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((query, top_k, future))
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            raise Overloaded(f"Query queue is full ({self._queue.maxsize} waiting)")
+        self.stats["requests"] += 1
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            batch = [item for item in batch if not item[2].cancelled()]
+            if not batch:
+                continue
+            self.stats["batches"] += 1
+            self.stats["batched_queries"] += len(batch)
+            metrics.observe("server.batch_size", len(batch))
+            try:
+                results = await loop.run_in_executor(self._executor, self._search, batch)
+            except Exception as e:
+                logger.error(f"Batch search failed: {e}", exc_info=True)
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, _, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def _search(self, batch: List[Tuple]) -> List[List[Tuple[int, str, float, Dict]]]:
+        queries = [query for query, _, _ in batch]
+        top_k = max(k for _, k, _ in batch)
+        results = self.indexer.search_batch(queries, top_k=top_k, batch_size=len(queries))
+        output = []
+        for row, (_, k, _) in enumerate(batch):
+            hits = [(int(i), float(s)) for i, s in zip(results.ids[row][:k], results.scores[row][:k]) if i != -1]
+            texts, metadata = results.documents(row), results.metadata(row)
+            output.append([(i, text, s, meta) for (i, s), text, meta in zip(hits, texts, metadata)])
+        return output
+
+
+class QueryServer:
+    """
+    Minimal HTTP/1.1 JSON service around a MicroBatcher.
+
+    Endpoints:
+        POST /search  {"query": str, "top_k": int} -> {"results": [{"id", "text", "score", "source", "page"}]}
+        GET  /health  -> {"status": "ok"}
+        GET  /stats   -> batching and queue statistics
+        GET  /metrics -> pipeline metrics in the Prometheus text format
+                         (empty unless metrics are enabled)
+    """
+
+    MAX_BODY = 1 << 20
+
+    def __init__(self, batcher: MicroBatcher, host: str = "127.0.0.1", port: int = 8000, max_top_k: int = 100):
+        self.batcher = batcher
+        self.host = host
+        self.port = port
+        self.max_top_k = max_top_k
+
+    async def serve_forever(self) -> None:
+        self.batcher.start()
+        server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        logger.info(f"Serving on http://{self.host}:{self.port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                if length > self.MAX_BODY:
+                    await self._respond(writer, 413, {"error": "Request body too large"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self._route(method, target, body)
+                keep_alive = version.strip().upper() == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, target: str, body: bytes) -> Tuple[int, Union[Dict, str]]:
+        if method == "GET" and target == "/health":
+            return 200, {"status": "ok"}
+        if method == "GET" and target == "/stats":
+            return 200, {**self.batcher.stats, "queue_depth": self.batcher.queue_depth}
+        if method == "GET" and target == "/metrics":
+            return 200, metrics.to_prometheus()
+        if target != "/search":
+            return 404, {"error": f"Unknown endpoint: {target}"}
+        if method != "POST":
+            return 405, {"error": "Use POST /search"}
+
+        try:
+            request = json.loads(body)
+            query = request["query"]
+            top_k = int(request.get("top_k", 5))
+            if not isinstance(query, str) or not 1 <= top_k <= self.max_top_k:
+                raise ValueError
+        except (ValueError, KeyError, TypeError):
+            return 400, {"error": f"Expected {{\"query\": str, \"top_k\": 1..{self.max_top_k}}}"}
+
+        start = time.perf_counter()
+        try:
+            hits = await self.batcher.submit(query, top_k)
+        except Overloaded as e:
+            metrics.count("server.rejected")
+            return 503, {"error": str(e)}
+        except Exception as e:
+            metrics.count("server.errors")
+            return 500, {"error": str(e)}
+        metrics.observe("server.latency_ms", 1000 * (time.perf_counter() - start))
+        return 200, {
+            "results": [
+                {"id": i, "text": text, "score": score, "source": meta["source"], "page": meta["page"]}
+                for i, text, score, meta in hits
+            ],
+            "latency_ms": 1000 * (time.perf_counter() - start)
+        }
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, payload: Union[Dict, str], keep_alive: bool) -> None:
+        reasons = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                   413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+        if isinstance(payload, str):
+            body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+        head = (
+            f"HTTP/1.1 {status} {reasons[status]}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        )
+        if status == 503:
+            head += "Retry-After: 1\r\n"
+        writer.write(head.encode("latin-1") + b"\r\n" + body)
+        await writer.drain()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve an Indexer over HTTP/JSON")
+    parser.add_argument("index", help="Directory written by Indexer.save, or a ShardedIndexer directory")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--mmap", action="store_true", help="Memory-map the FAISS index")
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--max-queue", type=int, default=1024)
+    parser.add_argument("--metrics", action="store_true", help="Record pipeline metrics and expose GET /metrics")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    if args.metrics:
+        metrics.enable()
+    if ShardedIndexer.exists(args.index):
+        indexer = ShardedIndexer(args.index, mmap=args.mmap)
+    else:
+        indexer = Indexer.load(args.index, mmap=args.mmap)
+    # Load the model before accepting traffic instead of on the first batch
+    indexer.embedder.model
+
+    async def serve() -> None:
+        batcher = MicroBatcher(indexer, args.max_batch_size, args.max_wait_ms / 1000, args.max_queue)
+        await QueryServer(batcher, args.host, args.port).serve_forever()
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
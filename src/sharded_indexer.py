@@ -0,0 +1,591 @@
+import hashlib
+import heapq
+import json
+import logging
+import multiprocessing as mp
+import shutil
+import threading
+from itertools import islice
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from indexer import BatchSearchResults, Indexer
+from utils.chunk_store import ChunkStore
+from utils.embedding_utils import Embedder
+from utils.fusion import reciprocal_rank_fusion, weighted_fusion
+from utils.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+class ShardError(Exception):
+    """Custom exception for shard worker errors"""
+    pass
+
+
+def shard_of(key: str, num_shards: int) -> int:
+    """Shard a document id or chunk text belongs to; stable across processes and runs."""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") % num_shards
+
+
+def merge_top_k(
+    ids: Sequence[np.ndarray],
+    scores: Sequence[np.ndarray],
+    top_k: int,
+    descending: bool
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Merge per-shard result matrices into one top-k per query.
+
+    Every shard's rows are already sorted, so each query only needs a k-way
+    heap merge that stops after ``top_k`` hits.
+
+    Args:
+        ids (Sequence[np.ndarray]): Per shard, (n_queries, k) global ids padded with -1
+        scores (Sequence[np.ndarray]): Per shard, matching scores
+        top_k (int): Results kept per query
+        descending (bool): Higher scores are better (inner product, BM25)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: ids and scores of shape (n_queries, top_k)
+    """
+    n_queries = len(ids[0]) if len(ids) else 0
+    merged_ids = np.full((n_queries, top_k), -1, dtype=np.int64)
+    merged_scores = np.full((n_queries, top_k), np.nan, dtype=np.float32)
+    for row in range(n_queries):
+        runs = []
+        for shard_ids, shard_scores in zip(ids, scores):
+            found = shard_ids[row] != -1
+            runs.append(zip(shard_scores[row][found].tolist(), shard_ids[row][found].tolist()))
+        hits = list(islice(heapq.merge(*runs, key=itemgetter(0), reverse=descending), top_k))
+        if hits:
+            merged_scores[row, :len(hits)], merged_ids[row, :len(hits)] = zip(*hits)
+    return merged_ids, merged_scores
+
+
+def _fetch(indexer: Indexer, ids: List[int]) -> List[Tuple[str, Dict]]:
+    return [(indexer.documents[i], indexer.documents.metadata(i)) for i in ids]
+
+
+def _keyword_search(indexer: Indexer, query: str, top_k: int):
+    if indexer.keyword_index is None:
+        raise ValueError("Keyword search requires keyword_index=True")
+    return indexer.keyword_index.search(query, top_k)
+
+
+# Commands a shard worker answers, called with the worker's Indexer first
+_COMMANDS = {
+    "search": lambda indexer, vectors, top_k: indexer._search_vectors(indexer._prepare_vectors(vectors), top_k),
+    "keyword": _keyword_search,
+    "fetch": _fetch,
+    "add": lambda indexer, *args: indexer.add_embeddings(*args),
+    "remove": lambda indexer, doc_id: indexer.remove_document(doc_id),
+    "len": lambda indexer: len(indexer.documents),
+}
+
+
+def _serve_shard(conn, path: Path, mmap: bool) -> None:
+    """Worker process: own one shard and answer commands until the pipe closes."""
+    indexer = Indexer.load(path, mmap=mmap)
+    while True:
+        try:
+            command, args = conn.recv()
+        except EOFError:
+            return
+        if command == "close":
+            return
+        try:
+            if command == "load":
+                indexer, result = Indexer.load(path, mmap=mmap), None
+            elif command == "save":
+                result = indexer.save(path)
+            else:
+                result = _COMMANDS[command](indexer, *args)
+            conn.send((True, result))
+        except Exception as e:
+            conn.send((False, f"{type(e).__name__}: {e}"))
+
+
+def _build_shard(store_path: Path, out: Path, config: Dict, shard: int, num_shards: int, partition: str) -> None:
+    """Builder process: index the chunks of one shard from a ChunkStore into ``out``."""
+    store = ChunkStore(store_path)
+    indexer = Indexer(**config)
+    embeddings = store.embeddings()
+    records = list(store.records())
+    for entry in store.documents():
+        doc_id = entry["doc_id"]
+        if entry.get("deleted"):
+            indexer.remove_document(doc_id)
+            continue
+        rows = range(entry["start"], entry["start"] + entry["count"])
+        if partition == "document":
+            rows = rows if shard_of(doc_id, num_shards) == shard else []
+        else:
+            rows = [row for row in rows if shard_of(records[row]["text"], num_shards) == shard]
+        # An append replaces the document even when none of its new chunks land here
+        indexer.remove_document(doc_id)
+        if rows:
+            rows = list(rows)
+            indexer.add_embeddings(
+                np.asarray(embeddings[rows], dtype=np.float32),
+                [records[row]["text"] for row in rows],
+                doc_id=doc_id,
+                pages=[records[row].get("page") for row in rows],
+                chunk_ids=[records[row]["chunk_id"] for row in rows]
+            )
+    indexer.save(out)
+
+
+class _Shard:
+    """Parent-side handle of one shard worker."""
+
+    def __init__(self, ctx, path: Path, mmap: bool):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_serve_shard, args=(child_conn, path, mmap), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def send(self, command: str, *args) -> None:
+        self.conn.send((command, args))
+
+    def receive(self) -> Any:
+        try:
+            ok, result = self.conn.recv()
+        except EOFError:
+            raise ShardError(f"Worker of {self.path.name} exited (code {self.process.exitcode})")
+        if not ok:
+            raise ShardError(f"{self.path.name}: {result}")
+        return result
+
+    def call(self, command: str, *args) -> Any:
+        with self.lock:
+            self.send(command, *args)
+            return self.receive()
+
+    def close(self) -> None:
+        with self.lock:
+            try:
+                self.send("close")
+            except (BrokenPipeError, OSError):
+                pass
+        self.process.join(timeout=10)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+
+
+class _FetchedDocuments:
+    """Texts and metadata of a result set, fetched from the shards in one round trip each."""
+
+    def __init__(self, entries: Dict[int, Tuple[str, Dict]]):
+        self._entries = entries
+
+    def __getitem__(self, i: int) -> str:
+        return self._entries[int(i)][0]
+
+    def metadata(self, i: int) -> Dict:
+        return self._entries[int(i)][1]
+
+
+class _ShardedDocuments:
+    """Read access to chunk texts by global id; each read is a round trip to a shard."""
+
+    def __init__(self, sharded: "ShardedIndexer"):
+        self._sharded = sharded
+
+    def __len__(self) -> int:
+        return sum(self._sharded._call_all("len"))
+
+    def __getitem__(self, i: int) -> str:
+        return self._sharded._fetch([int(i)])[int(i)][0]
+
+    def metadata(self, i: int) -> Dict:
+        return self._sharded._fetch([int(i)])[int(i)][1]
+
+
+class ShardedIndexer:
+    """
+    Corpus partitioned across several Indexer shards, each owned by its own
+    worker process.
+
+    Layout of a sharded index directory:
+        shards.json      shard count, partitioning and the Indexer settings
+        shard-000/ ...   one directory per shard, written by Indexer.save
+
+    Chunks go to a shard by a hash of their document id ("document"
+    partitioning, so a document can be removed or rebuilt on one shard) or
+    of their text ("hash" partitioning, which balances shards better). Each
+    worker holds only its shard in memory. Queries are embedded once in the
+    calling process, sent to every shard in parallel, and the per-shard
+    top-k lists are merged with a heap; texts are then fetched only for the
+    merged hits.
+
+    Result ids are global: ``local_id * num_shards + shard``. Calls are
+    thread-safe; concurrent callers are served one fan-out at a time, so
+    batch queries (``search_batch``) to keep all shards busy.
+    """
+
+    CONFIG_FILE = "shards.json"
+    HYBRID_DEPTH = Indexer.HYBRID_DEPTH
+
+    def __init__(
+        self,
+        path: str | Path,
+        num_shards: int = 4,
+        partition: str = "document",
+        embedder: Optional[Embedder] = None,
+        mmap: bool = False,
+        start_method: str = "spawn",
+        **indexer_kwargs
+    ):
+        """
+        Open the sharded index at ``path``, creating empty shards if it does not exist.
+
+        Args:
+            path (str | Path): Sharded index directory
+            num_shards (int): Number of shards of a new index; an existing index keeps its own
+            partition (str): "document" or "hash" for a new index
+            embedder (Embedder, optional): Embedder for queries and ``add_documents``
+            mmap (bool): Memory-map the shards' FAISS indexes (read-only)
+            start_method (str): Multiprocessing start method of the workers
+            **indexer_kwargs: Indexer settings of a new index (embedding_dim,
+                index_type, metric, ...)
+        """
+        self.path = Path(path)
+        config_path = self.path / self.CONFIG_FILE
+        if config_path.exists():
+            config = json.loads(config_path.read_text())
+        else:
+            if num_shards < 1:
+                raise ValueError("num_shards must be a positive integer")
+            if partition not in ("document", "hash"):
+                raise ValueError(f"Unknown partitioning: {partition}")
+            if embedder is not None:
+                indexer_kwargs.setdefault("embedding_model", embedder.model_name)
+            indexer_kwargs.pop("query_cache", None)
+            config = {"num_shards": num_shards, "partition": partition, "indexer": indexer_kwargs}
+            for shard in range(num_shards):
+                Indexer(**indexer_kwargs).save(self._shard_path(shard))
+            config_path.write_text(json.dumps(config))
+
+        self.num_shards = config["num_shards"]
+        self.partition = config["partition"]
+        self.indexer_config = config["indexer"]
+        # Settings of the shards as saved, with the Indexer defaults filled in
+        shard_config = json.loads((self._shard_path(0) / Indexer.CONFIG_FILE).read_text())
+        self.embedding_dim = shard_config["embedding_dim"]
+        self.embedding_model = shard_config["embedding_model"]
+        self.metric = shard_config["metric"]
+        self._embedder = embedder
+        self.start_method = start_method
+        self.documents = _ShardedDocuments(self)
+
+        ctx = mp.get_context(start_method)
+        self._shards = [_Shard(ctx, self._shard_path(shard), mmap) for shard in range(self.num_shards)]
+        logger.info(f"Started {self.num_shards} shard workers for {self.path}")
+
+    def __enter__(self) -> "ShardedIndexer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the shard workers; unsaved changes are lost."""
+        for shard in self._shards:
+            shard.close()
+
+    @property
+    def embedder(self) -> Embedder:
+        """Embedding model, loaded on first use."""
+        if self._embedder is None:
+            self._embedder = Embedder(self.embedding_model)
+        return self._embedder
+
+    def _shard_path(self, shard: int) -> Path:
+        return self.path / f"shard-{shard:03d}"
+
+    def _call_all(self, command: str, *args) -> List[Any]:
+        """Send one command to every shard, then collect the replies, so shards work in parallel."""
+        return self._call_each({shard: args for shard in range(self.num_shards)}, command)
+
+    def _call_each(self, shard_args: Dict[int, tuple], command: str) -> List[Any]:
+        shards = [self._shards[shard] for shard in sorted(shard_args)]
+        # Locks are always taken in shard order, so concurrent fan-outs cannot deadlock
+        for shard in shards:
+            shard.lock.acquire()
+        try:
+            for shard, args in zip(shards, (shard_args[shard] for shard in sorted(shard_args))):
+                shard.send(command, *args)
+            results, error = [], None
+            for shard in shards:
+                try:
+                    results.append(shard.receive())
+                except ShardError as e:
+                    # Keep reading so no reply is left in another shard's pipe
+                    results.append(None)
+                    error = error or e
+            if error is not None:
+                raise error
+            return results
+        finally:
+            for shard in shards:
+                shard.lock.release()
+
+    def _global_ids(self, ids: np.ndarray, shard: int) -> np.ndarray:
+        return np.where(ids == -1, -1, ids * self.num_shards + shard)
+
+    def _fetch(self, ids: Iterable[int]) -> Dict[int, Tuple[str, Dict]]:
+        by_shard: Dict[int, List[int]] = {}
+        for i in dict.fromkeys(int(i) for i in ids if i != -1):
+            by_shard.setdefault(i % self.num_shards, []).append(i)
+        if not by_shard:
+            return {}
+        replies = self._call_each({
+            shard: ([i // self.num_shards for i in global_ids],) for shard, global_ids in by_shard.items()
+        }, "fetch")
+        return {
+            i: entry
+            for shard, entries in zip(sorted(by_shard), replies)
+            for i, entry in zip(by_shard[shard], entries)
+        }
+
+    def _search_vectors(self, query_embeddings: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        query_embeddings = np.ascontiguousarray(query_embeddings, dtype=np.float32)
+        with metrics.span("sharded.search", items=len(query_embeddings)):
+            replies = self._call_all("search", query_embeddings, top_k)
+            return merge_top_k(
+                [self._global_ids(shard_ids, shard) for shard, (shard_ids, _) in enumerate(replies)],
+                [shard_scores for _, shard_scores in replies],
+                top_k,
+                descending=self.metric != "l2"
+            )
+
+    def search_vectors(self, query_embeddings: np.ndarray, top_k: int = 5) -> BatchSearchResults:
+        """
+        Dense search for precomputed query embeddings across all shards.
+
+        Args:
+            query_embeddings (np.ndarray): Matrix of shape (n_queries, embedding_dim)
+            top_k (int): Number of results per query
+
+        Returns:
+            BatchSearchResults: Global ids and scores of shape (n_queries, top_k)
+        """
+        ids, scores = self._search_vectors(query_embeddings, top_k)
+        return BatchSearchResults(ids, scores, _FetchedDocuments(self._fetch(ids.ravel())))
+
+    def search_batch(self, queries: List[str], top_k: int = 5, batch_size: int = 1024) -> BatchSearchResults:
+        """
+        Dense search for many queries; each batch is one fan-out to the shards.
+
+        Args:
+            queries (List[str]): Query texts
+            top_k (int): Number of results per query
+            batch_size (int): Queries embedded and searched per fan-out
+
+        Returns:
+            BatchSearchResults: Global ids and scores of shape (len(queries), top_k)
+        """
+        batches = [
+            self._search_vectors(self.embedder.embed_batch(queries[start:start + batch_size]), top_k)
+            for start in range(0, len(queries), batch_size)
+        ]
+        if not batches:
+            empty = np.empty((0, top_k))
+            return BatchSearchResults(empty.astype(np.int64), empty.astype(np.float32), _FetchedDocuments({}))
+        ids = np.concatenate([ids for ids, _ in batches])
+        scores = np.concatenate([scores for _, scores in batches])
+        return BatchSearchResults(ids, scores, _FetchedDocuments(self._fetch(ids.ravel())))
+
+    def _keyword_search(self, query: str, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        replies = self._call_all("keyword", query, top_k)
+        padded_ids, padded_scores = [], []
+        for shard, (shard_ids, shard_scores) in enumerate(replies):
+            row_ids = np.full((1, top_k), -1, dtype=np.int64)
+            row_scores = np.full((1, top_k), np.nan, dtype=np.float32)
+            row_ids[0, :len(shard_ids)] = np.asarray(shard_ids, dtype=np.int64) * self.num_shards + shard
+            row_scores[0, :len(shard_scores)] = shard_scores
+            padded_ids.append(row_ids)
+            padded_scores.append(row_scores)
+        # BM25 scores use per-shard statistics, which is close enough to rank across shards
+        ids, scores = merge_top_k(padded_ids, padded_scores, top_k, descending=True)
+        found = ids[0] != -1
+        return ids[0][found], scores[0][found]
+
+    def search(self, query: str, top_k=5, mode: str = "dense", fusion: str = "rrf", alpha: float = 0.5):
+        """
+        Retrieve the documents best matching a query, like ``Indexer.search``.
+
+        Args:
+            query (str): Query text
+            top_k (int): Number of results
+            mode (str): "dense", "keyword" or "hybrid"
+            fusion (str): Hybrid fusion method, "rrf" or "weighted"
+            alpha (float): Weight of the dense scores in weighted fusion
+
+        Returns:
+            Tuple[List[str], np.ndarray]: Documents and their scores
+        """
+        if mode == "dense":
+            results = self.search_batch([query], top_k)
+            found = results.ids[0] != -1
+            return results.documents(0), results.scores[0][found]
+        if mode == "keyword":
+            ids, scores = self._keyword_search(query, top_k)
+        elif mode == "hybrid":
+            depth = top_k * self.HYBRID_DEPTH
+            dense_ids, distances = self._search_vectors(self.embedder.embed_batch([query]), depth)
+            found = dense_ids[0] != -1
+            dense_ids, distances = dense_ids[0][found], distances[0][found]
+            lexical_ids, lexical_scores = self._keyword_search(query, depth)
+            if fusion == "rrf":
+                ids, scores = reciprocal_rank_fusion([dense_ids, lexical_ids], top_k)
+            elif fusion == "weighted":
+                similarities = -distances if self.metric == "l2" else distances
+                ids, scores = weighted_fusion((dense_ids, similarities), (lexical_ids, lexical_scores), top_k, alpha)
+            else:
+                raise ValueError(f"Unknown fusion method: {fusion}")
+        else:
+            raise ValueError(f"Unknown search mode: {mode}")
+        entries = self._fetch(ids)
+        return [entries[int(i)][0] for i in ids], np.asarray(scores, dtype='float32')
+
+    def add_embeddings(
+        self,
+        embeddings: np.ndarray,
+        docs: list[str],
+        doc_id: Optional[str] = None,
+        pages: Optional[list[Optional[int]]] = None,
+        chunk_ids: Optional[list[int]] = None
+    ) -> np.ndarray:
+        """
+        Add precomputed embeddings with their chunk texts to their shards.
+
+        Args:
+            embeddings (np.ndarray): Matrix of shape (len(docs), embedding_dim)
+            docs (list[str]): Chunk texts
+            doc_id (str, optional): Source document, needed to remove or replace it later
+            pages (list[Optional[int]], optional): Page each chunk starts on
+            chunk_ids (list[int], optional): Id of each chunk within its document
+
+        Returns:
+            np.ndarray: Global ids assigned to the added chunks
+        """
+        if len(embeddings) != len(docs):
+            raise ValueError(f"Got {len(embeddings)} embeddings for {len(docs)} documents")
+        pages = list(pages) if pages is not None else [None] * len(docs)
+        chunk_ids = list(chunk_ids) if chunk_ids is not None else list(range(len(docs)))
+        if self.partition == "document" and doc_id is not None:
+            targets = np.full(len(docs), shard_of(doc_id, self.num_shards))
+        else:
+            targets = np.asarray([shard_of(doc, self.num_shards) for doc in docs], dtype=np.int64)
+
+        shard_rows = {shard: np.flatnonzero(targets == shard) for shard in np.unique(targets).tolist()}
+        replies = self._call_each({
+            shard: (
+                np.ascontiguousarray(embeddings[rows]),
+                [docs[row] for row in rows],
+                doc_id,
+                [pages[row] for row in rows],
+                [chunk_ids[row] for row in rows]
+            )
+            for shard, rows in shard_rows.items()
+        }, "add")
+        ids = np.empty(len(docs), dtype=np.int64)
+        for (shard, rows), local_ids in zip(sorted(shard_rows.items()), replies):
+            ids[rows] = self._global_ids(local_ids, shard)
+        return ids
+
+    def add_documents(self, docs: list[str], doc_id: Optional[str] = None) -> np.ndarray:
+        return self.add_embeddings(self.embedder.embed_batch(docs), docs, doc_id=doc_id)
+
+    def remove_document(self, doc_id: str) -> int:
+        """
+        Remove every chunk of a document from its shard (or all shards with "hash" partitioning).
+
+        Returns:
+            int: Number of chunks removed
+        """
+        if self.partition == "document":
+            return self._shards[shard_of(doc_id, self.num_shards)].call("remove", doc_id)
+        return sum(self._call_all("remove", doc_id))
+
+    def upsert_document(
+        self,
+        doc_id: str,
+        chunks: list[str],
+        embeddings: Optional[np.ndarray] = None,
+        pages: Optional[list[Optional[int]]] = None,
+        chunk_ids: Optional[list[int]] = None
+    ) -> np.ndarray:
+        """Replace the chunks of a document, adding it if it is new."""
+        if embeddings is None:
+            embeddings = self.embedder.embed_batch(chunks)
+        self.remove_document(doc_id)
+        return self.add_embeddings(embeddings, chunks, doc_id=doc_id, pages=pages, chunk_ids=chunk_ids)
+
+    def save(self) -> None:
+        """Have every shard write itself to its directory."""
+        self._call_all("save")
+
+    def rebuild(self, store: ChunkStore, shards: Optional[Iterable[int]] = None) -> None:
+        """
+        Rebuild shards from a ChunkStore without re-embedding.
+
+        Each shard is built by a separate process into a fresh directory
+        while the current workers keep answering queries; the new shard then
+        replaces the old one and its worker reloads it. Other shards are not
+        touched. A rebuilt shard holds exactly the store's chunks for that
+        shard: changes made since its last save are discarded.
+
+        Args:
+            store (ChunkStore): Store to index
+            shards (Iterable[int], optional): Shards to rebuild (default: all)
+        """
+        if store.dim != self.embedding_dim:
+            raise ValueError(f"Store has dim={store.dim}, index expects {self.embedding_dim}")
+        shards = sorted(set(range(self.num_shards) if shards is None else shards))
+        ctx = mp.get_context(self.start_method)
+        builders = {}
+        for shard in shards:
+            out = self._shard_path(shard).with_name(self._shard_path(shard).name + ".rebuild")
+            shutil.rmtree(out, ignore_errors=True)
+            builders[shard] = ctx.Process(
+                target=_build_shard,
+                args=(store.path, out, self.indexer_config, shard, self.num_shards, self.partition)
+            )
+            builders[shard].start()
+
+        failed = []
+        for shard, builder in builders.items():
+            builder.join()
+            if builder.exitcode != 0:
+                failed.append(shard)
+                continue
+            path = self._shard_path(shard)
+            old = path.with_name(path.name + ".old")
+            with self._shards[shard].lock:
+                shutil.rmtree(old, ignore_errors=True)
+                path.rename(old)
+                path.with_name(path.name + ".rebuild").rename(path)
+                self._shards[shard].send("load")
+                self._shards[shard].receive()
+            shutil.rmtree(old, ignore_errors=True)
+            logger.info(f"Rebuilt {path.name} from {store.path}")
+        if failed:
+            raise ShardError(f"Rebuilding shards {failed} failed; they keep their previous contents")
+
+    def add_store(self, store: ChunkStore) -> None:
+        """Index a ChunkStore into every shard; see ``rebuild``."""
+        self.rebuild(store)
+
+    @staticmethod
+    def exists(path: str | Path) -> bool:
+        """Whether ``path`` holds a sharded index."""
+        return (Path(path) / ShardedIndexer.CONFIG_FILE).exists()
@@ -1,6 +1,15 @@
 from .embedding_utils import Embedder
-from .text_cleaning import clean_text
+from .text_cleaning import clean_text, clean_pages, TextCleaner
 from .text_extracting import PDFTextExtractor
-from .filters import filter_segments
+from .filters import filter_segments, filter_words
+from .chunk_store import ChunkStore
+from .document_store import DocumentStore
+from .bm25 import BM25Index
+from .query_cache import QueryCache
+from .metrics import metrics, MetricsRegistry
+from .model_registry import model_registry, ModelRegistry
+from .dedup import MinHasher, DuplicateIndex
 
-__all__ = ["Embedder", "clean_text", "PDFTextExtractor", "filter_segments"]
\ No newline at end of file
+__all__ = ["Embedder", "clean_text", "clean_pages", "TextCleaner", "PDFTextExtractor", "filter_segments", "filter_words", "ChunkStore", "DocumentStore",
+           "BM25Index", "QueryCache", "metrics", "MetricsRegistry",
+           "model_registry", "ModelRegistry", "MinHasher", "DuplicateIndex"]
\ No newline at end of file
@@ -0,0 +1,233 @@
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+import json
+import os
+import re
+import numpy as np
+
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens used for both indexing and querying."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """
+    In-memory inverted index with Okapi BM25 scoring.
+
+    Postings are int32 arrays of (doc id, term frequency). Postings read
+    from disk stay in one CSR block; postings of documents added later live
+    in per-term ``array`` buffers until the next save merges them. Document
+    ids are positional, matching the order documents were added. Removed
+    documents are tombstoned: their postings stay but they never match or
+    count towards document frequency.
+    """
+
+    VOCAB_FILE = "keyword_vocab.json"
+    POSTINGS_FILE = "keyword_postings.npz"
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            k1 (float): Term frequency saturation
+            b (float): Document length normalization strength
+        """
+        self.k1 = k1
+        self.b = b
+        self._vocab: Dict[str, int] = {}
+        self._base_offsets = np.zeros(1, dtype=np.int64)
+        self._base_docs = np.empty(0, dtype=np.int32)
+        self._base_tfs = np.empty(0, dtype=np.int32)
+        self._tail_docs: Dict[int, array] = {}
+        self._tail_tfs: Dict[int, array] = {}
+        self._doc_lens = array("i")
+        self._total_len = 0
+        self._deleted = bytearray()
+        self._deleted_count = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_lens) - self._deleted_count
+
+    def add(self, texts: Iterable[str]) -> None:
+        """Index texts, assigning them the next positional document ids."""
+        for text in texts:
+            doc_id = len(self._doc_lens)
+            tokens = tokenize(text)
+            for term, tf in Counter(tokens).items():
+                term_id = self._vocab.setdefault(term, len(self._vocab))
+                if term_id not in self._tail_docs:
+                    self._tail_docs[term_id] = array("i")
+                    self._tail_tfs[term_id] = array("i")
+                self._tail_docs[term_id].append(doc_id)
+                self._tail_tfs[term_id].append(tf)
+            self._doc_lens.append(len(tokens))
+            self._deleted.append(0)
+            self._total_len += len(tokens)
+
+    def remove(self, doc_ids: Iterable[int]) -> None:
+        """Exclude documents from all future results."""
+        for doc_id in doc_ids:
+            if not self._deleted[doc_id]:
+                self._deleted[doc_id] = 1
+                self._deleted_count += 1
+                self._total_len -= self._doc_lens[doc_id]
+
+    def _postings(self, term_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        docs, tfs = [], []
+        if term_id < len(self._base_offsets) - 1:
+            start, end = self._base_offsets[term_id], self._base_offsets[term_id + 1]
+            docs.append(self._base_docs[start:end])
+            tfs.append(self._base_tfs[start:end])
+        if term_id in self._tail_docs:
+            docs.append(np.frombuffer(self._tail_docs[term_id], dtype=np.int32))
+            tfs.append(np.frombuffer(self._tail_tfs[term_id], dtype=np.int32))
+        if len(docs) == 1:
+            return docs[0], tfs[0]
+        return np.concatenate(docs), np.concatenate(tfs)
+
+    def search(self, query: str, top_k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score documents sharing at least one term with the query.
+
+        Terms are scored rarest first. Each term adds less than
+        ``idf * (k1 + 1)`` to a document's score, so once the k-th best
+        partial score reaches the sum of these bounds over the remaining
+        terms, no document outside the current candidates can enter the top
+        k; the remaining (long, common-term) postings are then only looked up
+        for the candidates instead of being scored in full.
+
+        Args:
+            query (str): Keyword query
+            top_k (int): Number of results
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Document ids and BM25 scores, best first
+        """
+        term_ids = {self._vocab[t] for t in tokenize(query) if t in self._vocab}
+        if not term_ids or not len(self):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        num_docs = len(self)
+        avg_len = self._total_len / num_docs
+        doc_lens = np.frombuffer(self._doc_lens, dtype=np.int32)
+
+        def term_scores(idf: float, docs: np.ndarray, tfs: np.ndarray) -> np.ndarray:
+            norm = self.k1 * (1 - self.b + self.b * doc_lens[docs] / avg_len)
+            return idf * tfs * (self.k1 + 1) / (tfs + norm)
+
+        terms = []
+        for term_id in term_ids:
+            docs, tfs = self._postings(term_id)
+            if self._deleted_count:
+                # Document frequency counts live documents only, like num_docs
+                live = np.frombuffer(self._deleted, dtype=np.uint8)[docs] == 0
+                docs, tfs = docs[live], tfs[live]
+            if len(docs):
+                terms.append((np.log1p((num_docs - len(docs) + 0.5) / (len(docs) + 0.5)), docs, tfs))
+        if not terms:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        terms.sort(key=lambda term: -term[0])
+        # Bound on what the terms not yet scored can add, and their postings
+        remaining = sum(idf for idf, _, _ in terms) * (self.k1 + 1)
+        remaining_postings = sum(len(docs) for _, docs, _ in terms)
+        scored_postings = 0
+
+        all_docs, all_scores = [], []
+        for i, (idf, docs, tfs) in enumerate(terms):
+            all_docs.append(docs)
+            all_scores.append(term_scores(idf, docs, tfs))
+            remaining -= idf * (self.k1 + 1)
+            remaining_postings -= len(docs)
+            scored_postings += len(docs)
+            # Pruning only pays off when the remaining postings outnumber the candidates
+            if remaining_postings <= scored_postings:
+                continue
+            docs, scores = self._merge(all_docs, all_scores)
+            all_docs, all_scores = [docs], [scores]
+            if len(docs) < top_k or np.partition(scores, -top_k)[-top_k] < remaining:
+                continue
+            # Postings are sorted by document id, so candidates are found by bisection
+            for idf, term_docs, term_tfs in terms[i + 1:]:
+                positions = np.minimum(np.searchsorted(term_docs, docs), len(term_docs) - 1)
+                hit = term_docs[positions] == docs
+                scores[hit] += term_scores(idf, docs[hit], term_tfs[positions[hit]])
+            break
+        docs, scores = self._merge(all_docs, all_scores)
+
+        if len(docs) > top_k:
+            best = np.argpartition(-scores, top_k)[:top_k]
+            docs, scores = docs[best], scores[best]
+        order = np.argsort(-scores, kind="stable")
+        return docs[order].astype(np.int64), scores[order].astype(np.float32)
+
+    @staticmethod
+    def _merge(all_docs: List[np.ndarray], all_scores: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """Sum per-term scores of the same document."""
+        if len(all_docs) == 1:
+            return all_docs[0], all_scores[0]
+        docs, inverse = np.unique(np.concatenate(all_docs), return_inverse=True)
+        return docs, np.bincount(inverse, weights=np.concatenate(all_scores))
+
+    def save(self, path: str | Path) -> None:
+        """Merge pending postings and write the index into a directory."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+
+        num_terms = len(self._vocab)
+        counts = np.zeros(num_terms, dtype=np.int64)
+        base_counts = np.diff(self._base_offsets)
+        counts[:len(base_counts)] += base_counts
+        for term_id, docs in self._tail_docs.items():
+            counts[term_id] += len(docs)
+        offsets = np.zeros(num_terms + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        docs_out = np.empty(offsets[-1], dtype=np.int32)
+        tfs_out = np.empty(offsets[-1], dtype=np.int32)
+        for term_id in range(num_terms):
+            docs, tfs = self._postings(term_id)
+            docs_out[offsets[term_id]:offsets[term_id + 1]] = docs
+            tfs_out[offsets[term_id]:offsets[term_id + 1]] = tfs
+
+        postings_tmp = path / (self.POSTINGS_FILE + ".tmp")
+        with open(postings_tmp, "wb") as f:
+            np.savez(
+                f,
+                offsets=offsets,
+                docs=docs_out,
+                tfs=tfs_out,
+                doc_lens=np.frombuffer(self._doc_lens, dtype=np.int32),
+                deleted=np.frombuffer(self._deleted, dtype=np.uint8),
+                params=np.array([self.k1, self.b])
+            )
+        os.replace(postings_tmp, path / self.POSTINGS_FILE)
+        terms = sorted(self._vocab, key=self._vocab.get)
+        (path / self.VOCAB_FILE).write_text(json.dumps(terms))
+
+    @classmethod
+    def load(cls, path: str | Path) -> "BM25Index":
+        """Load an index written by ``save``."""
+        path = Path(path)
+        with np.load(path / cls.POSTINGS_FILE) as data:
+            k1, b = data["params"].tolist()
+            index = cls(k1=k1, b=b)
+            index._base_offsets = data["offsets"]
+            index._base_docs = data["docs"]
+            index._base_tfs = data["tfs"]
+            index._doc_lens.frombytes(data["doc_lens"].tobytes())
+            index._deleted = bytearray(data["deleted"].tobytes())
+        live = np.frombuffer(index._deleted, dtype=np.uint8) == 0
+        index._deleted_count = int((~live).sum())
+        index._total_len = int(np.frombuffer(index._doc_lens, dtype=np.int32)[live].sum(dtype=np.int64))
+        terms = json.loads((path / cls.VOCAB_FILE).read_text())
+        index._vocab = {term: i for i, term in enumerate(terms)}
+        return index
+
+    @classmethod
+    def exists(cls, path: str | Path) -> bool:
+        return (Path(path) / cls.POSTINGS_FILE).exists()
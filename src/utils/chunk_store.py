@@ -0,0 +1,153 @@
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+import json
+import logging
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkStoreError(Exception):
+    """Custom exception for chunk store errors"""
+    pass
+
+
+class ChunkStore:
+    """
+    Columnar on-disk store for embedded chunks.
+
+    Layout of a store directory:
+        meta.json        embedding dimension and dtype
+        embeddings.bin   raw row-major matrix of shape (n, dim), appended per document
+        chunks.jsonl     one line per chunk: doc_id, chunk_id, page, text
+        documents.jsonl  ordered log of appends (doc_id, start, count, metadata,
+                         stats) and deletions (doc_id, deleted)
+
+    Row ``i`` of the embedding matrix belongs to line ``i`` of chunks.jsonl.
+    A document appended again supersedes its earlier rows; replaying
+    documents.jsonl in order yields the current contents.
+    """
+
+    META_FILE = "meta.json"
+    EMBEDDINGS_FILE = "embeddings.bin"
+    CHUNKS_FILE = "chunks.jsonl"
+    DOCUMENTS_FILE = "documents.jsonl"
+
+    def __init__(self, path: str | Path, dim: Optional[int] = None, dtype: str = "float32"):
+        """
+        Open an existing store or create a new one.
+
+        Args:
+            path (str | Path): Store directory
+            dim (int, optional): Embedding dimension, required when creating a store
+            dtype (str): Storage dtype for new stores, "float32" or "float16"
+
+        Raises:
+            ChunkStoreError: If the store cannot be opened or created
+        """
+        self.path = Path(path)
+        meta_path = self.path / self.META_FILE
+
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            if dim is not None and dim != meta["dim"]:
+                raise ChunkStoreError(f"Store has dim={meta['dim']}, requested dim={dim}")
+            self.dim, self.dtype = meta["dim"], np.dtype(meta["dtype"])
+        else:
+            if dim is None:
+                raise ChunkStoreError(f"No chunk store at {self.path} and no dim given to create one")
+            if np.dtype(dtype) not in (np.float32, np.float16):
+                raise ChunkStoreError(f"Unsupported embedding dtype: {dtype}")
+            self.dim, self.dtype = dim, np.dtype(dtype)
+            self.path.mkdir(parents=True, exist_ok=True)
+            meta_path.write_text(json.dumps({"dim": self.dim, "dtype": self.dtype.name}))
+
+    def __len__(self) -> int:
+        embeddings_path = self.path / self.EMBEDDINGS_FILE
+        if not embeddings_path.exists():
+            return 0
+        return embeddings_path.stat().st_size // (self.dim * self.dtype.itemsize)
+
+    def append(
+        self,
+        doc_id: str,
+        chunks: List[Dict],
+        embeddings: np.ndarray,
+        document: Optional[Dict] = None
+    ) -> None:
+        """
+        Append the chunks of one document.
+
+        Args:
+            doc_id (str): Identifier of the source document
+            chunks (List[Dict]): Chunk records with at least "id" and "text"
+            embeddings (np.ndarray): Matrix of shape (len(chunks), dim)
+            document (Dict, optional): Document-level metadata and stats
+
+        Raises:
+            ChunkStoreError: If the embeddings do not match the chunks
+        """
+        embeddings = np.asarray(embeddings)
+        if embeddings.shape != (len(chunks), self.dim):
+            raise ChunkStoreError(
+                f"Expected embeddings of shape {(len(chunks), self.dim)}, got {embeddings.shape}"
+            )
+
+        start = len(self)
+        with open(self.path / self.EMBEDDINGS_FILE, "ab") as f:
+            f.write(np.ascontiguousarray(embeddings, dtype=self.dtype).tobytes())
+
+        with open(self.path / self.CHUNKS_FILE, "a") as f:
+            for chunk in chunks:
+                f.write(json.dumps({
+                    "doc_id": doc_id,
+                    "chunk_id": chunk["id"],
+                    "page": chunk.get("page"),
+                    "text": chunk["text"]
+                }) + "\n")
+
+        with open(self.path / self.DOCUMENTS_FILE, "a") as f:
+            entry = {"doc_id": doc_id, "start": start, "count": len(chunks), **(document or {})}
+            f.write(json.dumps(entry, default=str) + "\n")
+
+        logger.debug(f"Appended {len(chunks)} chunks of {doc_id} to {self.path}")
+
+    def delete(self, doc_id: str) -> None:
+        """Record that a document was removed from the corpus."""
+        with open(self.path / self.DOCUMENTS_FILE, "a") as f:
+            f.write(json.dumps({"doc_id": doc_id, "deleted": True}) + "\n")
+
+    def documents(self) -> Iterator[Dict]:
+        """Yield document appends and deletions in the order they happened."""
+        documents_path = self.path / self.DOCUMENTS_FILE
+        if not documents_path.exists():
+            return
+        with open(documents_path) as f:
+            for line in f:
+                yield json.loads(line)
+
+    def embeddings(self) -> np.ndarray:
+        """
+        Memory-map the embedding matrix read-only.
+
+        Returns:
+            np.ndarray: Matrix of shape (len(self), dim) backed by the file
+        """
+        rows = len(self)
+        if rows == 0:
+            return np.empty((0, self.dim), dtype=self.dtype)
+        return np.memmap(self.path / self.EMBEDDINGS_FILE, dtype=self.dtype, mode="r", shape=(rows, self.dim))
+
+    def records(self) -> Iterator[Dict]:
+        """Yield chunk records in row order."""
+        chunks_path = self.path / self.CHUNKS_FILE
+        if not chunks_path.exists():
+            return
+        with open(chunks_path) as f:
+            for line in f:
+                yield json.loads(line)
+
+    def texts(self) -> List[str]:
+        """Chunk texts in row order."""
+        return [record["text"] for record in self.records()]
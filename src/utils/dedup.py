@@ -0,0 +1,193 @@
+from multiprocessing.managers import BaseManager
+from typing import Dict, List, Optional, Tuple
+import re
+import threading
+import zlib
+import numpy as np
+
+
+_WORD = re.compile(r"\w+")
+
+# Largest prime below 2**32: with a, b < p and hashes reduced mod p,
+# a * h + b < p**2 fits in uint64 without overflow
+_PRIME = np.uint64(4294967291)
+
+
+class MinHasher:
+    """
+    MinHash signatures of texts over their word shingles.
+
+    The fraction of positions where two signatures agree estimates the
+    Jaccard similarity of the texts' sets of ``shingle_size``-word shingles.
+    Signatures depend only on the text and the parameters, so they can be
+    computed in any process and compared anywhere.
+    """
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 3, seed: int = 0):
+        """
+        Args:
+            num_perm (int): Hash functions per signature; more is more accurate
+            shingle_size (int): Words per shingle
+            seed (int): Seed of the hash functions
+        """
+        if num_perm < 1 or shingle_size < 1:
+            raise ValueError("num_perm and shingle_size must be positive integers")
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_PRIME), num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.integers(0, int(_PRIME), num_perm, dtype=np.uint64)[:, None]
+
+    def _shingles(self, text: str) -> np.ndarray:
+        words = _WORD.findall(text.lower())
+        size = min(self.shingle_size, len(words))
+        shingles = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)} if size else set()
+        return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+    def signatures(self, texts: List[str]) -> np.ndarray:
+        """
+        Signatures of many texts.
+
+        Args:
+            texts (List[str]): Texts to sign
+
+        Returns:
+            np.ndarray: uint32 matrix of shape (len(texts), num_perm); rows of
+            texts without words are all 0xFFFFFFFF
+        """
+        signatures = np.full((len(texts), self.num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+        for row, text in enumerate(texts):
+            hashes = self._shingles(text) % _PRIME
+            if len(hashes):
+                signatures[row] = ((self._a * hashes + self._b) % _PRIME).min(axis=1)
+        return signatures
+
+
+def lsh_bands(threshold: float, num_perm: int, margin: float = 0.1) -> Tuple[int, int]:
+    """
+    Pick (bands, rows) with bands * rows == num_perm whose LSH threshold,
+    (1 / bands) ** (1 / rows), is the highest at least ``margin`` below
+    ``threshold``, so pairs at the threshold almost surely become
+    candidates; the exact signature comparison removes the extra ones.
+    """
+    options = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+    below = [option for option in options if (1 / option[0]) ** (1 / option[1]) <= threshold - margin]
+    return max(below, key=lambda option: option[1]) if below else options[0]
+
+
+class DuplicateIndex:
+    """
+    LSH index of MinHash signatures that flags near-duplicates as they arrive.
+
+    Signatures are split into bands; texts sharing any band are candidates,
+    and a candidate counts as a duplicate when the signatures agree in at
+    least ``threshold`` of their positions. Only texts that were not
+    duplicates are added, so the first copy seen is the one kept. Adding an
+    owner again first drops its earlier texts, so a document processed again
+    is compared with other documents, not with its old version.
+
+    A text dropped as a duplicate of another owner's text is only present
+    through that owner: if the owner is later removed or changed, the text
+    does not come back until its own document is processed again.
+
+    Safe to share between threads, and between processes through a
+    multiprocessing manager (see ``DedupManager``).
+    """
+
+    def __init__(self, threshold: float = 0.9, num_perm: int = 64):
+        """
+        Args:
+            threshold (float): Estimated Jaccard similarity at which a text is a duplicate
+            num_perm (int): Length of the signatures that will be added
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = lsh_bands(threshold, num_perm)
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        # Entry ids are positions; removed entries leave None behind
+        self._signatures: List[Optional[np.ndarray]] = []
+        self._owners: List[Optional[str]] = []
+        self._entries: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def _remove(self, owner: str) -> int:
+        entries = self._entries.pop(owner, [])
+        for entry in entries:
+            for bucket, key in zip(self._buckets, self._band_keys(self._signatures[entry])):
+                candidates = bucket[key]
+                candidates.remove(entry)
+                if not candidates:
+                    del bucket[key]
+            self._signatures[entry] = None
+            self._owners[entry] = None
+        return len(entries)
+
+    def remove(self, owner: str) -> int:
+        """
+        Drop every text added for an owner, e.g. a document deleted from the corpus.
+
+        Returns:
+            int: Number of texts dropped
+        """
+        with self._lock:
+            return self._remove(owner)
+
+    def check_and_add(self, signatures: np.ndarray, owner: str) -> List[Optional[str]]:
+        """
+        Check signatures in order and add the ones that are not duplicates.
+
+        Texts added for the owner by an earlier call are dropped first. Later
+        rows are checked against earlier rows of the same call, so duplicates
+        within one document are found as well.
+
+        Args:
+            signatures (np.ndarray): Matrix of shape (n, num_perm) from MinHasher
+            owner (str): Document the signatures belong to
+
+        Returns:
+            List[Optional[str]]: Per row, the owner of the text it duplicates,
+            or None if it was new (and has been added)
+        """
+        empty = np.iinfo(np.uint32).max
+        matches: List[Optional[str]] = []
+        with self._lock:
+            self._remove(owner)
+            for signature in np.asarray(signatures, dtype=np.uint32):
+                if signature[0] == empty and (signature == empty).all():
+                    # Texts without words are never considered duplicates
+                    matches.append(None)
+                    continue
+                keys = self._band_keys(signature)
+                match = None
+                for bucket, key in zip(self._buckets, keys):
+                    for candidate in bucket.get(key, ()):
+                        if np.mean(self._signatures[candidate] == signature) >= self.threshold:
+                            match = self._owners[candidate]
+                            break
+                    if match is not None:
+                        break
+                matches.append(match)
+                if match is None:
+                    entry = len(self._signatures)
+                    self._signatures.append(signature.copy())
+                    self._owners.append(owner)
+                    self._entries.setdefault(owner, []).append(entry)
+                    for bucket, key in zip(self._buckets, keys):
+                        bucket.setdefault(key, []).append(entry)
+        return matches
+
+
+class DedupManager(BaseManager):
+    """Multiprocessing manager serving one DuplicateIndex to several worker processes."""
+    pass
+
+
+DedupManager.register("DuplicateIndex", DuplicateIndex)
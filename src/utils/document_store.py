@@ -0,0 +1,189 @@
+import json
+import os
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+import numpy as np
+
+
+# Fixed-width per-chunk metadata; -1 marks a missing value
+META_DTYPE = np.dtype([("source", np.int32), ("page", np.int32), ("chunk_id", np.int32)])
+
+
+class DocumentStore:
+    """
+    Append-only sequence of chunk texts kept as UTF-8 bytes plus offsets.
+
+    A loaded store keeps its saved part memory-mapped and only decodes the
+    entries that are actually read; texts added afterwards go to an
+    in-memory tail until the next save.
+
+    Every chunk also carries fixed-width metadata: the source document (an
+    index into a table of source names, so each name is stored once), the
+    page it starts on and its id within the source.
+    """
+
+    TEXT_FILE = "documents.bin"
+    OFFSETS_FILE = "documents_offsets.npy"
+    META_FILE = "documents_meta.npy"
+    SOURCES_FILE = "documents_sources.json"
+
+    def __init__(self, texts: Iterable[str] = ()):
+        self._base = np.empty(0, dtype=np.uint8)
+        self._base_offsets = np.zeros(1, dtype=np.int64)
+        self._base_meta = np.empty(0, dtype=META_DTYPE)
+        self._tail = bytearray()
+        self._tail_offsets: List[int] = [0]
+        self._tail_meta = {field: array("i") for field in META_DTYPE.names}
+        self.sources: List[str] = []
+        self._source_ids: Dict[str, int] = {}
+        self.extend(texts)
+
+    def __len__(self) -> int:
+        return len(self._base_offsets) - 1 + len(self._tail_offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        i = int(i)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("document index out of range")
+
+        base_count = len(self._base_offsets) - 1
+        if i < base_count:
+            start, end = self._base_offsets[i], self._base_offsets[i + 1]
+            return self._base[start:end].tobytes().decode("utf-8")
+        i -= base_count
+        return bytes(self._tail[self._tail_offsets[i]:self._tail_offsets[i + 1]]).decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def metadata(self, i: int) -> Dict[str, Optional[int | str]]:
+        """
+        Metadata of one chunk.
+
+        Returns:
+            Dict: "source" (str), "page" (int) and "chunk_id" (int); None where unknown
+        """
+        i = int(i)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("document index out of range")
+
+        base_count = len(self._base_meta)
+        if i < base_count:
+            source, page, chunk_id = (int(value) for value in self._base_meta[i])
+        else:
+            i -= base_count
+            source, page, chunk_id = (self._tail_meta[field][i] for field in META_DTYPE.names)
+        return {
+            "source": self.sources[source] if source >= 0 else None,
+            "page": page if page >= 0 else None,
+            "chunk_id": chunk_id if chunk_id >= 0 else None
+        }
+
+    def extend(
+        self,
+        texts: Iterable[str],
+        source: Optional[str] = None,
+        pages: Optional[Iterable[Optional[int]]] = None,
+        chunk_ids: Optional[Iterable[int]] = None
+    ) -> None:
+        """
+        Append chunk texts with their metadata.
+
+        Args:
+            texts (Iterable[str]): Chunk texts
+            source (str, optional): Document all of these chunks come from
+            pages (Iterable[Optional[int]], optional): Page each chunk starts on
+            chunk_ids (Iterable[int], optional): Id of each chunk within its
+                source (default: the position within ``texts``)
+        """
+        texts = list(texts)
+        if source is None:
+            source_id = -1
+        elif source in self._source_ids:
+            source_id = self._source_ids[source]
+        else:
+            source_id = self._source_ids[source] = len(self.sources)
+            self.sources.append(source)
+        pages = [-1 if page is None else page for page in pages] if pages is not None else [-1] * len(texts)
+        chunk_ids = list(chunk_ids) if chunk_ids is not None else range(len(texts))
+        if not len(pages) == len(chunk_ids) == len(texts):
+            raise ValueError("pages and chunk_ids must have one entry per text")
+
+        for text in texts:
+            self._tail.extend(text.encode("utf-8"))
+            self._tail_offsets.append(len(self._tail))
+        self._tail_meta["source"].extend([source_id] * len(texts))
+        self._tail_meta["page"].extend(pages)
+        self._tail_meta["chunk_id"].extend(chunk_ids)
+
+    def save(self, path: str | Path) -> None:
+        """
+        Write the store into a directory.
+
+        Args:
+            path (str | Path): Target directory, created if missing
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        base_size = int(self._base_offsets[-1])
+        offsets = np.concatenate([
+            self._base_offsets,
+            base_size + np.asarray(self._tail_offsets[1:], dtype=np.int64)
+        ])
+        # Write beside the target and rename, so a store memory-mapped from
+        # the same directory keeps reading the old files
+        text_tmp = path / (self.TEXT_FILE + ".tmp")
+        offsets_tmp = path / (self.OFFSETS_FILE + ".tmp")
+        with open(text_tmp, "wb") as f:
+            f.write(memoryview(self._base))
+            f.write(self._tail)
+        with open(offsets_tmp, "wb") as f:
+            np.save(f, offsets)
+        tail_meta = np.empty(len(self._tail_offsets) - 1, dtype=META_DTYPE)
+        for field in META_DTYPE.names:
+            tail_meta[field] = np.frombuffer(self._tail_meta[field], dtype=np.int32)
+        meta_tmp = path / (self.META_FILE + ".tmp")
+        with open(meta_tmp, "wb") as f:
+            np.save(f, np.concatenate([self._base_meta, tail_meta]))
+        sources_tmp = path / (self.SOURCES_FILE + ".tmp")
+        sources_tmp.write_text(json.dumps(self.sources))
+        os.replace(text_tmp, path / self.TEXT_FILE)
+        os.replace(offsets_tmp, path / self.OFFSETS_FILE)
+        os.replace(meta_tmp, path / self.META_FILE)
+        os.replace(sources_tmp, path / self.SOURCES_FILE)
+
+    @classmethod
+    def load(cls, path: str | Path, mmap: bool = True) -> "DocumentStore":
+        """
+        Open a store written by ``save``.
+
+        Args:
+            path (str | Path): Directory the store was saved to
+            mmap (bool): Memory-map the files instead of reading them
+
+        Returns:
+            DocumentStore: The loaded store
+        """
+        path = Path(path)
+        store = cls()
+        mode = "r" if mmap else None
+        store._base_offsets = np.load(path / cls.OFFSETS_FILE, mmap_mode=mode)
+        if store._base_offsets[-1] > 0:
+            if mmap:
+                store._base = np.memmap(path / cls.TEXT_FILE, dtype=np.uint8, mode="r")
+            else:
+                store._base = np.fromfile(path / cls.TEXT_FILE, dtype=np.uint8)
+        if (path / cls.META_FILE).exists():
+            store._base_meta = np.load(path / cls.META_FILE, mmap_mode=mode)
+            store.sources = json.loads((path / cls.SOURCES_FILE).read_text())
+            store._source_ids = {source: i for i, source in enumerate(store.sources)}
+        else:
+            # Stores saved before metadata existed
+            store._base_meta = np.full(len(store._base_offsets) - 1, -1, dtype=META_DTYPE)
+        return store
@@ -0,0 +1,251 @@
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Tuple
+import hashlib
+import json
+import logging
+import os
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes are not locked against other processes
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCacheError(Exception):
+    """Custom exception for embedding cache errors"""
+    pass
+
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed store of text embeddings.
+
+    Records are appended to a single file as a 16-byte key followed by the
+    raw vector, where the key is a BLAKE2b digest of the model name and the
+    text. The key-to-row index is rebuilt from the file when the cache is
+    opened. When the cache grows past ``max_entries`` it is compacted down
+    to ``compact_ratio * max_entries`` rows, keeping the most recently used.
+
+    Several processes may share one cache. Appends and compaction hold an
+    exclusive lock on a lock file beside the records; compaction renumbers
+    rows, so it also increments a generation counter in the metadata, and
+    every process that sees a new generation rebuilds its key index before
+    using a row number.
+    """
+
+    META_FILE = "meta.json"
+    RECORDS_FILE = "embeddings.cache"
+    LOCK_FILE = "embeddings.lock"
+    KEY_SIZE = 16
+
+    def __init__(
+        self,
+        path: str | Path,
+        model_name: str,
+        dim: int,
+        max_entries: int = 1_000_000,
+        compact_ratio: float = 0.8,
+        dtype: str = "float32"
+    ):
+        """
+        Args:
+            path (str | Path): Cache directory, created if missing
+            model_name (str): Model the vectors come from; part of every key
+            dim (int): Embedding dimension
+            max_entries (int): Number of vectors above which the cache is compacted
+            compact_ratio (float): Fraction of max_entries kept by compaction
+            dtype (str): Storage dtype, "float32" or "float16"
+
+        Raises:
+            ValueError: If max_entries is not positive or compact_ratio is not in (0, 1]
+            EmbeddingCacheError: If an existing cache has a different dim or dtype
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be a positive integer")
+        if not 0 < compact_ratio <= 1:
+            raise ValueError("compact_ratio must be in (0, 1]")
+        self.path = Path(path)
+        self.model_name = model_name
+        self.dim = dim
+        self.max_entries = max_entries
+        self.compact_ratio = compact_ratio
+        self._dtype_name = np.dtype(dtype).name
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        self._record = np.dtype([("key", f"V{self.KEY_SIZE}"), ("vector", dtype, (dim,))])
+        self._rows: dict[bytes, int] = {}
+        self._last_used: dict[int, int] = {}
+        self._tick = 0
+        self._records = None
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+        meta_path = self.path / self.META_FILE
+        with self._locked(exclusive=True):
+            if meta_path.exists():
+                meta = json.loads(meta_path.read_text())
+                if meta["dim"] != dim or meta["dtype"] != self._dtype_name:
+                    raise EmbeddingCacheError(
+                        f"Cache at {self.path} holds dim={meta['dim']} {meta['dtype']} vectors, "
+                        f"requested dim={dim} {dtype}"
+                    )
+            else:
+                self._write_meta(0)
+            self._open()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _records_path(self) -> Path:
+        return self.path / self.RECORDS_FILE
+
+    @contextmanager
+    def _locked(self, exclusive: bool) -> Iterator[None]:
+        """Hold the cache lock; shared for reading row numbers, exclusive for writing."""
+        with open(self.path / self.LOCK_FILE, "ab") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read_generation(self) -> int:
+        meta = json.loads((self.path / self.META_FILE).read_text())
+        return meta.get("generation", 0)
+
+    def _write_meta(self, generation: int) -> None:
+        meta = {"dim": self.dim, "dtype": self._dtype_name, "generation": generation}
+        tmp_path = self.path / (self.META_FILE + ".tmp")
+        tmp_path.write_text(json.dumps(meta))
+        os.replace(tmp_path, self.path / self.META_FILE)
+
+    def _sync(self) -> None:
+        """Rebuild the key index if another process compacted the cache; call with the lock held."""
+        generation = self._read_generation()
+        if generation != self._generation:
+            logger.debug(f"Embedding cache {self.path} was compacted elsewhere, reloading")
+            self._open()
+
+    def _open(self) -> None:
+        """Map the records file and rebuild the key index; later rows win."""
+        self._generation = self._read_generation()
+        path = self._records_path()
+        rows = path.stat().st_size // self._record.itemsize if path.exists() else 0
+        self._records = np.memmap(path, dtype=self._record, mode="r", shape=(rows,)) if rows else None
+        self._rows = {key.tobytes(): row for row, key in enumerate(self._records["key"])} if rows else {}
+        self._last_used = {}
+        self._tick = rows
+
+    def key(self, text: str) -> bytes:
+        digest = hashlib.blake2b(digest_size=self.KEY_SIZE)
+        digest.update(self.model_name.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(text.encode("utf-8"))
+        return digest.digest()
+
+    def get_many(self, texts: List[str]) -> Tuple[np.ndarray, List[int]]:
+        """
+        Look up cached vectors.
+
+        Args:
+            texts (List[str]): Texts to look up
+
+        Returns:
+            Tuple[np.ndarray, List[int]]: float32 matrix with one row per text
+            (rows of missing texts are left at zero) and the positions of the
+            texts that were not cached
+        """
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        keys = [self.key(text) for text in texts]
+        found, rows, missing = [], [], []
+        with self._locked(exclusive=False):
+            self._sync()
+            for i, key in enumerate(keys):
+                row = self._rows.get(key)
+                if row is None:
+                    missing.append(i)
+                else:
+                    found.append(i)
+                    rows.append(row)
+                    self._tick += 1
+                    self._last_used[row] = self._tick
+            if rows and (self._records is None or max(rows) >= len(self._records)):
+                self._records = np.memmap(self._records_path(), dtype=self._record, mode="r")
+        # The mapping stays valid after the lock is released: a compaction
+        # replaces the file rather than rewriting it in place
+        if rows:
+            vectors[found] = self._records["vector"][rows]
+
+        self.hits += len(found)
+        self.misses += len(missing)
+        return vectors, missing
+
+    def put_many(self, texts: List[str], vectors: np.ndarray) -> None:
+        """Append vectors for texts not yet cached, compacting if the cache is full."""
+        vectors = np.asarray(vectors)
+        with self._locked(exclusive=True):
+            # Row numbers are only meaningful in the current generation
+            self._sync()
+            keys, keep, seen = [], [], set()
+            for i, text in enumerate(texts):
+                key = self.key(text)
+                if key not in self._rows and key not in seen:
+                    seen.add(key)
+                    keys.append(key)
+                    keep.append(i)
+            if not keep:
+                return
+            records = np.zeros(len(keep), dtype=self._record)
+            records["key"] = np.array(keys, dtype=f"V{self.KEY_SIZE}")
+            records["vector"] = vectors[keep]
+
+            with open(self._records_path(), "ab") as f:
+                start = f.seek(0, os.SEEK_END) // self._record.itemsize
+                f.write(records.tobytes())
+
+            for offset, record in enumerate(records):
+                self._rows[record["key"].tobytes()] = start + offset
+                self._tick += 1
+                self._last_used[start + offset] = self._tick
+
+            if len(self._rows) > self.max_entries:
+                self._compact()
+
+    def compact(self) -> None:
+        """Rewrite the file keeping the most recently used vectors."""
+        with self._locked(exclusive=True):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Compaction proper; call with the exclusive lock held."""
+        # Re-read the whole file so entries appended by other processes are
+        # ranked too, not silently dropped; keep this process's recency
+        generation, last_used, tick = self._generation, self._last_used, self._tick
+        self._open()
+        if self._generation == generation:
+            self._last_used, self._tick = last_used, max(tick, self._tick)
+        # At least one row, so the slice below is never [-0:] (which keeps every row)
+        keep_count = max(1, int(self.max_entries * self.compact_ratio))
+        live_rows = np.fromiter(self._rows.values(), dtype=np.int64, count=len(self._rows))
+        # Rows not used by this process since it opened the cache rank by age (row order)
+        recency = np.array([self._last_used.get(row, row) for row in live_rows], dtype=np.int64)
+        kept = np.sort(live_rows[np.argsort(recency)[-keep_count:]])
+
+        tmp_path = self._records_path().with_suffix(".tmp")
+        records = self._records
+        with open(tmp_path, "wb") as f:
+            for start in range(0, len(kept), 65536):
+                f.write(np.ascontiguousarray(records[kept[start:start + 65536]]).tobytes())
+        del records
+        os.replace(tmp_path, self._records_path())
+        self._write_meta(self._generation + 1)
+        logger.info(f"Compacted embedding cache {self.path} from {len(live_rows)} to {len(kept)} entries")
+        self._open()
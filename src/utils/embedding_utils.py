@@ -1,14 +1,135 @@
-from sentence_transformers import SentenceTransformer
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional
 import numpy as np
+from .embedding_cache import EmbeddingCache
+from .metrics import metrics
+from .model_registry import model_registry
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 class Embedder:
-    def __init__(self, model: str = 'sentence-transformers/all-MiniLM-L6-v2'):
+    def __init__(
+        self,
+        model: str = 'sentence-transformers/all-MiniLM-L6-v2',
+        batch_size: int = 64,
+        normalize: bool = False,
+        cache_dir: Optional[str | Path] = None,
+        cache_max_entries: int = 1_000_000,
+        backend: str = "torch"
+    ):
         """
+        Initialize the embedder.
+
+        The model is loaded on first use through the shared model registry,
+        so embedders naming the same model share one copy.
+
+        Args:
+            model (str): Name of the sentence-transformer model to use
+            batch_size (int): Number of texts encoded per forward pass
+            normalize (bool): L2-normalize embeddings so inner product equals cosine
+            cache_dir (str | Path, optional): Directory of a persistent embedding cache;
+                texts already embedded by the same model are not re-encoded
+            cache_max_entries (int): Size bound of the embedding cache
+            backend (str): Inference backend, "torch" (fp32), "int8" (dynamically
+                quantized PyTorch), "onnx" or "onnx-int8" (ONNX Runtime); see
+                utils.inference_backends
         """
-        self.model = SentenceTransformer(model)
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+
+        self.model_name = model
+        self.backend = backend
+        self._model = None
+        self.batch_size = batch_size
+        self.normalize = normalize
+        self.cache_dir = cache_dir
+        self.cache_max_entries = cache_max_entries
+        self._cache: Optional[EmbeddingCache] = None
 
-    def embed_text(self, text: str, model) -> np.ndarray:
+    @property
+    def model(self) -> "SentenceTransformer":
+        """The sentence-transformer, loaded on first access."""
+        if self._model is None:
+            self._model = model_registry.sentence_transformer(self.model_name, backend=self.backend)
+        return self._model
+
+    @property
+    def cache(self) -> Optional[EmbeddingCache]:
+        """The embedding cache, opened on first access (which loads the model for its dimension)."""
+        if self.cache_dir is not None and self._cache is None:
+            # int8 vectors differ measurably from fp32 ones, so they get their own
+            # cache keys; the fp32 ONNX graph computes the same values as PyTorch
+            cache_model = f"{self.model_name}:{self.backend}" if self.backend.endswith("int8") else self.model_name
+            self._cache = EmbeddingCache(
+                self.cache_dir, cache_model, self.dimension, max_entries=self.cache_max_entries
+            )
+        return self._cache
+
+    @property
+    def dimension(self) -> int:
+        """Dimension of the produced embeddings."""
+        return self.model.get_sentence_embedding_dimension()
+
+    def embed_text(self, text: str, model: Optional["SentenceTransformer"] = None) -> np.ndarray:
         """
         Embed the input text into a dense vector representation.
         """
-        return self.model.encode(text)
\ No newline at end of file
+        if model is not None and model is not self.model:
+            return np.asarray(model.encode(text, normalize_embeddings=self.normalize), dtype=np.float32)
+        return self.embed_batch([text])[0]
+
+    def embed_batch(
+        self,
+        texts: List[str],
+        batch_size: Optional[int] = None,
+        normalize: Optional[bool] = None
+    ) -> np.ndarray:
+        """
+        Embed a list of texts in batches.
+
+        Args:
+            texts (List[str]): Texts to embed
+            batch_size (int, optional): Overrides the embedder's batch size
+            normalize (bool, optional): Overrides the embedder's normalization setting
+
+        Returns:
+            np.ndarray: C-contiguous float32 matrix of shape (len(texts), dimension)
+        """
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+
+        normalize = self.normalize if normalize is None else normalize
+        with metrics.span("embedder.embed_batch", items=len(texts)):
+            if self.cache_dir is None:
+                return self._encode(list(texts), batch_size, normalize)
+
+            # Cached vectors are stored unnormalized so one cache serves both settings
+            texts = list(texts)
+            embeddings, missing = self.cache.get_many(texts)
+            metrics.count("embedding_cache.hits", len(texts) - len(missing))
+            metrics.count("embedding_cache.misses", len(missing))
+            if missing:
+                unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+                encoded = self._encode(unique_texts, batch_size, False)
+                self.cache.put_many(unique_texts, encoded)
+                rows = {text: row for row, text in enumerate(unique_texts)}
+                embeddings[missing] = encoded[[rows[texts[i]] for i in missing]]
+            if normalize:
+                norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+                embeddings /= np.maximum(norms, 1e-12)
+            return embeddings
+
+    def _encode(self, texts: List[str], batch_size: Optional[int], normalize: bool) -> np.ndarray:
+        batch_size = batch_size or self.batch_size
+        metrics.count("embedder.model_calls", -(-len(texts) // batch_size))
+        metrics.count("embedder.encoded_texts", len(texts))
+        metrics.observe("embedder.request_size", len(texts))
+        embeddings = self.model.encode(
+            texts,
+            batch_size=batch_size,
+            normalize_embeddings=normalize,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
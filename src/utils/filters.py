@@ -1,14 +1,61 @@
-import spacy
-from typing import List, Optional
+from typing import Callable, Dict, FrozenSet, List, Optional
+import logging
+from .metrics import metrics
+from .model_registry import ModelRegistryError, model_registry
+
+
+logger = logging.getLogger(__name__)
 
 class FilterError(Exception):
     """Custom exception for filtering errors"""
     pass
 
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError as e:
-    raise FilterError("Failed to load spaCy model: en_core_web_sm. Please ensure it's installed.")
+SPACY_MODEL = "en_core_web_sm"
+
+def get_nlp():
+    """
+    The shared spaCy pipeline, loaded on first use.
+
+    Raises:
+        FilterError: If the spaCy model is not installed
+    """
+    try:
+        return model_registry.spacy(SPACY_MODEL)
+    except ModelRegistryError as e:
+        raise FilterError(str(e)) from e
+
+def __getattr__(name: str):
+    # ``filters.nlp`` keeps working without loading spaCy at import time
+    if name == "nlp":
+        return get_nlp()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Components the filters depend on. Models without static vectors (such as
+# en_core_web_sm) answer ``has_vector`` from the tok2vec tensor, so it must
+# stay enabled; the tagger, parser, lemmatizer and NER are never read.
+_FILTER_COMPONENTS = {"tok2vec"}
+
+def _disabled_components() -> List[str]:
+    return [name for name in get_nlp().pipe_names if name not in _FILTER_COMPONENTS]
+
+def _recognized_ratio(doc) -> Optional[float]:
+    valid_tokens = [token for token in doc if token.is_alpha and not token.is_punct and not token.like_num]
+    if not valid_tokens:
+        return None
+    return sum(1 for token in valid_tokens if token.lemma_ != "-PRON-" and token.has_vector) / len(valid_tokens)
+
+def _stopword_ratio(doc) -> Optional[float]:
+    tokens = [t for t in doc if t.is_alpha]
+    if not tokens:
+        return None
+    return sum(1 for t in tokens if t.is_stop) / len(tokens)
+
+def _passes_filters(doc) -> bool:
+    recognized_ratio = _recognized_ratio(doc)
+    if recognized_ratio is None or recognized_ratio <= 0.6:
+        return False
+    stopword_ratio = _stopword_ratio(doc)
+    return stopword_ratio is not None and stopword_ratio <= 0.2
 
 def language_filter(text: str) -> bool:
     try:
@@ -18,15 +65,10 @@ def language_filter(text: str) -> bool:
         if not text.strip():
             return False
             
-        doc = nlp(text)
+        doc = get_nlp()(text, disable=_disabled_components())
+        recognized_ratio = _recognized_ratio(doc)
         
-        valid_tokens = [token for token in doc if token.is_alpha and not token.is_punct and not token.like_num]
-        if not valid_tokens:
-            return False
-        
-        recognized_ratio = sum(1 for token in valid_tokens if token.lemma_ != "-PRON-" and token.has_vector) / len(valid_tokens)
-        
-        return recognized_ratio > 0.6
+        return recognized_ratio is not None and recognized_ratio > 0.6
         
     except Exception as e:
         raise FilterError(f"Language filter failed: {str(e)}")
@@ -39,22 +81,147 @@ def stopword_filter(text: str) -> bool:
         if not text.strip():
             return False
             
-        doc = nlp(text)
-        tokens = [t for t in doc if t.is_alpha]
+        doc = get_nlp()(text, disable=_disabled_components())
+        stopword_ratio = _stopword_ratio(doc)
         
-        if not tokens:
-            return False
-            
-        stopword_ratio = sum(1 for t in tokens if t.is_stop) / len(tokens)
-        return stopword_ratio <= 0.2
+        return stopword_ratio is not None and stopword_ratio <= 0.2
         
     except Exception as e:
         raise FilterError(f"Stopword filter failed: {str(e)}")
 
-def filter_segments(segments: List[str]) -> List[str]:
+# Punctuation the tokenizer always splits off a word's start or end; words
+# wrapped in anything else (apostrophes, hyphens, digits) are left to spaCy
+_PREFIX_PUNCT = "\"([{"
+_SUFFIX_PUNCT = ",;:!?\")]}"
+
+class LexicalTables:
     """
+    Lookup tables exported once from the spaCy pipeline, answering the
+    filters' questions about a plain word without running the pipeline.
+
+    For a segment that tokenizes to a single alphabetic word, the language
+    and stopword ratios are 0 or 1, so the segment passes exactly when the
+    word has a vector, is not a stopword and is not a number word.
+    """
+
+    def __init__(
+        self,
+        stop_words: FrozenSet[str],
+        special_cases: FrozenSet[str],
+        vector_words: Optional[FrozenSet[str]],
+        like_num: Callable[[str], bool]
+    ):
+        """
+        Args:
+            stop_words (FrozenSet[str]): Lowercase stopwords
+            special_cases (FrozenSet[str]): Strings the tokenizer splits or keeps by exception
+            vector_words (FrozenSet[str], optional): Words with a static vector; None
+                if every token has a vector (context vectors from tok2vec)
+            like_num (Callable[[str], bool]): The language's number-word test
+        """
+        self.stop_words = stop_words
+        self.special_cases = special_cases
+        self.vector_words = vector_words
+        self.like_num = like_num
+
+    @classmethod
+    def from_nlp(cls, nlp) -> "LexicalTables":
+        from spacy.attrs import LIKE_NUM
+
+        vectors = nlp.vocab.vectors
+        if vectors.mode == "floret" or (vectors.size == 0 and "tok2vec" in nlp.pipe_names):
+            # Token.has_vector falls back to the tok2vec tensor, which every token has
+            vector_words = None
+        else:
+            vector_words = frozenset(nlp.vocab.strings[key] for key in vectors.keys())
+        return cls(
+            stop_words=frozenset(word.lower() for word in nlp.Defaults.stop_words),
+            special_cases=frozenset(nlp.tokenizer.rules or ()),
+            vector_words=vector_words,
+            like_num=nlp.vocab.lex_attr_getters.get(LIKE_NUM, lambda text: False)
+        )
+
+    def decide(self, segment: str) -> Optional[bool]:
+        """
+        Whether ``filter_segments`` would keep a stripped, space-free segment,
+        or None if that cannot be told from the tables.
+        """
+        if not any(char.isalpha() for char in segment):
+            # No alphabetic token, so neither ratio is defined
+            return False
+        word = segment.lstrip(_PREFIX_PUNCT).rstrip(_SUFFIX_PUNCT)
+        if word.endswith(".") and len(word) > 1 and word[-2].islower():
+            # A period after a lowercase letter is split off unless it is an exception
+            if word in self.special_cases:
+                return None
+            word = word[:-1].rstrip(_SUFFIX_PUNCT)
+        if not word.isalpha() or segment in self.special_cases or word in self.special_cases:
+            return None
+        if self.like_num(word) or word.lower() in self.stop_words:
+            return False
+        return self.vector_words is None or word in self.vector_words
+
+def get_lexical_tables() -> LexicalTables:
+    """The lexical tables of the shared spaCy pipeline, built on first use."""
+    return model_registry.get(("lexical-tables", SPACY_MODEL), lambda: LexicalTables.from_nlp(get_nlp()))
+
+def filter_words(words: List[str], batch_size: int = 256, n_process: int = 1) -> List[str]:
+    """
+    ``filter_segments`` for word-level segments, deciding plain words from
+    lookup tables.
+
+    Each distinct word is decided once. Words that are one alphabetic
+    token, optionally wrapped in punctuation, are answered by
+    ``LexicalTables``; only the rest (contractions, hyphenated or
+    alphanumeric words, tokenizer exceptions) go through spaCy.
+
+    Args:
+        words (List[str]): Segments, typically a text split on spaces
+        batch_size (int): Number of segments spaCy processes per batch
+        n_process (int): Number of spaCy worker processes for the fallback
+
+    Returns:
+        List[str]: The segments that pass, in order, as ``filter_segments`` returns them
+
+    Raises:
+        FilterError: If filtering process fails
+        TypeError: If input is not a list of strings
+    """
+    if not isinstance(words, list):
+        raise TypeError("Input must be a list of strings")
+
+    candidates = [word.strip() for word in words if isinstance(word, str)]
+    candidates = [word for word in candidates if word]
+    if not candidates:
+        return []
+
+    with metrics.span("filter_words", items=len(candidates)):
+        tables = get_lexical_tables()
+        decisions: Dict[str, Optional[bool]] = {}
+        for word in dict.fromkeys(candidates):
+            # Segments with inner whitespace are several tokens; spaCy decides them
+            decisions[word] = None if len(word.split()) > 1 else tables.decide(word)
+        ambiguous = [word for word, decision in decisions.items() if decision is None]
+        if ambiguous:
+            kept = set(filter_segments(ambiguous, batch_size=batch_size, n_process=n_process))
+            decisions.update((word, word in kept) for word in ambiguous)
+        filtered = [word for word in candidates if decisions[word]]
+
+    metrics.count("filter_words.fallback", len(ambiguous))
+    metrics.count("filter_words.kept", len(filtered))
+    metrics.count("filter_words.dropped", len(candidates) - len(filtered))
+    return filtered
+
+def filter_segments(segments: List[str], batch_size: int = 256, n_process: int = 1) -> List[str]:
+    """
+    Each segment is parsed once through ``nlp.pipe`` and both the language
+    and stopword ratios are computed from the same Doc.
+
     Args:
         segments (List[str]): List of text segments to filter
+        batch_size (int): Number of segments spaCy processes per batch
+        n_process (int): Number of worker processes; values above 1 spread
+            large corpora across cores, -1 uses all of them
         
     Returns:
         List[str]: List of filtered segments that pass all criteria
@@ -67,28 +234,31 @@ def filter_segments(segments: List[str]) -> List[str]:
         if not isinstance(segments, list):
             raise TypeError("Input must be a list of strings")
             
-        filtered = []
-        for seg in segments:
-            try:
-                if not isinstance(seg, str):
-                    continue
-                    
-                seg = seg.strip()
-                if not seg:
-                    continue
-                    
-                if not language_filter(seg):
-                    continue
-                    
-                if not stopword_filter(seg):
+        candidates = [seg.strip() for seg in segments if isinstance(seg, str)]
+        candidates = [seg for seg in candidates if seg]
+        if not candidates:
+            return []
+
+        with metrics.span("filter_segments", items=len(candidates)):
+            docs = get_nlp().pipe(
+                candidates,
+                batch_size=batch_size,
+                n_process=n_process,
+                disable=_disabled_components()
+            )
+
+            filtered = []
+            for seg, doc in zip(candidates, docs):
+                try:
+                    if _passes_filters(doc):
+                        filtered.append(seg)
+                        
+                except Exception as e:
+                    logger.warning(f"Error processing segment: {str(e)}", exc_info=True)
                     continue
-                    
-                filtered.append(seg)
-                
-            except FilterError as e:
-                print(f"Error processing segment: {str(e)}")
-                continue
-                
+
+        metrics.count("filter_segments.kept", len(filtered))
+        metrics.count("filter_segments.dropped", len(candidates) - len(filtered))
         return filtered
         
     except Exception as e:
@@ -0,0 +1,59 @@
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[int]],
+    top_k: int,
+    k: int = 60
+) -> Tuple[List[int], List[float]]:
+    """
+    Fuse ranked id lists by summing 1 / (k + rank) over the lists.
+
+    Args:
+        rankings (Sequence[Sequence[int]]): Ranked document ids, best first
+        top_k (int): Number of fused results
+        k (int): Rank damping constant
+
+    Returns:
+        Tuple[List[int], List[float]]: Fused ids and scores, best first
+    """
+    scores: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[int(doc_id)] = scores.get(int(doc_id), 0.0) + 1.0 / (k + rank + 1)
+    best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+    return [doc_id for doc_id, _ in best], [score for _, score in best]
+
+
+def weighted_fusion(
+    dense: Tuple[Sequence[int], Sequence[float]],
+    lexical: Tuple[Sequence[int], Sequence[float]],
+    top_k: int,
+    alpha: float = 0.5
+) -> Tuple[List[int], List[float]]:
+    """
+    Fuse min-max normalized scores as alpha * dense + (1 - alpha) * lexical.
+
+    Both inputs are (ids, scores) with higher scores meaning better matches.
+
+    Args:
+        dense (Tuple): Dense ids and similarity scores
+        lexical (Tuple): Lexical ids and BM25 scores
+        top_k (int): Number of fused results
+        alpha (float): Weight of the dense scores
+
+    Returns:
+        Tuple[List[int], List[float]]: Fused ids and scores, best first
+    """
+    scores: Dict[int, float] = {}
+    for (ids, raw), weight in ((dense, alpha), (lexical, 1.0 - alpha)):
+        raw = np.asarray(raw, dtype=np.float64)
+        if not len(raw):
+            continue
+        spread = raw.max() - raw.min()
+        normalized = (raw - raw.min()) / spread if spread > 0 else np.ones_like(raw)
+        for doc_id, score in zip(ids, normalized):
+            scores[int(doc_id)] = scores.get(int(doc_id), 0.0) + weight * float(score)
+    best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+    return [doc_id for doc_id, _ in best], [score for _, score in best]
@@ -0,0 +1,104 @@
+from typing import Optional
+import logging
+import faiss
+
+
+logger = logging.getLogger(__name__)
+
+
+INDEX_TYPES = ("flat", "hnsw", "ivf_flat", "ivf_pq", "pq", "sq8", "sq_fp16")
+
+# Cosine similarity is inner product over L2-normalized vectors; callers
+# normalize both the indexed vectors and the queries.
+METRICS = {
+    "l2": faiss.METRIC_L2,
+    "ip": faiss.METRIC_INNER_PRODUCT,
+    "cosine": faiss.METRIC_INNER_PRODUCT
+}
+
+
+def factory_string(
+    index_type: str = "flat",
+    nlist: int = 1024,
+    hnsw_m: int = 32,
+    pq_m: int = 16,
+    pq_nbits: int = 8
+) -> str:
+    """
+    Translate an index type and its build parameters into a FAISS factory string.
+
+    Args:
+        index_type (str): One of "flat", "hnsw", "ivf_flat", "ivf_pq", "pq"
+            (product quantization without IVF), "sq8" (int8 scalar
+            quantization) or "sq_fp16" (float16)
+        nlist (int): Number of IVF coarse clusters
+        hnsw_m (int): Neighbours per node in the HNSW graph
+        pq_m (int): Number of PQ sub-quantizers; must divide the dimension
+        pq_nbits (int): Bits per PQ sub-quantizer code
+
+    Returns:
+        str: Description accepted by ``faiss.index_factory``
+    """
+    if index_type == "flat":
+        return "Flat"
+    if index_type == "hnsw":
+        return f"HNSW{hnsw_m}"
+    if index_type == "ivf_flat":
+        return f"IVF{nlist},Flat"
+    if index_type == "ivf_pq":
+        return f"IVF{nlist},PQ{pq_m}x{pq_nbits}"
+    if index_type == "pq":
+        return f"PQ{pq_m}x{pq_nbits}"
+    if index_type == "sq8":
+        return "SQ8"
+    if index_type == "sq_fp16":
+        return "SQfp16"
+    raise ValueError(f"Unknown index type: {index_type}. Expected one of {INDEX_TYPES}")
+
+
+def build_index(dim: int, index_type: str = "flat", metric: str = "l2", **params) -> faiss.Index:
+    """
+    Create an empty FAISS index.
+
+    Args:
+        dim (int): Vector dimension
+        index_type (str): One of INDEX_TYPES
+        metric (str): One of "l2", "ip", "cosine"
+        **params: Build parameters forwarded to ``factory_string``
+
+    Returns:
+        faiss.Index: The index; IVF indexes must be trained before adding
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric: {metric}. Expected one of {tuple(METRICS)}")
+    return faiss.index_factory(dim, factory_string(index_type, **params), METRICS[metric])
+
+
+def min_training_vectors(index_type: str, nlist: int = 1024, pq_nbits: int = 8) -> int:
+    """Fewest vectors an index of this type can be trained on (0 if it needs no training)."""
+    if index_type.startswith("ivf_"):
+        return nlist
+    if index_type == "pq":
+        return 2 ** pq_nbits
+    if index_type.startswith("sq"):
+        return 1
+    return 0
+
+
+def set_search_params(index: faiss.Index, nprobe: Optional[int] = None, ef_search: Optional[int] = None) -> None:
+    """
+    Apply runtime search knobs; parameters the index does not have are ignored with a warning.
+
+    Args:
+        index (faiss.Index): Index to configure
+        nprobe (int, optional): IVF clusters visited per query
+        ef_search (int, optional): HNSW candidate list size per query
+    """
+    space = faiss.ParameterSpace()
+    for name, value in (("nprobe", nprobe), ("efSearch", ef_search)):
+        if value is None:
+            continue
+        try:
+            space.set_index_parameter(index, name, value)
+        except RuntimeError:
+            logger.warning(f"Ignoring {name}={value}: not a search parameter of this index")
@@ -0,0 +1,404 @@
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import hashlib
+import logging
+import os
+import numpy as np
+import torch
+from .model_registry import model_registry
+
+try:
+    import fcntl
+except ImportError:  # Windows: concurrent exports of one model are not serialized
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+# "torch": fp32 eager PyTorch; "int8": PyTorch with dynamically quantized
+# Linear layers; "onnx": fused fp32 graph exported once and run by ONNX
+# Runtime; "onnx-int8": the same graph with int8 weights
+BACKENDS = ("torch", "int8", "onnx", "onnx-int8")
+ONNX_OPSET = 17
+DEFAULT_ONNX_CACHE = Path(os.environ.get("RAG_ONNX_CACHE", Path.home() / ".cache" / "rag" / "onnx"))
+
+# Thread counts requested through configure_threads, applied to ONNX Runtime
+# sessions created afterwards (PyTorch is configured directly)
+_threads: Dict[str, Optional[int]] = {"intra_op": None, "inter_op": None}
+
+
+class BackendError(Exception):
+    """Custom exception for inference backend errors"""
+    pass
+
+
+def validate_backend(backend: str) -> None:
+    if backend not in BACKENDS:
+        raise BackendError(f"Unknown inference backend: {backend} (expected one of {', '.join(BACKENDS)})")
+
+
+def configure_threads(intra_op: Optional[int] = None, inter_op: Optional[int] = None) -> None:
+    """
+    Set the CPU thread pools used for inference.
+
+    PyTorch is configured immediately; ONNX Runtime sessions created later
+    use the same counts. Without an explicit intra-op count, sessions follow
+    ``torch.get_num_threads()``.
+
+    Args:
+        intra_op (int, optional): Threads used inside one operator (matrix multiplies)
+        inter_op (int, optional): Threads running independent operators concurrently
+    """
+    if intra_op is not None:
+        torch.set_num_threads(intra_op)
+        _threads["intra_op"] = intra_op
+    if inter_op is not None:
+        _threads["inter_op"] = inter_op
+        try:
+            torch.set_num_interop_threads(inter_op)
+        except RuntimeError:
+            # PyTorch only accepts this before its inter-op pool has started
+            logger.warning(f"PyTorch inter-op threads already started; keeping {torch.get_num_interop_threads()}")
+
+
+def quantize_dynamic(model: torch.nn.Module) -> torch.nn.Module:
+    """
+    Quantize the weights of every Linear layer to int8 in place.
+
+    Activations are quantized on the fly per batch, so no calibration data
+    is needed. Embeddings and layer norms stay in fp32.
+    """
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+class _FirstOutput(torch.nn.Module):
+    """Positional-input wrapper returning a transformers model's first output, for export."""
+
+    def __init__(self, model: torch.nn.Module, input_names: List[str]):
+        super().__init__()
+        self.model = model
+        self.input_names = input_names
+
+    def forward(self, *inputs: torch.Tensor) -> torch.Tensor:
+        return self.model(**dict(zip(self.input_names, inputs)), return_dict=False)[0]
+
+
+class OnnxModel(torch.nn.Module):
+    """
+    ONNX Runtime session behind the call signature of a transformers model.
+
+    It can replace the model inside a SentenceTransformer or a
+    ChunkingPipeline: it takes the tokenizer's tensors and returns the
+    usual output object (``last_hidden_state`` or ``logits``).
+    """
+
+    def __init__(self, session, config, output_class: Callable, output_field: str):
+        """
+        Args:
+            session (onnxruntime.InferenceSession): Session of the exported graph
+            config (PretrainedConfig): Config of the original model
+            output_class (Callable): transformers output class to wrap results in
+            output_field (str): Field of output_class holding the graph output
+        """
+        super().__init__()
+        self.session = session
+        self.config = config
+        self._output_class = output_class
+        self._output_field = output_field
+        self._input_names = [node.name for node in session.get_inputs()]
+
+    def forward(self, input_ids=None, attention_mask=None, token_type_ids=None, **kwargs):
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask, "token_type_ids": token_type_ids}
+        feeds = {name: inputs[name].cpu().numpy() for name in self._input_names}
+        output = torch.from_numpy(self.session.run(None, feeds)[0])
+        return self._output_class(**{self._output_field: output})
+
+
+def _onnx_dir(name: str, kind: str, cache_dir: Optional[Path]) -> Path:
+    """Cache directory of one exported model; local models are keyed by path and config mtime."""
+    import onnxruntime as ort
+
+    source = Path(name)
+    identity = name
+    if source.exists():
+        config = source / "config.json"
+        identity = f"{source.resolve()}@{config.stat().st_mtime_ns if config.exists() else 0}"
+    digest = hashlib.blake2b(
+        f"{identity}|{kind}|{ONNX_OPSET}|{torch.__version__}|{ort.__version__}".encode("utf-8"), digest_size=8
+    ).hexdigest()
+    return Path(cache_dir or DEFAULT_ONNX_CACHE) / f"{source.name}-{kind}-{digest}"
+
+
+@contextmanager
+def _export_lock(directory: Path) -> Iterator[None]:
+    """Serialize exports into one cache directory across processes, e.g. pool workers starting together."""
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / ".lock", "w") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _replace(path: Path, write: Callable[[Path], None]) -> None:
+    """Write a file under a temporary name and rename it, so concurrent workers never read a partial graph."""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def export_onnx(model: torch.nn.Module, tokenizer, path: Path) -> Path:
+    """
+    Export a transformers model's first output to an ONNX graph.
+
+    Batch and sequence axes are dynamic. The graph is then passed through
+    ONNX Runtime's transformer optimizer, which fuses attention, GELU and
+    layer normalization into single kernels; models it does not recognize
+    are kept unfused.
+
+    Args:
+        model (torch.nn.Module): Model in eval mode
+        tokenizer: Its tokenizer, used to build sample inputs
+        path (Path): Output file
+
+    Returns:
+        Path: The written graph
+    """
+    from onnxruntime.transformers import optimizer
+
+    sample = tokenizer(["export sample", "a slightly longer export sample"], padding=True, return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    wrapper = _FirstOutput(model, input_names).eval()
+    inputs = tuple(sample[name] for name in input_names)
+    with torch.no_grad():
+        output_rank = wrapper(*inputs).dim()
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["output"] = {0: "batch", 1: "sequence"} if output_rank == 3 else {0: "batch"}
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    raw_path = path.with_name(f"{path.stem}.raw.{os.getpid()}.onnx")
+    torch.onnx.export(
+        wrapper, inputs, str(raw_path),
+        input_names=input_names,
+        output_names=["output"],
+        dynamic_axes=dynamic_axes,
+        opset_version=ONNX_OPSET,
+        dynamo=False
+    )
+    try:
+        fused = optimizer.optimize_model(
+            str(raw_path), model_type="bert",
+            num_heads=model.config.num_attention_heads, hidden_size=model.config.hidden_size
+        )
+        _replace(path, lambda tmp_path: fused.save_model_to_file(str(tmp_path)))
+    except Exception as e:
+        logger.warning(f"Transformer fusion failed, keeping the plain export: {e}")
+        os.replace(raw_path, path)
+    finally:
+        raw_path.unlink(missing_ok=True)
+    logger.info(f"Exported ONNX graph to {path}")
+    return path
+
+
+def quantize_onnx(path: Path, out_path: Path, keep_float: str = "classifier") -> Path:
+    """
+    Quantize the weights of an ONNX graph to int8, with activations
+    quantized dynamically at run time.
+
+    Args:
+        path (Path): fp32 graph
+        out_path (Path): Quantized graph
+        keep_float (str): Nodes whose name contains this stay in fp32; by
+            default the task head, as in the "int8" PyTorch backend
+    """
+    import onnx
+    from onnxruntime.quantization import QuantType, quantize_dynamic as quantize_graph
+
+    excluded = [node.name for node in onnx.load(str(path)).graph.node if keep_float in node.name]
+    # Fused contrib operators defeat ONNX shape inference; their tensors are float
+    _replace(out_path, lambda tmp_path: quantize_graph(
+        str(path), str(tmp_path), weight_type=QuantType.QInt8, nodes_to_exclude=excluded,
+        extra_options={"DefaultTensorType": onnx.TensorProto.FLOAT}
+    ))
+    logger.info(f"Quantized ONNX graph to {out_path}")
+    return out_path
+
+
+def onnx_session(path: Path):
+    """Create an ONNX Runtime CPU session using the configured thread counts."""
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = _threads["intra_op"] or torch.get_num_threads()
+    options.inter_op_num_threads = _threads["inter_op"] or 1
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return ort.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+
+
+def _onnx_model(name: str, kind: str, backend: str, load_model: Callable[[], torch.nn.Module], tokenizer,
+                output_class: Callable, output_field: str, cache_dir: Optional[Path], config=None) -> "OnnxModel":
+    """
+    ONNX Runtime replacement for a transformers model, exporting it on first use.
+
+    Graphs are cached as ``model.onnx`` (fp32) and ``model.int8.onnx`` under
+    the cache directory; ``load_model`` is only called to export.
+    """
+    directory = _onnx_dir(name, kind, cache_dir)
+    path = directory / "model.onnx"
+    quantized = directory / "model.int8.onnx"
+    model = None
+    if not path.exists() or (backend == "onnx-int8" and not quantized.exists()):
+        with _export_lock(directory):
+            if not path.exists():
+                model = load_model()
+                export_onnx(model, tokenizer, path)
+            if backend == "onnx-int8" and not quantized.exists():
+                quantize_onnx(path, quantized)
+    if backend == "onnx-int8":
+        path = quantized
+    if config is None:
+        config = model.config if model is not None else _load_config(name)
+    return OnnxModel(onnx_session(path), config, output_class, output_field)
+
+
+def _load_config(name: str):
+    from transformers import AutoConfig
+    return AutoConfig.from_pretrained(name)
+
+
+def load_sequence_classifier(name: str, backend: str = "torch", cache_dir: Optional[Path] = None) -> Tuple[Any, Any]:
+    """
+    Load a transformers sequence classifier and its tokenizer for a backend.
+
+    With the ONNX backends the PyTorch weights are only loaded to export the
+    graph the first time. The int8 backends keep the classification head in
+    fp32: it costs next to nothing but maps hidden states straight to the
+    scores, so quantization noise there moves decisions the most.
+
+    Args:
+        name (str): Model name or local directory
+        backend (str): One of BACKENDS
+        cache_dir (Path, optional): Where ONNX exports are kept (default:
+            $RAG_ONNX_CACHE or ~/.cache/rag/onnx)
+
+    Returns:
+        Tuple[Any, Any]: (tokenizer, model); the model returns ``.logits``
+
+    Raises:
+        BackendError: If the backend is unknown
+    """
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    validate_backend(backend)
+    tokenizer = AutoTokenizer.from_pretrained(name)
+    load_model = lambda: AutoModelForSequenceClassification.from_pretrained(name).eval()
+    if backend.startswith("onnx"):
+        from transformers.modeling_outputs import SequenceClassifierOutput
+        return tokenizer, _onnx_model(name, "classifier", backend, load_model, tokenizer,
+                                      SequenceClassifierOutput, "logits", cache_dir)
+    model = load_model()
+    if backend == "int8":
+        quantize_dynamic(getattr(model, model.base_model_prefix))
+    return tokenizer, model
+
+
+def load_sentence_transformer(
+    name: str,
+    device: Optional[str] = None,
+    backend: str = "torch",
+    cache_dir: Optional[Path] = None
+):
+    """
+    Load a SentenceTransformer for a backend.
+
+    Tokenization, pooling and normalization stay in sentence-transformers;
+    the backend only replaces the transformer that produces token embeddings.
+
+    Args:
+        name (str): Model name or local directory
+        device (str, optional): Torch device of the "torch" and "int8" backends
+        backend (str): One of BACKENDS
+        cache_dir (Path, optional): Where ONNX exports are kept
+
+    Raises:
+        BackendError: If the backend is unknown or the model does not start
+            with a transformers module
+    """
+    from sentence_transformers import SentenceTransformer, models
+
+    validate_backend(backend)
+    model = SentenceTransformer(name, device=device)
+    if backend == "int8":
+        model = quantize_dynamic(model)
+    elif backend.startswith("onnx"):
+        from transformers.modeling_outputs import BaseModelOutput
+        transformer = model[0]
+        if not isinstance(transformer, models.Transformer):
+            raise BackendError(f"Cannot export {name}: its first module is not a Transformer")
+        encoder = transformer.auto_model
+        transformer.auto_model = _onnx_model(name, "encoder", backend, lambda: encoder, transformer.tokenizer,
+                                             BaseModelOutput, "last_hidden_state", cache_dir, encoder.config)
+    return model
+
+
+def check_accuracy(
+    texts: List[str],
+    backend: str,
+    embedding_model: Optional[str] = None,
+    classifier: Optional[str] = None,
+    threshold: float = 0.1,
+    batch_size: int = 32
+) -> Dict[str, float]:
+    """
+    Compare a backend with fp32 PyTorch on the same texts.
+
+    Both variants are loaded through the model registry, so the models are
+    shared with pipelines built afterwards.
+
+    Args:
+        texts (List[str]): Inputs, e.g. chunks of a representative document
+        backend (str): Backend under test
+        embedding_model (str, optional): sentence-transformers model to compare
+        classifier (str, optional): Boundary classifier to compare
+        threshold (float): Boundary probability at which a chunk is closed
+        batch_size (int): Texts per forward pass
+
+    Returns:
+        Dict[str, float]: For the classifier "boundary_max_abs_diff",
+        "boundary_mean_abs_diff" and "boundary_agreement" (share of texts with
+        the same decision at ``threshold``); for the embedder
+        "embedding_min_cosine" and "embedding_mean_cosine"
+    """
+    report = {}
+    if classifier is not None:
+        probabilities = []
+        for variant in ("torch", backend):
+            tokenizer, model = model_registry.sequence_classifier(classifier, backend=variant)
+            scores = []
+            for start in range(0, len(texts), batch_size):
+                encoded = tokenizer(texts[start:start + batch_size], truncation=True, padding=True,
+                                    return_tensors="pt")
+                with torch.no_grad():
+                    scores.append(torch.softmax(model(**encoded).logits, dim=1)[:, 1].numpy())
+            probabilities.append(np.concatenate(scores))
+        reference, candidate = probabilities
+        diff = np.abs(reference - candidate)
+        report["boundary_max_abs_diff"] = float(diff.max())
+        report["boundary_mean_abs_diff"] = float(diff.mean())
+        report["boundary_agreement"] = float(np.mean((reference > threshold) == (candidate > threshold)))
+    if embedding_model is not None:
+        reference, candidate = (
+            model_registry.sentence_transformer(embedding_model, backend=variant).encode(
+                texts, batch_size=batch_size, normalize_embeddings=True, convert_to_numpy=True,
+                show_progress_bar=False
+            )
+            for variant in ("torch", backend)
+        )
+        cosine = np.sum(reference * candidate, axis=1)
+        report["embedding_min_cosine"] = float(cosine.min())
+        report["embedding_mean_cosine"] = float(cosine.mean())
+    return report
@@ -0,0 +1,79 @@
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+import hashlib
+import json
+import os
+
+
+class IngestManifest:
+    """
+    Record of the files already ingested, used to skip unchanged ones.
+
+    Each entry holds the file's size, mtime and SHA-256. A file whose size
+    and mtime match its entry is treated as unchanged without reading it;
+    otherwise its hash decides, so touched-but-identical files are skipped.
+    """
+
+    def __init__(self, path: str | Path):
+        """
+        Args:
+            path (str | Path): JSON file the manifest is stored in
+        """
+        self.path = Path(path)
+        self.entries: Dict[str, Dict] = json.loads(self.path.read_text()) if self.path.exists() else {}
+
+    @staticmethod
+    def file_hash(file_path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _fingerprint(self, file_path: Path, with_hash: bool = True) -> Dict:
+        stat = file_path.stat()
+        entry = {"size": stat.st_size, "mtime": stat.st_mtime}
+        if with_hash:
+            entry["sha256"] = self.file_hash(file_path)
+        return entry
+
+    def diff(self, files: Iterable[Path]) -> Tuple[List[Path], List[str]]:
+        """
+        Compare files on disk against the manifest.
+
+        Args:
+            files (Iterable[Path]): Files currently in the corpus
+
+        Returns:
+            Tuple[List[Path], List[str]]: New or changed files, and manifest
+            keys of files that no longer exist
+        """
+        changed, seen = [], set()
+        for file_path in files:
+            key = str(file_path)
+            seen.add(key)
+            entry = self.entries.get(key)
+            if entry is None:
+                changed.append(file_path)
+                continue
+            current = self._fingerprint(file_path, with_hash=False)
+            if current["size"] == entry["size"] and current["mtime"] == entry["mtime"]:
+                continue
+            if current["size"] != entry["size"] or self.file_hash(file_path) != entry["sha256"]:
+                changed.append(file_path)
+            else:
+                entry["mtime"] = current["mtime"]
+        removed = [key for key in self.entries if key not in seen]
+        return changed, removed
+
+    def record(self, file_path: Path) -> None:
+        self.entries[str(file_path)] = self._fingerprint(file_path)
+
+    def forget(self, key: str) -> None:
+        self.entries.pop(key, None)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.entries))
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,209 @@
+from contextlib import contextmanager
+from typing import Dict, Iterator
+import json
+import os
+import threading
+import time
+
+
+class _Span:
+    """Timing of one stage invocation; ``items`` may be set inside the block."""
+
+    __slots__ = ("items",)
+
+    def __init__(self, items: int):
+        self.items = items
+
+
+class _NullSpan:
+    """Shared no-op span handed out while metrics are disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+    def __setattr__(self, name, value) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class MetricsRegistry:
+    """
+    Process-wide stage timings, counters and observed values.
+
+    Disabled by default: ``span`` then returns a shared no-op context
+    manager and ``count``/``observe`` return immediately, so instrumented
+    code pays one attribute check per call. Enable it with ``enable()`` or
+    the ``RAG_METRICS=1`` environment variable.
+
+    Recorded data:
+        spans     per stage: calls, wall and CPU seconds, items processed
+        counters  monotonically increasing event counts (model calls, cache hits)
+        summaries per name: count, sum, min and max of observed values (batch sizes)
+
+    Example:
+        with metrics.span("embedder.embed_batch", items=len(texts)):
+            ...
+        metrics.count("embedder.model_calls")
+        metrics.observe("embedder.batch_size", len(texts))
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._spans: Dict[str, Dict[str, float]] = {}
+            self._counters: Dict[str, float] = {}
+            self._summaries: Dict[str, Dict[str, float]] = {}
+
+    def span(self, name: str, items: int = 0):
+        """
+        Time a stage as a context manager.
+
+        CPU time is measured for the calling thread, so work done by
+        multithreaded libraries (BLAS, torch) shows as wall time only.
+
+        Args:
+            name (str): Stage name, e.g. "indexer.search"
+            items (int): Items the stage processes; can be updated through
+                the object returned by ``with``
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._record_span(name, items)
+
+    @contextmanager
+    def _record_span(self, name: str, items: int) -> Iterator[_Span]:
+        span = _Span(items)
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield span
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+            with self._lock:
+                stats = self._spans.get(name)
+                if stats is None:
+                    stats = self._spans[name] = {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "items": 0}
+                stats["calls"] += 1
+                stats["wall_seconds"] += wall
+                stats["cpu_seconds"] += cpu
+                stats["items"] += span.items
+
+    def count(self, name: str, value: float = 1) -> None:
+        """Add ``value`` to a counter."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        """Record one observation, such as the size of a batch."""
+        if not self.enabled:
+            return
+        with self._lock:
+            summary = self._summaries.get(name)
+            if summary is None:
+                self._summaries[name] = {"count": 1, "sum": value, "min": value, "max": value}
+            else:
+                summary["count"] += 1
+                summary["sum"] += value
+                summary["min"] = min(summary["min"], value)
+                summary["max"] = max(summary["max"], value)
+
+    def snapshot(self) -> Dict:
+        """
+        Copy of everything recorded so far.
+
+        Counter pairs named ``<prefix>.hits`` and ``<prefix>.misses`` also
+        produce a ``<prefix>.hit_rate`` entry under "rates".
+
+        Returns:
+            Dict: "spans", "counters", "summaries" and "rates"
+        """
+        with self._lock:
+            spans = {name: dict(stats) for name, stats in self._spans.items()}
+            counters = dict(self._counters)
+            summaries = {name: dict(summary) for name, summary in self._summaries.items()}
+        rates = {}
+        for name, hits in counters.items():
+            if name.endswith(".hits"):
+                prefix = name[:-len(".hits")]
+                total = hits + counters.get(f"{prefix}.misses", 0)
+                rates[f"{prefix}.hit_rate"] = hits / total if total else 0.0
+        return {"spans": spans, "counters": counters, "summaries": summaries, "rates": rates}
+
+    def drain(self) -> Dict:
+        """Return the snapshot and reset, e.g. to ship a worker's metrics to its parent."""
+        with self._lock:
+            snapshot = {"spans": self._spans, "counters": self._counters, "summaries": self._summaries}
+            self._spans, self._counters, self._summaries = {}, {}, {}
+        return snapshot
+
+    def merge(self, snapshot: Dict) -> None:
+        """Add the spans, counters and summaries of a snapshot to this registry."""
+        with self._lock:
+            for name, stats in snapshot.get("spans", {}).items():
+                target = self._spans.setdefault(name, {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "items": 0})
+                for field in target:
+                    target[field] += stats[field]
+            for name, value in snapshot.get("counters", {}).items():
+                self._counters[name] = self._counters.get(name, 0) + value
+            for name, summary in snapshot.get("summaries", {}).items():
+                target = self._summaries.get(name)
+                if target is None:
+                    self._summaries[name] = dict(summary)
+                    continue
+                target["count"] += summary["count"]
+                target["sum"] += summary["sum"]
+                target["min"] = min(target["min"], summary["min"])
+                target["max"] = max(target["max"], summary["max"])
+
+    def to_json(self, indent: int = None) -> str:
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self, prefix: str = "rag") -> str:
+        """
+        Render the snapshot in the Prometheus text exposition format.
+
+        Returns:
+            str: Metric families for stage spans, counters, summaries and hit rates
+        """
+        snapshot = self.snapshot()
+        lines = []
+
+        def family(metric: str, kind: str, label: str, values: Dict[str, float]) -> None:
+            if not values:
+                return
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            for name, value in sorted(values.items()):
+                lines.append(f'{prefix}_{metric}{{{label}="{name}"}} {value}')
+
+        spans = snapshot["spans"]
+        for field, metric in (("calls", "stage_calls_total"), ("wall_seconds", "stage_wall_seconds_total"),
+                              ("cpu_seconds", "stage_cpu_seconds_total"), ("items", "stage_items_total")):
+            family(metric, "counter", "stage", {name: stats[field] for name, stats in spans.items()})
+        family("events_total", "counter", "name", snapshot["counters"])
+        summaries = snapshot["summaries"]
+        family("observed_count", "counter", "name", {name: s["count"] for name, s in summaries.items()})
+        family("observed_sum", "counter", "name", {name: s["sum"] for name, s in summaries.items()})
+        family("observed_max", "gauge", "name", {name: s["max"] for name, s in summaries.items()})
+        family("hit_rate", "gauge", "name", snapshot["rates"])
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry(enabled=os.environ.get("RAG_METRICS", "") not in ("", "0"))
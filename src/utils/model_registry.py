@@ -0,0 +1,146 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import gc
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistryError(Exception):
+    """Custom exception for model loading errors"""
+    pass
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded models.
+
+    Every model is loaded once, on first use, and the same object is handed
+    to every caller, so several Embedders or ChunkingPipelines naming the
+    same model share its weights. The heavy libraries (sentence-transformers,
+    transformers, spaCy) are imported only when a model of that kind is
+    first requested, which keeps importing ``utils`` cheap.
+
+    Loading is guarded per model: concurrent first requests for one model
+    wait for a single load, while different models load in parallel.
+
+    For process pools using the "fork" start method, call ``preload`` (or
+    ``freeze``) in the parent before the pool starts: children inherit the
+    loaded weights and share their pages copy-on-write instead of loading
+    private copies.
+    """
+
+    def __init__(self):
+        self._models: Dict[Tuple, Any] = {}
+        self._locks: Dict[Tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple, loader: Callable[[], Any]) -> Any:
+        """
+        Return the model registered under ``key``, loading it on first use.
+
+        Args:
+            key (Tuple): Identity of the model, e.g. ("spacy", "en_core_web_sm")
+            loader (Callable[[], Any]): Builds the model if it is not loaded yet
+
+        Returns:
+            Any: The shared model object
+        """
+        model = self._models.get(key)
+        if model is not None:
+            return model
+        with self._lock:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+        with key_lock:
+            model = self._models.get(key)
+            if model is None:
+                start = time.perf_counter()
+                model = loader()
+                self._models[key] = model
+                logger.info(f"Loaded {' '.join(str(part) for part in key if part is not None)} "
+                            f"in {time.perf_counter() - start:.1f}s")
+        return model
+
+    def sentence_transformer(self, name: str, device: Optional[str] = None, backend: str = "torch"):
+        """Shared SentenceTransformer for ``name`` on an inference backend (see inference_backends)."""
+        def load():
+            from .inference_backends import load_sentence_transformer
+            return load_sentence_transformer(name, device=device, backend=backend)
+
+        return self.get(("sentence-transformers", name, device, backend), load)
+
+    def sequence_classifier(self, name: str, backend: str = "torch") -> Tuple[Any, Any]:
+        """Shared (tokenizer, model) pair of a transformers sequence classifier, in eval mode."""
+        def load():
+            from .inference_backends import load_sequence_classifier
+            return load_sequence_classifier(name, backend=backend)
+
+        return self.get(("transformers", name, backend), load)
+
+    def spacy(self, name: str):
+        """
+        Shared spaCy pipeline.
+
+        Raises:
+            ModelRegistryError: If the pipeline is not installed
+        """
+        def load():
+            import spacy
+            try:
+                return spacy.load(name)
+            except OSError as e:
+                raise ModelRegistryError(f"Failed to load spaCy model: {name}. Please ensure it's installed.") from e
+
+        return self.get(("spacy", name), load)
+
+    def preload(
+        self,
+        embedding_models: Iterable[str] = (),
+        classifiers: Iterable[str] = (),
+        spacy_models: Iterable[str] = (),
+        backend: str = "torch",
+        freeze: bool = False
+    ) -> None:
+        """
+        Load models ahead of their first use, e.g. before forking workers.
+
+        Args:
+            embedding_models (Iterable[str]): sentence-transformers model names
+            classifiers (Iterable[str]): transformers sequence classifier names
+            spacy_models (Iterable[str]): spaCy pipeline names
+            backend (str): Inference backend of the embedding models and classifiers
+            freeze (bool): Also call ``freeze`` once the models are loaded
+        """
+        for name in embedding_models:
+            self.sentence_transformer(name, backend=backend)
+        for name in classifiers:
+            self.sequence_classifier(name, backend=backend)
+        for name in spacy_models:
+            self.spacy(name)
+        if freeze:
+            self.freeze()
+
+    @staticmethod
+    def freeze() -> None:
+        """
+        Move every object tracked by the garbage collector to the permanent
+        generation, so collections in forked children do not write to (and
+        thereby copy) the pages holding the parent's models.
+        """
+        gc.collect()
+        gc.freeze()
+
+    def loaded(self) -> List[Tuple]:
+        """Keys of the models loaded so far."""
+        return list(self._models)
+
+    def clear(self) -> None:
+        """Drop every model; callers still holding one keep it alive."""
+        with self._lock:
+            self._models.clear()
+            self._locks.clear()
+
+
+model_registry = ModelRegistry()
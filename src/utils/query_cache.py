@@ -0,0 +1,179 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+import hashlib
+import re
+import threading
+import time
+import faiss
+import numpy as np
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace so trivially different queries share a key."""
+    return _WHITESPACE.sub(" ", query).strip().lower()
+
+
+class _CacheEntry:
+    __slots__ = ("entry_id", "params", "value", "expires_at", "has_vector")
+
+    def __init__(self, entry_id: int, params: Hashable, value: Any, expires_at: float, has_vector: bool):
+        self.entry_id = entry_id
+        self.params = params
+        self.value = value
+        self.expires_at = expires_at
+        self.has_vector = has_vector
+
+
+class QueryCache:
+    """
+    Bounded LRU/TTL cache of search results with exact and semantic lookup.
+
+    Exact lookups use a hash of the normalized query text and the search
+    parameters. Semantic lookups find cached queries whose embedding has a
+    cosine similarity of at least ``similarity_threshold`` with the new
+    query, using a small FAISS inner-product index over the cached query
+    embeddings. Results are only reused for identical search parameters.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl: Optional[float] = 3600.0,
+        similarity_threshold: float = 0.95,
+        semantic_candidates: int = 8
+    ):
+        """
+        Args:
+            max_entries (int): Maximum cached queries; least recently used are evicted
+            ttl (float, optional): Seconds an entry stays valid, None for no expiry
+            similarity_threshold (float): Minimum cosine similarity for a semantic hit
+            semantic_candidates (int): Nearest cached queries checked per semantic lookup
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be a positive integer")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.semantic_candidates = semantic_candidates
+
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._keys_by_id: Dict[int, str] = {}
+        self._vectors: Optional[faiss.IndexIDMap2] = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._counters = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+        self._latency = {"hit": [0, 0.0], "miss": [0, 0.0]}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(query: str, params: Hashable) -> str:
+        return hashlib.blake2b(f"{normalize_query(query)}\x00{params!r}".encode("utf-8"), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _unit(embedding: np.ndarray) -> np.ndarray:
+        vector = np.array(embedding, dtype=np.float32, copy=True).reshape(1, -1)
+        faiss.normalize_L2(vector)
+        return vector
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        del self._keys_by_id[entry.entry_id]
+        if entry.has_vector:
+            self._vectors.remove_ids(np.array([entry.entry_id], dtype=np.int64))
+
+    def _live(self, key: str) -> Optional[_CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get(self, query: str, params: Hashable = None) -> Optional[Any]:
+        """Return the cached value for the same normalized query and parameters."""
+        with self._lock:
+            entry = self._live(self._key(query, params))
+            if entry is None:
+                return None
+            self._counters["exact_hits"] += 1
+            return entry.value
+
+    def get_similar(self, embedding: Optional[np.ndarray], params: Hashable = None) -> Optional[Any]:
+        """
+        Return the value cached for a semantically similar query, counting a
+        miss when there is none. Without an embedding only the miss is counted.
+        """
+        with self._lock:
+            if embedding is not None and self._vectors is not None and self._vectors.ntotal:
+                similarities, ids = self._vectors.search(self._unit(embedding), self.semantic_candidates)
+                for similarity, entry_id in zip(similarities[0], ids[0]):
+                    if entry_id == -1 or similarity < self.similarity_threshold:
+                        break
+                    entry = self._live(self._keys_by_id[int(entry_id)])
+                    if entry is not None and entry.params == params:
+                        self._counters["semantic_hits"] += 1
+                        return entry.value
+            self._counters["misses"] += 1
+            return None
+
+    def put(self, query: str, params: Hashable, value: Any, embedding: Optional[np.ndarray] = None) -> None:
+        """
+        Cache a value; with an embedding the entry is also found by semantic lookups.
+        """
+        with self._lock:
+            key = self._key(query, params)
+            if key in self._entries:
+                self._remove(key)
+
+            entry_id = self._next_id
+            self._next_id += 1
+            expires_at = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+            self._entries[key] = _CacheEntry(entry_id, params, value, expires_at, embedding is not None)
+            self._keys_by_id[entry_id] = key
+
+            if embedding is not None:
+                vector = self._unit(embedding)
+                if self._vectors is None:
+                    self._vectors = faiss.IndexIDMap2(faiss.IndexFlatIP(vector.shape[1]))
+                self._vectors.add_with_ids(vector, np.array([entry_id], dtype=np.int64))
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._counters["evictions"] += 1
+
+    def invalidate(self) -> None:
+        """Drop every entry, e.g. after the underlying index changed."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_id.clear()
+            if self._vectors is not None:
+                self._vectors.reset()
+            self._counters["invalidations"] += 1
+
+    def record_latency(self, hit: bool, seconds: float) -> None:
+        """Record the end-to-end latency of a search served from cache or not."""
+        with self._lock:
+            bucket = self._latency["hit" if hit else "miss"]
+            bucket[0] += 1
+            bucket[1] += seconds
+
+    def stats(self) -> Dict[str, float]:
+        """Hit rates, counters and mean latencies in milliseconds."""
+        with self._lock:
+            hits = self._counters["exact_hits"] + self._counters["semantic_hits"]
+            lookups = hits + self._counters["misses"]
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "lookups": lookups,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "mean_hit_latency_ms": 1000 * self._latency["hit"][1] / max(self._latency["hit"][0], 1),
+                "mean_miss_latency_ms": 1000 * self._latency["miss"][1] / max(self._latency["miss"][0], 1)
+            }
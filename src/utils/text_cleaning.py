@@ -1,3 +1,5 @@
+from bisect import bisect_right
+from typing import Iterable, List, Tuple
 import re
 import unicodedata
 
@@ -47,3 +49,228 @@ def clean_text(text: str) -> str:
     text = remove_noise(text)
 
     return text.lower()
+
+
+# Single-character punctuation replacements. They keep offsets unchanged,
+# and a chain of str.replace outruns str.translate on non-ASCII text.
+# The ellipsis is handled by the punctuation-run rule in _FUSED_PATTERN.
+_PUNCTUATION = (
+    ("“", '"'), ("”", '"'), ("‘", "'"), ("’", "'"),
+    ("–", "-"), ("—", "-"),
+    ("•", "-"), ("●", "-"), ("·", "-")
+)
+
+# One scan covering what fix_linebreaks and remove_noise do in separate passes:
+#   hyphen  a hyphenated line break between two word characters
+#   punct   a run of sentence punctuation that collapses to its last mark
+#   gap     whitespace, together with numbers that end a line (page numbers);
+#           a single whitespace character before a word is left alone
+# The leading lookahead lets the regex engine skip ordinary characters quickly.
+_NUMBER = r"(?<!\S)(?<!\w-\n)\d+(?=[^\S\n]*\n)"
+_FUSED_PATTERN = re.compile(rf"""
+    (?=[-!?.…\s\d])
+    (?:
+        (?P<hyphen>-\n(?<=\w-\n)(?=\w))
+      | (?P<punct>[!?.…]{{2,}}|…)
+      | (?P<gap>\s(?:\s|{_NUMBER})+|^{_NUMBER}(?:\s|{_NUMBER})*)
+    )
+""", re.VERBOSE)
+
+# Last position followed by whitespace that no match can extend across
+_SAFE_CUT = re.compile(r".*[^\s\d!?.…-](?=\s)", re.DOTALL)
+
+_PAGE_SEPARATOR = "\n\n"
+
+
+class OffsetMap:
+    """
+    Maps offsets in cleaned text back to source pages and characters.
+
+    The map is piecewise linear: each anchor pairs a cleaned-text offset
+    with a position in the source stream, and offsets up to the next anchor
+    advance in step. Characters produced by a replacement map to the start
+    of the source text they replaced. Source characters are counted in the
+    NFC-normalized page text as passed to ``TextCleaner.feed``.
+    """
+
+    def __init__(self):
+        self._clean: List[int] = []
+        self._source: List[int] = []
+        self._page_starts: List[int] = []
+        self._pages: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._clean)
+
+    def add_page(self, page_number: int, source_start: int) -> None:
+        self._page_starts.append(source_start)
+        self._pages.append(page_number)
+
+    def add(self, clean_offset: int, source_offset: int) -> None:
+        """Anchor a cleaned-text offset, skipping anchors implied by the previous one."""
+        if self._clean and source_offset - self._source[-1] == clean_offset - self._clean[-1]:
+            return
+        if self._clean and self._clean[-1] == clean_offset:
+            self._source[-1] = source_offset
+            return
+        self._clean.append(clean_offset)
+        self._source.append(source_offset)
+
+    def source_offset(self, clean_offset: int) -> int:
+        """Position in the source stream of a cleaned-text offset."""
+        if not self._clean:
+            raise ValueError("Offset map is empty")
+        k = max(0, bisect_right(self._clean, clean_offset) - 1)
+        return self._source[k] + clean_offset - self._clean[k]
+
+    def locate(self, clean_offset: int) -> Tuple[int, int]:
+        """
+        Find where a cleaned-text offset came from.
+
+        Args:
+            clean_offset (int): Character offset in the cleaned text
+
+        Returns:
+            Tuple[int, int]: Page number and character offset within that page
+        """
+        source = self.source_offset(clean_offset)
+        p = max(0, bisect_right(self._page_starts, source) - 1)
+        return self._pages[p], source - self._page_starts[p]
+
+
+class TextCleaner:
+    """
+    Streaming equivalent of clean_text with source offset tracking.
+
+    Pages are fed one at a time and joined like PDFTextExtractor.extract_text
+    joins them. Each page is cleaned in a single regex scan after the
+    one-to-one punctuation replacements; only the trailing part that later
+    input could still change is held back until the next page or ``finish``.
+
+    The output matches clean_text except that a number is only treated as a
+    page number when it stands alone, not when it is glued to a word or to
+    punctuation at the end of a line ("covid19" and "section 3.1" keep their
+    digits; clean_text turns them into "covid" and "section 3."), and chains
+    of hyphenated line breaks are all joined.
+
+    Example:
+        cleaner = TextCleaner()
+        parts = [cleaner.feed(number, text) for number, text in extractor.iter_pages()]
+        cleaned = "".join(parts) + cleaner.finish()
+        page, char = cleaner.offsets.locate(cleaned.find("results"))
+    """
+
+    def __init__(self):
+        self.offsets = OffsetMap()
+        self._buffer = ""
+        # (buffer offset, source offset) where each contiguous source run starts
+        self._segments: List[Tuple[int, int]] = []
+        self._source_length = 0
+        self._clean_length = 0
+
+    def feed(self, page_number: int, text: str) -> str:
+        """
+        Add the text of the next page.
+
+        Args:
+            page_number (int): Page the text came from
+            text (str): Raw page text
+
+        Returns:
+            str: Cleaned text that is now final, possibly empty
+        """
+        if not unicodedata.is_normalized("NFC", text):
+            text = unicodedata.normalize("NFC", text)
+        self.offsets.add_page(page_number, self._source_length)
+        source_start = self._source_length
+        self._source_length += len(text)
+
+        stripped = text.strip()
+        if not stripped:
+            return ""
+        source_start += len(text) - len(text.lstrip())
+        if self._buffer or self._clean_length:
+            self._segments.append((len(self._buffer), source_start))
+            self._buffer += _PAGE_SEPARATOR
+        self._segments.append((len(self._buffer), source_start))
+        for old, new in _PUNCTUATION:
+            stripped = stripped.replace(old, new)
+        self._buffer += stripped
+
+        match = _SAFE_CUT.match(self._buffer)
+        return self._flush(match.end()) if match else ""
+
+    def finish(self) -> str:
+        """Clean and return whatever text is still held back."""
+        return self._flush(len(self._buffer), final=True)
+
+    def _source_at(self, position: int) -> int:
+        k = bisect_right(self._segments, (position, float("inf"))) - 1
+        buffer_start, source_start = self._segments[k]
+        return source_start + position - buffer_start
+
+    def _copy(self, pieces: List[str], start: int, end: int) -> None:
+        """Copy buffer[start:end] unchanged, anchoring every source run it crosses."""
+        if start >= end:
+            return
+        self.offsets.add(self._clean_length, self._source_at(start))
+        for buffer_start, source_start in self._segments:
+            if start < buffer_start < end:
+                self.offsets.add(self._clean_length + buffer_start - start, source_start)
+        pieces.append(self._buffer[start:end])
+        self._clean_length += end - start
+
+    def _flush(self, cut: int, final: bool = False) -> str:
+        pieces: List[str] = []
+        position = 0
+        for match in _FUSED_PATTERN.finditer(self._buffer, 0, cut):
+            self._copy(pieces, position, match.start())
+            kind, value = match.lastgroup, match.group()
+            if kind == "hyphen":
+                replacement = ""
+            elif kind == "punct":
+                replacement = "." if value[-1] == "…" else value[-1]
+            elif self._clean_length == 0 or (final and match.end() == cut):
+                replacement = ""
+            elif any(ch.isdigit() for ch in value):
+                replacement = "\n" if value.endswith("\n") else " "
+            elif value.count("\n") == len(value):
+                replacement = "\n"
+            else:
+                replacement = value if len(value) == 1 else " "
+
+            if replacement:
+                self.offsets.add(self._clean_length, self._source_at(match.start()))
+                pieces.append(replacement)
+                self._clean_length += len(replacement)
+            position = match.end()
+        self._copy(pieces, position, cut)
+
+        self._buffer = self._buffer[cut:]
+        if self._buffer:
+            self._segments = [(0, self._source_at(cut))] + [
+                (buffer_start - cut, source_start)
+                for buffer_start, source_start in self._segments if buffer_start > cut
+            ]
+        else:
+            self._segments = []
+
+        cleaned = "".join(pieces)
+        lowered = cleaned.lower()
+        if len(lowered) != len(cleaned):
+            # A few characters (e.g. "İ") lowercase to two; keep offsets one-to-one
+            lowered = "".join(ch.lower()[0] for ch in cleaned)
+        return lowered
+
+
+def clean_pages(pages: Iterable[Tuple[int, str]]) -> Tuple[str, OffsetMap]:
+    """
+    Clean (page number, text) pairs, e.g. from PDFTextExtractor.iter_pages.
+
+    Returns:
+        Tuple[str, OffsetMap]: Cleaned text and its map back to source pages
+    """
+    cleaner = TextCleaner()
+    parts = [cleaner.feed(page_number, text) for page_number, text in pages]
+    parts.append(cleaner.finish())
+    return "".join(parts), cleaner.offsets
@@ -1,6 +1,10 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from multiprocessing.context import BaseContext
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, Iterator, List, Tuple
 import logging
+import multiprocessing
 import pypdf
 from datetime import datetime
 
@@ -23,6 +27,7 @@ class PDFTextExtractor:
         """
         self._configure_logging(log_level)
         self.file_path = self._validate_file_path(file_path)
+        self._reader: Optional[pypdf.PdfReader] = None
         logger.info(f"Initialized PDFTextExtractor for {self.file_path}")
         
     def _configure_logging(self, log_level: int) -> None:
@@ -53,6 +58,13 @@ class PDFTextExtractor:
             
         return file_path
     
+    @property
+    def reader(self) -> pypdf.PdfReader:
+        """Parsed PDF, loaded on first use and shared by metadata and text extraction."""
+        if self._reader is None:
+            self._reader = pypdf.PdfReader(self.file_path)
+        return self._reader
+
     def get_pdf_metadata(self) -> Dict:
         """
         Extract metadata from the PDF file.
@@ -61,67 +73,153 @@ class PDFTextExtractor:
             Dict: PDF metadata including creation date, number of pages, etc.
         """
         try:
-            with open(self.file_path, "rb") as f:
-                reader = pypdf.PdfReader(f)
-                metadata = {
-                    'number_of_pages': len(reader.pages),
-                    'encrypted': reader.is_encrypted,
-                    'metadata': reader.metadata if reader.metadata else {},
-                    'file_size': self.file_path.stat().st_size,
-                    'extraction_time': datetime.now().isoformat()
-                }
+            reader = self.reader
+            metadata = {
+                'number_of_pages': len(reader.pages),
+                'encrypted': reader.is_encrypted,
+                'metadata': reader.metadata if reader.metadata else {},
+                'file_size': self.file_path.stat().st_size,
+                'extraction_time': datetime.now().isoformat()
+            }
             logger.debug(f"Successfully extracted metadata from {self.file_path}")
             return metadata
         except Exception as e:
             logger.error(f"Failed to extract metadata: {e}", exc_info=True)
             return {}
 
-    def extract_text(self, start_page: int = None, end_page: int = None) -> Optional[str]:
+    def _page_range(self, start_page: Optional[int], end_page: Optional[int]) -> Tuple[int, int]:
+        """
+        Convert a 1-based inclusive page range into 0-based [start, end) bounds.
+
+        Raises:
+            ValueError: If the range contains no pages
+        """
+        total_pages = len(self.reader.pages)
+        start = max(1, start_page or 1) - 1
+        end = min(end_page or total_pages, total_pages)
+        if start >= end:
+            logger.error("Invalid page range specified")
+            raise ValueError("Invalid page range")
+        return start, end
+
+    def iter_pages(
+        self,
+        start_page: int = None,
+        end_page: int = None,
+        workers: int = 1,
+        pages_per_task: int = 16,
+        pool: Optional[ProcessPoolExecutor] = None,
+        mp_context: Optional[BaseContext] = None
+    ) -> Iterator[Tuple[int, str]]:
+        """
+        Yield the text of each page as soon as it is extracted.
+
+        With more than one worker, blocks of ``pages_per_task`` pages are
+        extracted in a process pool. Each worker parses the PDF once and
+        keeps it for all the blocks it receives; pages are still yielded in
+        order. Starting a pool costs far more than extracting a few pages, so
+        callers extracting many documents should pass one pool to every call
+        (see ``extraction_pool``).
+
+        Args:
+            start_page (int, optional): First page to extract (1-based indexing)
+            end_page (int, optional): Last page to extract (1-based indexing)
+            workers (int): Processes used for extraction (default: 1, in-process)
+            pages_per_task (int): Pages extracted per pool task
+            pool (ProcessPoolExecutor, optional): Pool to extract in, left running
+                afterwards; by default one is started for this call
+            mp_context (BaseContext, optional): Start method of a pool started
+                for this call (default: spawn, which is safe after threads or
+                models have been started in this process, unlike fork)
+
+        Yields:
+            Tuple[int, str]: 1-based page number and its stripped text, empty
+            if the page has no text layer
+
+        Raises:
+            ValueError: If the page range is invalid
+        """
+        start, end = self._page_range(start_page, end_page)
+        total_pages = len(self.reader.pages)
+
+        if workers <= 1 or end - start <= pages_per_task:
+            for page_num in range(start, end):
+                logger.debug(f"Processing page {page_num + 1}/{total_pages}")
+                yield page_num + 1, (self.reader.pages[page_num].extract_text() or "").strip()
+            return
+
+        blocks = [(block, min(block + pages_per_task, end)) for block in range(start, end, pages_per_task)]
+        logger.info(f"Extracting {end - start} pages with {workers} workers")
+        with extraction_pool(min(workers, len(blocks)), mp_context) if pool is None else nullcontext(pool) as executor:
+            results = executor.map(
+                _extract_page_range,
+                [self.file_path] * len(blocks),
+                [block_start for block_start, _ in blocks],
+                [block_end for _, block_end in blocks]
+            )
+            for block_start, texts in zip((block_start for block_start, _ in blocks), results):
+                for offset, text in enumerate(texts):
+                    yield block_start + offset + 1, text
+
+    def extract_text(self, start_page: int = None, end_page: int = None, workers: int = 1) -> Optional[str]:
         """
         Extract text from the PDF file with optional page range.
         
         Args:
             start_page (int, optional): First page to extract (1-based indexing)
             end_page (int, optional): Last page to extract (1-based indexing)
+            workers (int): Processes used for extraction, see iter_pages
             
         Returns:
             Optional[str]: Extracted text or None if extraction failed
         """
         try:
             logger.info(f"Starting text extraction from {self.file_path}")
-            with open(self.file_path, "rb") as f:
-                reader = pypdf.PdfReader(f)
-                total_pages = len(reader.pages)
-                
-                start_page = max(1, start_page or 1) - 1
-                end_page = min(end_page or total_pages, total_pages)
-                
-                if start_page >= end_page:
-                    logger.error("Invalid page range specified")
-                    raise ValueError("Invalid page range")
-                
-                text: List[str] = []
-                for page_num in range(start_page, end_page):
-                    logger.debug(f"Processing page {page_num + 1}/{total_pages}")
-                    content = reader.pages[page_num].extract_text()
-                    if content:
-                        text.append(content.strip())
-                    else:
-                        logger.warning(f"No text content found on page {page_num + 1}")
+            text: List[str] = []
+            for page_number, content in self.iter_pages(start_page, end_page, workers=workers):
+                if content:
+                    text.append(content)
+                else:
+                    logger.warning(f"No text content found on page {page_number}")
+            
+            result = "\n\n".join(text)
+            if not result:
+                logger.warning("No text content found in document")
+                return "Nothing Found"
                 
-                result = "\n\n".join(text)
-                if not result:
-                    logger.warning("No text content found in document")
-                    return "Nothing Found"
-                    
-                logger.info(f"Successfully extracted {len(text)} pages of text")
-                return result
+            logger.info(f"Successfully extracted {len(text)} pages of text")
+            return result
                 
         except Exception as e:
             logger.error(f"Failed to extract text from {self.file_path}: {e}", exc_info=True)
             return None
 
 
+def extraction_pool(workers: int, mp_context: Optional[BaseContext] = None) -> ProcessPoolExecutor:
+    """
+    Start a process pool for ``PDFTextExtractor.iter_pages``.
+
+    Args:
+        workers (int): Number of processes
+        mp_context (BaseContext, optional): Start method (default: spawn)
+
+    Returns:
+        ProcessPoolExecutor: The pool; the caller shuts it down
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=mp_context or multiprocessing.get_context("spawn"))
+
+
+# Reader cached by a pool worker, so it parses each PDF once across its tasks
+_worker_reader: Optional[Tuple[Path, pypdf.PdfReader]] = None
+
+def _extract_page_range(file_path: Path, start: int, end: int) -> List[str]:
+    global _worker_reader
+    if _worker_reader is None or _worker_reader[0] != file_path:
+        _worker_reader = (file_path, pypdf.PdfReader(file_path))
+    reader = _worker_reader[1]
+    return [(reader.pages[page_num].extract_text() or "").strip() for page_num in range(start, end)]
+
+
 if __name__ == "__main__":
     logging.basicConfig(filename="logs/utils/extraction.log", filemode="a", level=logging.INFO)
     pdf_extractor = PDFTextExtractor("data/2407.00553v1.pdf")
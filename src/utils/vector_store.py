@@ -0,0 +1,132 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional
+import numpy as np
+
+
+class VectorStore:
+    """
+    Append-only float32 matrix whose row ``i`` is the vector of chunk ``i``.
+
+    No rows are held in RAM: saved rows are memory-mapped from the store's
+    file, and rows added afterwards are appended to an anonymous temporary
+    file (in ``spill_dir``, by default the system temp directory) that is
+    memory-mapped as well, until the next save moves them into the store's
+    file. Only the pages of rows that are actually read become resident.
+    Used by cascade search to re-score candidates exactly without keeping
+    full-precision vectors in RAM.
+    """
+
+    VECTORS_FILE = "vectors.f32"
+
+    def __init__(self, dim: int, spill_dir: Optional[str | Path] = None):
+        """
+        Args:
+            dim (int): Vector dimension
+            spill_dir (str | Path, optional): Directory of the temporary file holding
+                unsaved rows; it should be on disk rather than in memory (tmpfs)
+        """
+        self.dim = dim
+        self.spill_dir = spill_dir
+        self._base = np.empty((0, dim), dtype=np.float32)
+        self._spill = None
+        self._spill_rows = 0
+        self._tail = np.empty((0, dim), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self._base) + self._spill_rows
+
+    def extend(self, vectors: np.ndarray) -> None:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        if not len(vectors):
+            return
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile(dir=self.spill_dir)
+        self._spill.seek(0, os.SEEK_END)
+        self._spill.write(memoryview(vectors))
+        self._spill_rows += len(vectors)
+
+    def _tail_rows(self) -> np.ndarray:
+        """Unsaved rows, remapped when rows were appended since the last call."""
+        if len(self._tail) != self._spill_rows:
+            self._spill.flush()
+            self._tail = np.memmap(self._spill, dtype=np.float32, mode="r", shape=(self._spill_rows, self.dim))
+        return self._tail
+
+    def take(self, ids: np.ndarray) -> np.ndarray:
+        """
+        Gather rows by chunk id.
+
+        Args:
+            ids (np.ndarray): Chunk ids, all below ``len(self)``
+
+        Returns:
+            np.ndarray: Matrix of shape (len(ids), dim)
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        base_count = len(self._base)
+        in_base = ids < base_count
+        if in_base.all():
+            return self._base[ids]
+        rows = np.empty((len(ids), self.dim), dtype=np.float32)
+        rows[in_base] = self._base[ids[in_base]]
+        rows[~in_base] = self._tail_rows()[ids[~in_base] - base_count]
+        return rows
+
+    def save(self, path: str | Path) -> None:
+        """
+        Write the store into a directory and map it from there.
+
+        Args:
+            path (str | Path): Target directory, created if missing
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        # Write beside the target and rename, so a store memory-mapped from
+        # the same directory keeps reading the old file
+        tmp = path / (self.VECTORS_FILE + ".tmp")
+        with open(tmp, "wb") as f:
+            for start in range(0, len(self._base), 65536):
+                f.write(memoryview(np.ascontiguousarray(self._base[start:start + 65536])))
+            if self._spill is not None:
+                self._spill.flush()
+                self._spill.seek(0)
+                shutil.copyfileobj(self._spill, f)
+        os.replace(tmp, path / self.VECTORS_FILE)
+
+        rows = len(self)
+        self._tail = np.empty((0, self.dim), dtype=np.float32)
+        if self._spill is not None:
+            self._spill.close()
+            self._spill, self._spill_rows = None, 0
+        if rows:
+            self._base = np.memmap(path / self.VECTORS_FILE, dtype=np.float32, mode="r", shape=(rows, self.dim))
+
+    @classmethod
+    def load(cls, path: str | Path, dim: int, mmap: bool = True) -> "VectorStore":
+        """
+        Open a store written by ``save``.
+
+        Args:
+            path (str | Path): Directory the store was saved to
+            dim (int): Vector dimension
+            mmap (bool): Memory-map the file instead of reading it
+
+        Returns:
+            VectorStore: The loaded store
+        """
+        file = Path(path) / cls.VECTORS_FILE
+        store = cls(dim)
+        rows = file.stat().st_size // (4 * dim)
+        if rows:
+            if mmap:
+                store._base = np.memmap(file, dtype=np.float32, mode="r", shape=(rows, dim))
+            else:
+                store._base = np.fromfile(file, dtype=np.float32).reshape(rows, dim)
+        return store
+
+    @classmethod
+    def exists(cls, path: str | Path) -> bool:
+        return (Path(path) / cls.VECTORS_FILE).exists()
@@ -0,0 +1,43 @@
+import numpy as np
+
+from utils.bm25 import BM25Index
+
+
+def test_scores_stay_positive_after_removals():
+    index = BM25Index()
+    index.add(["common rare"] + ["common filler"] * 9)
+    index.remove(range(1, 10))
+
+    ids, scores = index.search("common", top_k=5)
+    assert ids.tolist() == [0]
+    assert (scores > 0).all()
+
+
+def test_removed_documents_do_not_count_towards_document_frequency():
+    removed = BM25Index()
+    removed.add(["apple pie", "apple tart", "banana split", "cherry cake"])
+    removed.remove([1])
+    fresh = BM25Index()
+    fresh.add(["apple pie", "banana split", "cherry cake"])
+
+    _, removed_scores = removed.search("apple")
+    _, fresh_scores = fresh.search("apple")
+    # Document lengths are equal, so only the IDF could make these differ
+    assert removed_scores[0] == fresh_scores[0]
+
+
+def test_pruned_search_matches_exhaustive_scores():
+    rng = np.random.default_rng(0)
+    vocab = [f"w{i}" for i in range(200)]
+    index = BM25Index()
+    index.add(" ".join(vocab[w] for w in np.minimum(rng.zipf(1.3, 30), 200) - 1) for _ in range(2000))
+    index.remove(range(0, 2000, 7))
+
+    for _ in range(50):
+        query = " ".join(vocab[w] for w in np.minimum(rng.zipf(1.3, 4), 200) - 1)
+        ids, scores = index.search(query, top_k=10)
+        # Asking for every document leaves nothing to prune
+        all_ids, all_scores = index.search(query, top_k=len(index))
+        np.testing.assert_allclose(scores, all_scores[:10], rtol=1e-6)
+        exhaustive = dict(zip(all_ids.tolist(), all_scores.tolist()))
+        np.testing.assert_allclose(scores, [exhaustive[i] for i in ids.tolist()], rtol=1e-6)
@@ -0,0 +1,30 @@
+from utils.dedup import DuplicateIndex, MinHasher
+
+TEXTS = [
+    "the quick brown fox jumps over the lazy dog near the river bank",
+    "a completely different sentence about retrieval augmented generation systems",
+]
+
+
+def test_reprocessed_owner_replaces_its_entries():
+    hasher = MinHasher()
+    index = DuplicateIndex(0.9)
+    signatures = hasher.signatures(TEXTS)
+    assert index.check_and_add(signatures, "a") == [None, None]
+    # The new version of "a" no longer contains the first text
+    assert index.check_and_add(signatures[1:], "a") == [None]
+    assert len(index) == 1
+    assert index.check_and_add(signatures[:1], "b") == [None]
+    assert index.check_and_add(signatures[1:], "c") == ["a"]
+
+
+def test_remove_owner():
+    hasher = MinHasher()
+    index = DuplicateIndex(0.9)
+    signatures = hasher.signatures(TEXTS)
+    index.check_and_add(signatures, "a")
+    assert index.remove("a") == 2
+    assert len(index) == 0
+    assert all(not bucket for bucket in index._buckets)
+    assert index.check_and_add(signatures, "b") == [None, None]
+    assert index.remove("missing") == 0
@@ -0,0 +1,91 @@
+import multiprocessing as mp
+
+import numpy as np
+import pytest
+
+from utils.embedding_cache import EmbeddingCache
+
+DIM = 4
+
+
+def vectors_for(texts):
+    """Distinct vector per text, so a row served for the wrong key is detected."""
+    return np.array([[sum(map(ord, text)) + i for i in range(DIM)] for text in texts], dtype=np.float32)
+
+
+def open_cache(path):
+    return EmbeddingCache(path, "model", DIM, max_entries=10)
+
+
+def _compacting_writer(path, opened, resume):
+    cache = open_cache(path)
+    opened.set()
+    resume.wait(30)
+    texts = [f"b{i}" for i in range(6)]
+    # 13 entries on disk pushes this process past max_entries
+    cache.put_many(texts, vectors_for(texts))
+
+
+def assert_cached_correctly(cache, texts):
+    found, missing = cache.get_many(texts)
+    hit = [i for i in range(len(texts)) if i not in missing]
+    np.testing.assert_array_equal(found[hit], vectors_for([texts[i] for i in hit]))
+    return [texts[i] for i in hit]
+
+
+def test_compaction_in_another_process(tmp_path):
+    cache = open_cache(tmp_path)
+    a_texts = [f"a{i}" for i in range(6)]
+    cache.put_many(a_texts, vectors_for(a_texts))
+
+    context = mp.get_context("spawn")
+    opened, resume = context.Event(), context.Event()
+    writer = context.Process(target=_compacting_writer, args=(tmp_path, opened, resume))
+    writer.start()
+    assert opened.wait(60)
+    # Appended after the writer built its key index
+    cache.put_many(["c0"], vectors_for(["c0"]))
+    resume.set()
+    writer.join(60)
+    assert writer.exitcode == 0
+
+    # The stale row map is rebuilt instead of serving renumbered rows
+    b_texts = [f"b{i}" for i in range(6)]
+    hits = assert_cached_correctly(cache, a_texts + b_texts + ["c0"])
+    assert set(b_texts) <= set(hits)
+    # Entries the compacting process never saw are ranked, not dropped
+    assert "c0" in hits
+    assert len(cache) == 8
+
+    # Appends land in the compacted file
+    cache.put_many(["d0"], vectors_for(["d0"]))
+    assert assert_cached_correctly(open_cache(tmp_path), ["d0", "c0"]) == ["d0", "c0"]
+
+
+def test_compaction_keeps_recently_used(tmp_path):
+    cache = open_cache(tmp_path)
+    texts = [f"t{i}" for i in range(10)]
+    cache.put_many(texts, vectors_for(texts))
+    cache.get_many(texts[:2])
+    cache.put_many(["new"], vectors_for(["new"]))
+
+    assert len(cache) == 8
+    hits = assert_cached_correctly(open_cache(tmp_path), texts + ["new"])
+    assert {"t0", "t1", "new"} <= set(hits)
+
+
+def test_compaction_with_a_ratio_rounding_to_zero_rows(tmp_path):
+    cache = EmbeddingCache(tmp_path, "model", DIM, max_entries=10, compact_ratio=0.05)
+    sizes = []
+    for batch in range(5):
+        texts = [f"{batch}-{i}" for i in range(10)]
+        cache.put_many(texts, vectors_for(texts))
+        sizes.append(len(cache))
+    assert sizes == [10, 1, 1, 1, 1]
+    assert assert_cached_correctly(cache, ["4-9"]) == ["4-9"]
+
+
+@pytest.mark.parametrize("max_entries, compact_ratio", [(0, 0.8), (10, 0.0), (10, 1.5)])
+def test_invalid_size_bounds(tmp_path, max_entries, compact_ratio):
+    with pytest.raises(ValueError):
+        EmbeddingCache(tmp_path, "model", DIM, max_entries=max_entries, compact_ratio=compact_ratio)
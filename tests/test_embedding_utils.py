@@ -0,0 +1,8 @@
+from utils.embedding_utils import Embedder
+
+
+def test_cache_dir_does_not_load_the_model(tmp_path):
+    # Loading this model would fail, so construction must not try
+    embedder = Embedder("not-a-real/model", cache_dir=tmp_path)
+    assert embedder._model is None
+    assert embedder._cache is None
@@ -0,0 +1,40 @@
+import threading
+
+import pytest
+
+from hyde import HyDERetriever, HypothesisGenerator, TemplateGenerator
+
+
+class BlockingGenerator(HypothesisGenerator):
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = 0
+
+    def generate(self, query: str, seed: int) -> str:
+        self.calls += 1
+        self.release.wait(10)
+        return f"{query} {seed}"
+
+
+def test_generator_must_implement_generate():
+    with pytest.raises(TypeError):
+        HypothesisGenerator()
+
+
+def test_template_generator():
+    retriever = HyDERetriever(None, TemplateGenerator(), num_hypotheses=2)
+    assert retriever.hypotheses("what is bm25") == ["what is bm25", "This passage explains what is bm25 in detail."]
+    retriever.close()
+
+
+def test_timed_out_calls_do_not_queue_new_ones():
+    generator = BlockingGenerator()
+    retriever = HyDERetriever(None, generator, num_hypotheses=2, timeout=0.05)
+    assert retriever.hypotheses("first") == []
+    # Both threads are still stuck, so nothing is started or waited for
+    assert retriever.hypotheses("second") == []
+    assert generator.calls == 2
+
+    generator.release.set()
+    retriever._executor.shutdown(wait=True)
+    assert retriever._slots.acquire(blocking=False)
@@ -0,0 +1,10 @@
+import logging
+
+from utils.index_factory import build_index, set_search_params
+
+
+def test_unknown_search_parameter_is_logged(caplog):
+    index = build_index(8, "flat")
+    with caplog.at_level(logging.WARNING, logger="utils.index_factory"):
+        set_search_params(index, nprobe=4)
+    assert "nprobe=4" in caplog.text
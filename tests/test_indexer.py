@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from indexer import Indexer
+from utils.bm25 import BM25Index
+
+
+def test_hnsw_rebuilds_once_tombstones_pass_the_limit():
+    rng = np.random.default_rng(0)
+    indexer = Indexer(embedding_dim=8, index_type="hnsw", keyword_index=False)
+    vectors = rng.standard_normal((100, 8)).astype(np.float32)
+    for doc in range(10):
+        rows = slice(doc * 10, doc * 10 + 10)
+        indexer.add_embeddings(vectors[rows], [f"{doc}-{i}" for i in range(10)], doc_id=f"doc-{doc}")
+
+    indexer.remove_document("doc-0")
+    assert len(indexer._tombstones) == 10
+    assert indexer.index.ntotal == 100
+
+    indexer.remove_document("doc-1")
+    assert len(indexer._tombstones) == 0
+    assert indexer.index.ntotal == 80
+
+    ids, _ = indexer._search_vectors(indexer._prepare_vectors(vectors[15:16]), 5)
+    assert (ids >= 20).all()
+    ids, _ = indexer._search_vectors(indexer._prepare_vectors(vectors[25:26]), 1)
+    assert ids.tolist() == [[25]]
+
+
+def test_load_reports_missing_keyword_index(tmp_path):
+    indexer = Indexer(embedding_dim=4)
+    indexer.add_embeddings(np.eye(4, dtype=np.float32), ["a b", "b c", "c d", "d e"])
+    indexer.save(tmp_path)
+    docs, _ = Indexer.load(tmp_path).search("c", 2, mode="keyword")
+    assert set(docs) == {"b c", "c d"}
+
+    (tmp_path / BM25Index.POSTINGS_FILE).unlink()
+    with pytest.raises(FileNotFoundError, match=BM25Index.POSTINGS_FILE):
+        Indexer.load(tmp_path)
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from indexer import Indexer
+from sharded_indexer import ShardedIndexer, merge_top_k
+from utils.chunk_store import ChunkStore
+
+DIM = 8
+NUM_DOCS, CHUNKS_PER_DOC = 12, 5
+
+
+def corpus():
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((NUM_DOCS * CHUNKS_PER_DOC, DIM)).astype(np.float32)
+    documents = {
+        f"doc-{doc}": [f"doc {doc} chunk {i} term{(doc + i) % 7}" for i in range(CHUNKS_PER_DOC)]
+        for doc in range(NUM_DOCS)
+    }
+    return vectors, documents
+
+
+def assert_same_results(sharded, reference, queries, top_k=10):
+    results = sharded.search_vectors(queries, top_k)
+    expected_ids, expected_scores = reference._search_vectors(reference._prepare_vectors(queries), top_k)
+    for row in range(len(queries)):
+        assert results.documents(row) == [reference.documents[i] for i in expected_ids[row] if i != -1]
+        found = expected_ids[row] != -1
+        np.testing.assert_allclose(results.scores[row][found], expected_scores[row][found], rtol=1e-5)
+
+
+def test_merge_top_k_both_directions():
+    ids = [np.array([[0, 2, -1]]), np.array([[1, 3, 5]])]
+    ascending = [np.array([[0.1, 0.4, np.nan]]), np.array([[0.2, 0.3, 0.9]])]
+    merged_ids, merged_scores = merge_top_k(ids, ascending, 4, descending=False)
+    assert merged_ids.tolist() == [[0, 1, 3, 2]]
+    np.testing.assert_allclose(merged_scores, [[0.1, 0.2, 0.3, 0.4]])
+
+    descending = [np.array([[0.9, 0.4, np.nan]]), np.array([[0.8, 0.5, 0.1]])]
+    merged_ids, _ = merge_top_k(ids, descending, 6, descending=True)
+    assert merged_ids.tolist() == [[0, 1, 3, 2, 5, -1]]
+
+
+@pytest.mark.parametrize("partition, metric", [("document", "l2"), ("hash", "ip")])
+def test_matches_single_indexer_through_removal_and_reopen(tmp_path, partition, metric):
+    vectors, documents = corpus()
+    reference = Indexer(embedding_dim=DIM, metric=metric)
+    sharded = ShardedIndexer(tmp_path, num_shards=3, partition=partition, start_method="spawn",
+                             embedding_dim=DIM, metric=metric)
+    try:
+        for doc, (doc_id, chunks) in enumerate(documents.items()):
+            rows = vectors[doc * CHUNKS_PER_DOC:(doc + 1) * CHUNKS_PER_DOC]
+            reference.add_embeddings(rows, chunks, doc_id=doc_id)
+            ids = sharded.add_embeddings(rows, chunks, doc_id=doc_id)
+            # Global ids are local * num_shards + shard and resolve to their chunks
+            assert [sharded.documents[i] for i in ids.tolist()] == chunks
+        queries = vectors[::7] + 0.01
+        assert_same_results(sharded, reference, queries)
+
+        for doc_id in ("doc-1", "doc-6"):
+            assert sharded.remove_document(doc_id) == reference.remove_document(doc_id) == CHUNKS_PER_DOC
+        assert_same_results(sharded, reference, queries)
+        sharded.save()
+    finally:
+        sharded.close()
+
+    with ShardedIndexer(tmp_path, num_shards=1, start_method="spawn") as reopened:
+        assert reopened.num_shards == 3 and reopened.partition == partition
+        assert_same_results(reopened, reference, queries)
+        docs, _ = reopened.search("term3", top_k=50, mode="keyword")
+        kept = [chunks for doc_id, chunks in documents.items() if doc_id not in ("doc-1", "doc-6")]
+        assert set(docs) == {chunk for chunks in kept for chunk in chunks if chunk.endswith("term3")}
+
+
+def test_add_store_applies_deletes_and_replacements(tmp_path):
+    vectors, documents = corpus()
+    store = ChunkStore(tmp_path / "store", dim=DIM)
+    for doc, (doc_id, chunks) in enumerate(documents.items()):
+        rows = vectors[doc * CHUNKS_PER_DOC:(doc + 1) * CHUNKS_PER_DOC]
+        store.append(doc_id, [{"id": i, "text": text} for i, text in enumerate(chunks)], rows)
+    store.delete("doc-2")
+    # doc-3 is replaced by new chunks with new vectors
+    replacement = [f"doc 3 revised chunk {i}" for i in range(3)]
+    store.append("doc-3", [{"id": i, "text": text} for i, text in enumerate(replacement)], -vectors[:3])
+
+    reference = Indexer(embedding_dim=DIM)
+    reference.add_store(store)
+    with ShardedIndexer(tmp_path / "index", num_shards=4, start_method="spawn", embedding_dim=DIM) as sharded:
+        sharded.add_store(store)
+        queries = np.concatenate([vectors[::5], -vectors[:3]]) + 0.01
+        assert_same_results(sharded, reference, queries, top_k=len(vectors))
+        found = {text for row in range(len(queries)) for text in sharded.search_vectors(queries, 60).documents(row)}
+        assert set(replacement) <= found
+        assert not found & set(documents["doc-2"] + documents["doc-3"])
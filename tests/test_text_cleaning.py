@@ -0,0 +1,24 @@
+import pytest
+
+from utils.text_cleaning import clean_pages, clean_text
+
+
+@pytest.mark.parametrize("text", [
+    "intro\n12\nbody text",
+    "first line\n  7  \nsecond line",
+    "value (42)\nnext",
+    "wait... what?!\nfine",
+    "see figure 2.\n4\nnext",
+])
+def test_matches_clean_text(text):
+    assert clean_pages([(1, text)])[0] == clean_text(text)
+
+
+@pytest.mark.parametrize("text, cleaned, clean_text_output", [
+    ("see section 3.1\nnext line", "see section 3.1\nnext line", "see section 3.\nnext line"),
+    ("covid19\nnext", "covid19\nnext", "covid\nnext"),
+])
+def test_keeps_digits_glued_to_the_line_end(text, cleaned, clean_text_output):
+    # Unlike clean_text, only numbers standing alone are taken for page numbers
+    assert clean_pages([(1, text)])[0] == cleaned
+    assert clean_text(text) == clean_text_output
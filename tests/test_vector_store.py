@@ -0,0 +1,35 @@
+import numpy as np
+
+from indexer import Indexer
+from utils.vector_store import VectorStore
+
+
+def test_rows_survive_save_and_later_appends(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((30, 4)).astype(np.float32)
+    store = VectorStore(4, spill_dir=tmp_path)
+    store.extend(vectors[:10])
+    store.extend(vectors[10:20])
+    np.testing.assert_array_equal(store.take([0, 15, 19]), vectors[[0, 15, 19]])
+
+    store.save(tmp_path / "store")
+    assert isinstance(store._base, np.memmap) and store._spill is None
+    store.extend(vectors[20:])
+    ids = np.arange(30)[::-1]
+    np.testing.assert_array_equal(store.take(ids), vectors[ids])
+
+    store.save(tmp_path / "store")
+    loaded = VectorStore.load(tmp_path / "store", 4)
+    np.testing.assert_array_equal(loaded.take(np.arange(30)), vectors)
+
+
+def test_cascade_search_after_save(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((200, 8)).astype(np.float32)
+    indexer = Indexer(embedding_dim=8, index_type="sq8", keyword_index=False, rerank=4)
+    indexer.add_embeddings(vectors[:100], [str(i) for i in range(100)])
+    indexer.save(tmp_path)
+    indexer.add_embeddings(vectors[100:], [str(i) for i in range(100, 200)])
+
+    ids, _ = indexer._search_vectors(indexer._prepare_vectors(vectors[[5, 150]]), 1)
+    assert ids.tolist() == [[5], [150]]